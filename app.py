@@ -20,6 +20,7 @@ Key improvements over v3:
 import os
 import sys
 import io
+import base64
 import json
 import logging
 import hashlib
@@ -27,8 +28,9 @@ import time
 import re
 import pickle
 import math
-from collections import Counter, defaultdict
-from datetime import datetime, timedelta
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
 # Fix encoding on Windows
@@ -52,29 +54,33 @@ _wz_log.addFilter(type("NoFavicon", (logging.Filter,), {
     "filter": lambda self, r: "favicon.ico" not in r.getMessage()
 })())
 
-try:
-    import torch
-    torch.set_grad_enabled(False)
-    logger.info("PyTorch gradients disabled globally for inference")
-except ImportError:
-    torch = None
-    logger.warning("PyTorch not available")
-
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
-import openai
-from newsapi import NewsApiClient
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.sentiment import SentimentIntensityAnalyzer
-from pymongo import MongoClient, errors as pymongo_errors
+import nlp_assets
+from nlp_assets import sent_tokenize, word_tokenize
+from db_indexes import ensure_indexes
+import archive
+import badges
+import prediction_details
+import rollups
+from leaderboard import leaderboard, start_snapshotter as start_leaderboard_snapshots
+from quiz_pool import candidate_pool, headline_key, question_bank
+from write_behind import write_behind
+import stats_counters
+import topics
+from pymongo import MongoClient, ReturnDocument, errors as pymongo_errors
 from bson import ObjectId
+from bson.errors import InvalidId
 import jwt
 import requests
 from urllib.parse import urlparse
 
+from upstream import (
+    UpstreamUnavailable, breaker_states, latency_states, quota_manager,
+    reset_after_fork as reset_upstream_after_fork, upstream_get,
+)
+
 try:
     from sklearn.linear_model import SGDClassifier
     from sklearn.preprocessing import StandardScaler
@@ -86,6 +92,10 @@ except ImportError:
     np = None
     logger.warning("scikit-learn not available - falling back to weighted voting")
 
+# gunicorn.conf.py sets VERITAS_PRELOAD: app.py is then imported once in the
+# gunicorn master and fork-unsafe state is built per worker by init_worker().
+PRELOAD_MODE = os.getenv("VERITAS_PRELOAD", "False").lower() == "true"
+
 TRANSFORMER_MODELS_AVAILABLE = False
 model_detector = None
 LABEL_MAP = {0: "REAL", 1: "FAKE"}
@@ -96,7 +106,7 @@ try:
     TRANSFORMER_MODELS_AVAILABLE = bool(model_detector and model_detector.available())
     if TRANSFORMER_MODELS_AVAILABLE:
         logger.info(f"Transformer models loaded")
-    else:
+    elif not PRELOAD_MODE:
         logger.warning("Transformer model_loader found but models not available")
 except Exception as _e:
     logger.warning(f"Transformer models not loaded: {_e}")
@@ -114,22 +124,6 @@ try:
 except Exception:
     pass
 
-for _pkg, _path in [
-    ("punkt",         "tokenizers/punkt"),
-    ("punkt_tab",     "tokenizers/punkt_tab"),
-    ("stopwords",     "corpora/stopwords"),
-    ("vader_lexicon", "sentiment/vader_lexicon"),
-]:
-    try:
-        nltk.data.find(_path)
-    except (LookupError, OSError):
-        # OSError raised on Python 3.14 due to a punkt_tab path resolution
-        # bug in NLTK. Downloading re-creates the correct directory structure.
-        try:
-            nltk.download(_pkg, quiet=True)
-        except Exception as _dl_err:
-            logger.warning(f"NLTK download failed for {_pkg}: {_dl_err}")
-
 # =========================================================================
 #  FLASK APP
 # =========================================================================
@@ -153,18 +147,22 @@ app.config["TWITTER_BEARER_TOKEN"] = os.getenv("TWITTER_BEARER_TOKEN")
 MONGO_URI = os.getenv("MONGODB_URI")
 mongo_client = mongo_db = None
 
-if MONGO_URI:
+if not MONGO_URI:
+    raise RuntimeError("MONGODB_URI environment variable is required")
+
+
+def connect_mongo():
+    """Open this process's MongoClient. Never share one across fork()."""
+    global mongo_client, mongo_db
     try:
         mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
         mongo_db     = mongo_client.get_database("veritas_ai")
         mongo_client.admin.command("ping")
-        logger.info("MongoDB connected - database: veritas_ai")
-    except Exception as _e:
+        logger.info(f"MongoDB connected - database: veritas_ai (pid {os.getpid()})")
+    except Exception as e:
         mongo_client = mongo_db = None
-        logger.error(f"MongoDB connection failed: {_e}")
-        raise RuntimeError(f"MongoDB connection required: {_e}") from _e
-else:
-    raise RuntimeError("MONGODB_URI environment variable is required")
+        logger.error(f"MongoDB connection failed: {e}")
+        raise RuntimeError(f"MongoDB connection required: {e}") from e
 
 _cors_origins = os.getenv(
     "CORS_ORIGINS",
@@ -172,14 +170,22 @@ _cors_origins = os.getenv(
 ).split(",")
 CORS(app, resources={r"/api/*": {"origins": _cors_origins}}, supports_credentials=True)
 
+def security_headers() -> Dict[str, str]:
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options":        "DENY",
+        "X-XSS-Protection":       "1; mode=block",
+        "Referrer-Policy":        "strict-origin-when-cross-origin",
+    }
+    if os.getenv("DEBUG", "True").lower() == "false":
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    return headers
+
+
 @app.after_request
 def add_security_headers(response):
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"]        = "DENY"
-    response.headers["X-XSS-Protection"]       = "1; mode=block"
-    response.headers["Referrer-Policy"]        = "strict-origin-when-cross-origin"
-    if os.getenv("DEBUG", "True").lower() == "false":
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    for k, v in security_headers().items():
+        response.headers[k] = v
     return response
 
 bcrypt.init_app(app)
@@ -195,25 +201,48 @@ if oauth_bp:
 else:
     logger.warning("oauth.py not found - OAuth routes disabled")
 
+# Optional SDKs are imported on first use: openai alone adds ~0.4s of import
+# time to every worker, most of which never serve a chatbot message.
+def _configured(key: Optional[str], placeholder: str) -> bool:
+    return bool(key and key.strip() and key != placeholder)
+
 _openai_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY")
-if _openai_key and _openai_key.strip() and _openai_key != "your_openai_api_key_here":
-    openai.api_key = _openai_key
-    logger.info("OpenAI API configured")
-else:
-    openai.api_key = None
-    logger.warning("OpenAI API key not configured")
+OPENAI_CONFIGURED = _configured(_openai_key, "your_openai_api_key_here")
+logger.info("OpenAI API configured" if OPENAI_CONFIGURED else "OpenAI API key not configured")
 
 _newsapi_key = os.getenv("NEWSAPI_KEY")
-if _newsapi_key and _newsapi_key.strip() and _newsapi_key != "your_newsapi_key_here":
-    try:
-        newsapi = NewsApiClient(api_key=_newsapi_key)
-        logger.info("NewsAPI configured")
-    except Exception as _e:
-        newsapi = None
-        logger.warning(f"NewsAPI error: {_e}")
-else:
-    newsapi = None
-    logger.warning("NewsAPI key not configured")
+NEWSAPI_CONFIGURED = _configured(_newsapi_key, "your_newsapi_key_here")
+logger.info("NewsAPI configured" if NEWSAPI_CONFIGURED else "NewsAPI key not configured")
+
+_lazy_clients: Dict[str, object] = {}
+_lazy_clients_lock = threading.Lock()
+
+
+def get_openai():
+    """The configured ``openai`` module, or None."""
+    if not OPENAI_CONFIGURED:
+        return None
+    with _lazy_clients_lock:
+        if "openai" not in _lazy_clients:
+            import openai
+            openai.api_key = _openai_key
+            _lazy_clients["openai"] = openai
+        return _lazy_clients["openai"]
+
+
+def get_newsapi():
+    """Shared NewsApiClient, or None when unconfigured or construction failed."""
+    if not NEWSAPI_CONFIGURED:
+        return None
+    with _lazy_clients_lock:
+        if "newsapi" not in _lazy_clients:
+            try:
+                from newsapi import NewsApiClient
+                _lazy_clients["newsapi"] = NewsApiClient(api_key=_newsapi_key)
+            except Exception as e:
+                logger.warning(f"NewsAPI error: {e}")
+                _lazy_clients["newsapi"] = None
+        return _lazy_clients["newsapi"]
 
 
 # =========================================================================
@@ -242,8 +271,17 @@ class AdvancedFakeNewsDetector:
         "appalled","shocked","sickening","amazing",
     ]
 
-    def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
+    @property
+    def sia(self):
+        # Built on first use from the offline NLTK cache (see nlp_assets).
+        return nlp_assets.sentiment_analyzer()
+
+    def _sentiment(self, text: str) -> Dict:
+        try:
+            return self.sia.polarity_scores(text)
+        except LookupError:
+            # vader_lexicon not prepared - neutral rather than failing the detector
+            return {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
 
     def extract_features(self, text: str) -> Dict:
         if not text or len(text.strip()) < 5:
@@ -252,7 +290,7 @@ class AdvancedFakeNewsDetector:
         words = word_tokenize(tl)
         nw    = max(len(words), 1)
 
-        sent = self.sia.polarity_scores(text)
+        sent = self._sentiment(text)
         return {
             "all_caps_ratio":      sum(1 for c in text if c.isupper()) / max(len(text), 1),
             "exclamation_ratio":   min(text.count("!") / 10.0, 1.0),
@@ -298,7 +336,7 @@ class AdvancedFakeNewsDetector:
         return {
             "prediction": pred, "confidence": conf,
             "features": feats, "credibility_score": (1 - fs) * 100,
-            "sentiment": self.sia.polarity_scores(text),
+            "sentiment": self._sentiment(text),
         }
 
 
@@ -331,6 +369,10 @@ class SourceVerifier:
         "waterfordwhispersnews.com","thebeaverton.com","reductress.com",
     }
 
+    CSE_URL     = "https://www.googleapis.com/customsearch/v1"
+    NEWSAPI_URL = "https://newsapi.org/v2/everything"
+    TWITTER_URL = "https://api.twitter.com/2/tweets/search/recent"
+
     def __init__(self):
         self.twitter_bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
         self.newsapi_key          = os.getenv("NEWSAPI_KEY")
@@ -340,40 +382,82 @@ class SourceVerifier:
         self._mem_ttl = 3600
         self._db_ttl  = 7  # days
 
-    def verify_claim(self, headline: str) -> Dict:
-        key = hashlib.md5(headline.encode()).hexdigest()
+    # ----------------------------
+    # Cache helpers (shared with async_engine.AsyncSourceVerifier)
+    # ----------------------------
+    @staticmethod
+    def _cache_key(headline: str) -> str:
+        return hashlib.md5(headline.encode()).hexdigest()
+
+    def _mem_get(self, key: str) -> Optional[Dict]:
         if key in self._mem:
             ts, cached = self._mem[key]
             if time.time() - ts < self._mem_ttl:
                 return cached
+        return None
+
+    def _mem_put(self, key: str, result: Dict):
+        self._mem[key] = (time.time(), result)
+
+    @staticmethod
+    def _cache_doc_usable(doc: Optional[Dict]) -> bool:
+        # While quota is scarce an expired entry beats spending
+        # budget on a claim we have already verified once.
+        return bool(doc) and (doc.get("expires_at", datetime.min) > datetime.utcnow()
+                              or quota_manager.is_low("newsapi", "google_cse"))
+
+    def _cache_update(self, key: str, headline: str, result: Dict) -> Tuple[Dict, Dict]:
+        return {"key": key}, {"$set": {
+            "key": key, "headline": headline[:500], "result": result,
+            "created_at": datetime.utcnow(),
+            "expires_at": datetime.utcnow() + timedelta(days=self._db_ttl),
+        }}
+
+    def verify_claim(self, headline: str, priority: str = "normal") -> Dict:
+        """
+        priority="low" marks secondary lookups (extracted sub-claims) that
+        may not spend the reserved part of an upstream's quota.
+        """
+        key = self._cache_key(headline)
+        hit = self._mem_get(key)
+        if hit is not None:
+            return hit
         if mongo_db is not None:
             try:
                 doc = mongo_db.verification_cache.find_one({"key": key})
-                if doc and doc.get("expires_at", datetime.min) > datetime.utcnow():
-                    result = doc["result"]
-                    self._mem[key] = (time.time(), result)
-                    return result
+                if self._cache_doc_usable(doc):
+                    self._mem_put(key, doc["result"])
+                    return doc["result"]
             except Exception:
                 pass
 
-        result = self._run(headline)
-        self._mem[key] = (time.time(), result)
+        result = self._run(headline, priority)
+        if result.get("degraded"):
+            return result
+        self._mem_put(key, result)
         if mongo_db is not None:
             try:
                 mongo_db.verification_cache.update_one(
-                    {"key": key},
-                    {"$set": {
-                        "key": key, "headline": headline[:500], "result": result,
-                        "created_at": datetime.utcnow(),
-                        "expires_at": datetime.utcnow() + timedelta(days=self._db_ttl),
-                    }},
-                    upsert=True,
+                    *self._cache_update(key, headline, result), upsert=True,
                 )
             except Exception:
                 pass
         return result
 
-    def _run(self, headline: str) -> Dict:
+    def _run(self, headline: str, priority: str = "normal") -> Dict:
+        fc   = self._factcheck(headline, priority)
+        news = self._newsapi(headline, priority)
+        tw   = self._twitter(headline, priority) if self.twitter_bearer_token else None
+        gs   = self._google(headline, priority) if self._want_google(fc) else None
+        return self._combine(fc, news, tw, gs)
+
+    def _want_google(self, fc: Dict) -> bool:
+        # A fact-check verdict already outranks anything Google can add, so
+        # skip the second CSE call once that quota is running low.
+        return bool(self.google_api_key and self.google_cx
+                    and not (fc.get("found") and quota_manager.is_low("google_cse")))
+
+    def _combine(self, fc: Dict, news: Dict, tw: Optional[Dict], gs: Optional[Dict]) -> Dict:
         r = {
             "verified": False, "confidence": 0.0, "sources_found": 0,
             "trusted_sources": [], "fact_check_results": {},
@@ -381,7 +465,6 @@ class SourceVerifier:
             "explanation": "", "details": [],
         }
 
-        fc = self._factcheck(headline)
         r["fact_check_results"] = fc
         if fc.get("found"):
             r["confidence"]       = fc.get("confidence", 0.5)
@@ -389,7 +472,6 @@ class SourceVerifier:
             r["credibility_tier"] = fc.get("tier", "unknown")
             r["details"].append(f"Fact-checked by {fc.get('source', 'unknown')}")
 
-        news = self._newsapi(headline)
         r["sources_found"]   = news.get("count", 0)
         r["trusted_sources"] = news.get("sources", [])
         if news.get("count", 0) > 0:
@@ -400,18 +482,15 @@ class SourceVerifier:
                 r["verified"]   = True
                 r["credibility_tier"] = "high"
 
-        if self.twitter_bearer_token:
-            tw = self._twitter(headline)
+        if tw is not None:
             r["twitter_verification"] = tw
             if tw.get("verified_mentions", 0) >= 2:
                 r["confidence"] = max(r["confidence"], 0.75)
                 r["details"].append(f"{tw['verified_mentions']} verified Twitter mentions")
 
-        if self.google_api_key and self.google_cx:
-            gs = self._google(headline)
-            if gs.get("tier1_sources", 0) > 0:
-                r["confidence"] = max(r["confidence"], 0.80)
-                r["details"].append(f"Google: {gs['tier1_sources']} tier-1 sources")
+        if gs is not None and gs.get("tier1_sources", 0) > 0:
+            r["confidence"] = max(r["confidence"], 0.80)
+            r["details"].append(f"Google: {gs['tier1_sources']} tier-1 sources")
 
         c = r["confidence"]
         if   c >= 0.75: r["credibility_tier"] = "high";        r["verified"] = True
@@ -419,112 +498,132 @@ class SourceVerifier:
         elif c >= 0.30: r["credibility_tier"] = "low"
         else:           r["credibility_tier"] = "unverified"
 
+        # An upstream failed or was skipped by its circuit breaker: the
+        # result is a neutral placeholder and must not be cached for days.
+        r["degraded"]    = any("error" in part for part in (fc, news, tw, gs) if part)
         r["explanation"] = self._explain(r)
         return r
 
-    def _factcheck(self, headline: str) -> Dict:
-        if not self.google_api_key or not self.google_cx:
-            return {"found": False}
-        try:
-            q = (f"{headline} site:snopes.com OR site:factcheck.org "
-                 "OR site:politifact.com OR site:fullfact.org")
-            resp = requests.get(
-                "https://www.googleapis.com/customsearch/v1",
-                params={"key": self.google_api_key, "cx": self.google_cx, "q": q, "num": 5},
-                timeout=8,
-            )
-            if resp.status_code == 200:
-                for item in resp.json().get("items", []):
-                    combo  = (item.get("title","") + " " + item.get("snippet","")).lower()
-                    source = item.get("displayLink", "fact-checker")
-                    if any(w in combo for w in ["false","fake","misleading","debunked","pants on fire"]):
-                        return {"found": True, "verified": False, "rating": "FALSE",
-                                "confidence": 0.92, "tier": "unreliable", "source": source,
-                                "explanation": f"Flagged as false by {source}"}
-                    if any(w in combo for w in ["true","correct","accurate","verified","mostly true"]):
-                        return {"found": True, "verified": True, "rating": "TRUE",
-                                "confidence": 0.90, "tier": "high", "source": source,
-                                "explanation": f"Verified as accurate by {source}"}
-        except Exception as e:
-            logger.warning(f"Fact-check API error: {e}")
-        return {"found": False}
-
-    def _newsapi(self, headline: str) -> Dict:
-        if not self.newsapi_key:
-            return {"count": 0, "sources": []}
-        try:
-            resp = requests.get(
-                "https://newsapi.org/v2/everything",
-                params={
+    # ----------------------------
+    # Upstream lookups: request spec + parser, so the asyncio engine
+    # shares everything except the transport.
+    # ----------------------------
+    _EMPTY = {
+        "factcheck": {"found": False},
+        "newsapi":   {"count": 0, "sources": []},
+        "twitter":   {"checked": False},
+        "google":    {"tier1_sources": 0, "sources": []},
+    }
+    _LABEL = {"factcheck": "Fact-check API", "newsapi": "NewsAPI",
+              "twitter": "Twitter API", "google": "Google Search"}
+
+    def _request(self, kind: str, headline: str) -> Optional[Tuple[str, str, Dict]]:
+        """(upstream name, url, upstream_get kwargs) or None if not configured."""
+        if kind in ("factcheck", "google"):
+            if not self.google_api_key or not self.google_cx:
+                return None
+            if kind == "factcheck":
+                q, num = (f"{headline} site:snopes.com OR site:factcheck.org "
+                          "OR site:politifact.com OR site:fullfact.org"), 5
+            else:
+                q, num = headline, 10
+            return "google_cse", self.CSE_URL, {
+                "params": {"key": self.google_api_key, "cx": self.google_cx, "q": q, "num": num},
+                "timeout": 8, "hedge": True,
+            }
+        if kind == "newsapi":
+            if not self.newsapi_key:
+                return None
+            return "newsapi", self.NEWSAPI_URL, {
+                "params": {
                     "apiKey": self.newsapi_key, "q": headline, "language": "en",
                     "sortBy": "relevancy", "pageSize": 20,
                     "from": (datetime.now() - timedelta(days=30)).isoformat(),
                 },
-                timeout=8,
-            )
-            if resp.status_code == 200:
-                articles = resp.json().get("articles", [])
-                trusted  = [
-                    {"source": a.get("source", {}).get("name"), "url": a.get("url",""),
-                     "title": a.get("title"), "publishedAt": a.get("publishedAt")}
-                    for a in articles
-                    if self._is_tier1(a.get("url",""))
-                ]
-                return {"count": len(trusted), "sources": trusted}
-        except Exception as e:
-            logger.warning(f"NewsAPI error: {e}")
-        return {"count": 0, "sources": []}
-
-    def _twitter(self, headline: str) -> Dict:
-        if not self.twitter_bearer_token:
-            return {"checked": False}
-        try:
-            kw    = self._keywords(headline)
-            query = " ".join(kw[:5])
-            resp  = requests.get(
-                "https://api.twitter.com/2/tweets/search/recent",
-                headers={"Authorization": f"Bearer {self.twitter_bearer_token}"},
-                params={
+                "timeout": 8, "hedge": True,
+            }
+        if kind == "twitter":
+            if not self.twitter_bearer_token:
+                return None
+            query = " ".join(self._keywords(headline)[:5])
+            return "twitter", self.TWITTER_URL, {
+                "headers": {"Authorization": f"Bearer {self.twitter_bearer_token}"},
+                "params": {
                     "query": f"{query} -is:retweet has:links", "max_results": 20,
                     "tweet.fields": "author_id,created_at", "user.fields": "verified,verified_type",
                     "expansions": "author_id",
                 },
-                timeout=8,
-            )
-            if resp.status_code == 200:
-                data  = resp.json()
-                users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
-                ver   = [
-                    u for t in data.get("data", [])
-                    if (u := users.get(t.get("author_id"), {})).get("verified")
-                    or u.get("verified_type") in ["blue","business","government"]
-                ]
-                return {"checked": True, "verified_mentions": len(ver),
-                        "sources": ver[:5], "total_mentions": len(data.get("data",[]))}
-            return {"checked": False, "error": f"Twitter {resp.status_code}"}
-        except Exception as e:
-            logger.warning(f"Twitter API error: {e}")
-            return {"checked": False, "error": str(e)}
-
-    def _google(self, headline: str) -> Dict:
-        if not self.google_api_key or not self.google_cx:
-            return {"tier1_sources": 0, "sources": []}
+                "timeout": 8,
+            }
+        raise ValueError(f"Unknown lookup: {kind}")
+
+    def _parse(self, kind: str, data: Dict) -> Dict:
+        if kind == "factcheck":
+            for item in data.get("items", []):
+                combo  = (item.get("title","") + " " + item.get("snippet","")).lower()
+                source = item.get("displayLink", "fact-checker")
+                if any(w in combo for w in ["false","fake","misleading","debunked","pants on fire"]):
+                    return {"found": True, "verified": False, "rating": "FALSE",
+                            "confidence": 0.92, "tier": "unreliable", "source": source,
+                            "explanation": f"Flagged as false by {source}"}
+                if any(w in combo for w in ["true","correct","accurate","verified","mostly true"]):
+                    return {"found": True, "verified": True, "rating": "TRUE",
+                            "confidence": 0.90, "tier": "high", "source": source,
+                            "explanation": f"Verified as accurate by {source}"}
+            return {"found": False}
+        if kind == "newsapi":
+            trusted = [
+                {"source": a.get("source", {}).get("name"), "url": a.get("url",""),
+                 "title": a.get("title"), "publishedAt": a.get("publishedAt")}
+                for a in data.get("articles", [])
+                if self._is_tier1(a.get("url",""))
+            ]
+            return {"count": len(trusted), "sources": trusted}
+        if kind == "twitter":
+            users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
+            ver   = [
+                u for t in data.get("data", [])
+                if (u := users.get(t.get("author_id"), {})).get("verified")
+                or u.get("verified_type") in ["blue","business","government"]
+            ]
+            return {"checked": True, "verified_mentions": len(ver),
+                    "sources": ver[:5], "total_mentions": len(data.get("data",[]))}
+        if kind == "google":
+            tier1 = [
+                {"title": i.get("title"), "url": i.get("link"), "snippet": i.get("snippet")}
+                for i in data.get("items", []) if self._is_tier1(i.get("link",""))
+            ]
+            return {"tier1_sources": len(tier1), "sources": tier1}
+        raise ValueError(f"Unknown lookup: {kind}")
+
+    def _lookup(self, kind: str, headline: str, priority: str = "normal") -> Dict:
+        spec  = self._request(kind, headline)
+        empty = self._EMPTY[kind]
+        if spec is None:
+            return dict(empty)
+        name, url, kwargs = spec
         try:
-            resp = requests.get(
-                "https://www.googleapis.com/customsearch/v1",
-                params={"key": self.google_api_key, "cx": self.google_cx, "q": headline, "num": 10},
-                timeout=8,
-            )
-            if resp.status_code == 200:
-                items = resp.json().get("items", [])
-                tier1 = [
-                    {"title": i.get("title"), "url": i.get("link"), "snippet": i.get("snippet")}
-                    for i in items if self._is_tier1(i.get("link",""))
-                ]
-                return {"tier1_sources": len(tier1), "sources": tier1}
+            resp = upstream_get(name, url, priority=priority, **kwargs)
+            if resp.status_code != 200:
+                return {**empty, "error": f"{self._LABEL[kind]} {resp.status_code}"}
+            return self._parse(kind, resp.json())
+        except UpstreamUnavailable as e:
+            return {**empty, "error": str(e)}
         except Exception as e:
-            logger.warning(f"Google Search error: {e}")
-        return {"tier1_sources": 0, "sources": []}
+            logger.warning(f"{self._LABEL[kind]} error: {e}")
+            return {**empty, "error": str(e)}
+
+    def _factcheck(self, headline: str, priority: str = "normal") -> Dict:
+        return self._lookup("factcheck", headline, priority)
+
+    def _newsapi(self, headline: str, priority: str = "normal") -> Dict:
+        return self._lookup("newsapi", headline, priority)
+
+    def _twitter(self, headline: str, priority: str = "normal") -> Dict:
+        return self._lookup("twitter", headline, priority)
+
+    def _google(self, headline: str, priority: str = "normal") -> Dict:
+        return self._lookup("google", headline, priority)
 
     def check_url_credibility(self, url: str) -> Dict:
         domain = urlparse(url).netloc.lower().replace("www.", "")
@@ -557,6 +656,43 @@ class SourceVerifier:
         return s + (" -> VERIFIED." if r.get("verified") else " -> Unable to verify.")
 
 
+# =========================================================================
+#  IN-PROCESS CACHE
+# =========================================================================
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache where every entry carries its own TTL."""
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
 # =========================================================================
 #  X (TWITTER) REALITY VALIDATION ENGINE — NON-INTRUSIVE INTELLIGENCE LAYER
 # =========================================================================
@@ -568,62 +704,92 @@ class XRealityEngine:
     Detects misinformation behavior patterns.
     """
     
+    # Cache lifetimes (seconds). Positive results are stable for hours; an
+    # empty search is re-checked sooner, and upstream errors are only held
+    # long enough to stop every request during an outage from retrying.
+    POSITIVE_TTL = 6 * 3600
+    NEGATIVE_TTL = int(os.getenv("X_REALITY_NEGATIVE_TTL", "900"))
+    ERROR_TTL    = int(os.getenv("X_REALITY_ERROR_TTL", "20"))
+
     def __init__(self, bearer_token: str, cache_collection=None):
         self.bearer = bearer_token
         self.base = "https://api.twitter.com/2"
         self.cache = cache_collection
+        self._l1 = TTLCache(maxsize=int(os.getenv("X_REALITY_L1_SIZE", "2048")))
     
     def analyze(self, text: str) -> Dict:
         if not self.bearer:
             return {"enabled": False, "social_fake_prob": 0.0, "evidence": {}}
         
-        # Check cache first
         cache_key = hashlib.md5(text.encode()).hexdigest()
+
+        # L1: in-process, no round-trip
+        hit = self._l1.get(cache_key)
+        if hit is not None:
+            return hit
+
+        # L2: MongoDB, shared across workers
         if self.cache is not None:
             try:
-                cached = self.cache.find_one({"_id": cache_key})
-                if cached and cached.get("expires", datetime.min) > datetime.utcnow():
-                    return cached["result"]
+                cached = self._l2_hit(cache_key, self.cache.find_one({"_id": cache_key}))
+                if cached is not None:
+                    return cached
             except Exception as e:
                 logger.warning(f"Cache read error: {e}")
         
         try:
-            tweets = self._search(text)
-            if not tweets:
-                result = {"enabled": True, "social_fake_prob": 0.0, "evidence": {"note": "no_social_signal"}}
-            else:
-                metrics = self._compute_metrics(tweets)
-                score = self._score(metrics)
-                result = {
-                    "enabled": True,
-                    "social_fake_prob": round(score, 4),
-                    "evidence": metrics
-                }
-            
-            # Cache result
-            if self.cache is not None:
-                try:
-                    self.cache.update_one(
-                        {"_id": cache_key},
-                        {"$set": {
-                            "result": result,
-                            "expires": datetime.utcnow() + timedelta(hours=6)
-                        }},
-                        upsert=True
-                    )
-                except Exception as e:
-                    logger.warning(f"Cache write error: {e}")
-            
-            return result
-            
+            result, ttl = self._evaluate(self._search(text))
         except Exception as e:
-            logger.error(f"X Reality Engine error: {e}")
-            return {"enabled": False, "social_fake_prob": 0.0, "error": str(e)}
+            return self._error_result(cache_key, e)
+
+        self._l1.set(cache_key, result, ttl)
+        if self.cache is not None:
+            try:
+                self.cache.update_one(*self._cache_update(cache_key, result, ttl), upsert=True)
+            except Exception as e:
+                logger.warning(f"Cache write error: {e}")
+        
+        return result
+
+    # ----------------------------
+    # Cache + result helpers (shared with async_engine.AsyncXRealityEngine)
+    # ----------------------------
+    def _l2_hit(self, cache_key: str, cached: Optional[Dict]) -> Optional[Dict]:
+        if cached and cached.get("expires", datetime.min) > datetime.utcnow():
+            remaining = (cached["expires"] - datetime.utcnow()).total_seconds()
+            self._l1.set(cache_key, cached["result"], remaining)
+            return cached["result"]
+        return None
+
+    def _evaluate(self, tweets: List[Dict]) -> Tuple[Dict, int]:
+        if not tweets:
+            return ({"enabled": True, "social_fake_prob": 0.0, "evidence": {"note": "no_social_signal"}},
+                    self.NEGATIVE_TTL)
+        metrics = self._compute_metrics(tweets)
+        score = self._score(metrics)
+        return ({
+            "enabled": True,
+            "social_fake_prob": round(score, 4),
+            "evidence": metrics
+        }, self.POSITIVE_TTL)
+
+    def _error_result(self, cache_key: str, e: Exception) -> Dict:
+        logger.error(f"X Reality Engine error: {e}")
+        result = {"enabled": False, "social_fake_prob": 0.0, "error": str(e)}
+        self._l1.set(cache_key, result, self.ERROR_TTL)
+        return result
+
+    @staticmethod
+    def _cache_update(cache_key: str, result: Dict, ttl: int) -> Tuple[Dict, Dict]:
+        return {"_id": cache_key}, {"$set": {
+            "result": result,
+            "expires": datetime.utcnow() + timedelta(seconds=ttl)
+        }}
     
     # ----------------------------
     # X Data Collection
     # ----------------------------
-    def _search(self, text: str) -> List[Dict]:
+    def _search_request(self, text: str) -> Tuple[str, Dict]:
         keywords = self._keywords(text)
         q = " ".join(keywords[:6])
         
@@ -636,13 +802,19 @@ class XRealityEngine:
             "user.fields": "verified,public_metrics",
             "expansions": "author_id"
         }
-        
-        r = requests.get(url, headers=headers, params=params, timeout=8)
+        return url, {"headers": headers, "params": params, "timeout": 8}
+
+    def _search(self, text: str) -> List[Dict]:
+        url, kwargs = self._search_request(text)
+        r = upstream_get("twitter", url, **kwargs)
         if r.status_code != 200:
-            logger.warning(f"Twitter API error: {r.status_code}")
-            return []
-        
-        data = r.json()
+            # Raise rather than return [] so an outage is not cached as
+            # a genuine "no social signal" result.
+            raise requests.HTTPError(f"Twitter API error: {r.status_code}", response=r)
+        return self._enrich(r.json())
+
+    @staticmethod
+    def _enrich(data: Dict) -> List[Dict]:
         users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
         
         enriched = []
@@ -924,14 +1096,18 @@ class LearnedEnsemble:
             logger.error(f"Batch retrain failed: {e}")
             return False
 
+    def refresh_due(self) -> bool:
+        return not (self._last_update and (datetime.utcnow() - self._last_update).seconds < 3600)
+
     def maybe_refresh(self):
-        if self._last_update and (datetime.utcnow() - self._last_update).seconds < 3600:
+        if not self.refresh_due():
             return
         self._last_update = datetime.utcnow()
         if self.mongo_db is None:
             return
         try:
-            recent = list(self.mongo_db.predictions.find().sort("timestamp", -1).limit(500))
+            recent = list(self.mongo_db.predictions.find({}, {"method": 1, "confidence": 1})
+                          .sort("timestamp", -1).limit(500))
             if len(recent) < 50:
                 return
             hits: Dict[str, List[float]] = defaultdict(list)
@@ -949,13 +1125,60 @@ class LearnedEnsemble:
 #  INIT SINGLETONS
 # =========================================================================
 
+# Collections are bound by init_worker(); everything built here is either
+# read-only (lexicons, domain sets, the ensemble pickle) or safe to fork.
 source_verifier  = SourceVerifier()
 claim_extractor  = ClaimExtractor()
-x_reality_engine = XRealityEngine(
-    os.getenv("TWITTER_BEARER_TOKEN"), 
-    mongo_db.x_reality_cache if mongo_db is not None else None
-)
-learned_ensemble = LearnedEnsemble(mongo_db)
+x_reality_engine = XRealityEngine(os.getenv("TWITTER_BEARER_TOKEN"))
+learned_ensemble = LearnedEnsemble()
+
+_worker_pid: Optional[int] = None
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "True").lower() == "true"
+
+
+def load_shared_assets():
+    """Load read-only assets in the gunicorn master so workers share them copy-on-write."""
+    nlp_assets.preload()
+    logger.info("Shared assets loaded (pre-fork)")
+
+
+def init_worker():
+    """
+    Create this process's fork-unsafe resources: the Mongo client (and its
+    indexes) and every collection handle derived from it, the transformer
+    session and the hedge thread pool. Runs at import in a plain process and from gunicorn's
+    post_fork hook under --preload; repeated calls in one process are no-ops.
+    """
+    global _worker_pid, TRANSFORMER_MODELS_AVAILABLE
+    if _worker_pid == os.getpid():
+        return
+    reset_upstream_after_fork()
+    connect_mongo()
+    if MONGO_ENSURE_INDEXES:
+        ensure_indexes(mongo_db)
+    quota_manager.bind(mongo_db.upstream_quota)
+    x_reality_engine.cache   = mongo_db.x_reality_cache
+    learned_ensemble.mongo_db = mongo_db
+    candidate_pool.bind(mongo_db.quiz_candidates)
+    question_bank.bind(mongo_db.quiz_questions)
+    write_behind.bind(mongo_db)
+    leaderboard.bind(mongo_db)
+    start_leaderboard_snapshots(leaderboard, mongo_db)
+    stats_counters.start_reconciler(mongo_db)
+    rollups.start_folder(mongo_db, classify=topics.classify)
+    archive.start_archiver(mongo_db)
+    badges.start_checker(mongo_db)
+    topics.start_reclassifier(mongo_db)
+    if model_detector is not None:
+        TRANSFORMER_MODELS_AVAILABLE = model_detector.load()
+    _worker_pid = os.getpid()
+    logger.info(f"Worker initialised (pid {_worker_pid})")
+
+
+if PRELOAD_MODE:
+    load_shared_assets()
+else:
+    init_worker()
 
 logger.info("All components initialised")
 
@@ -975,7 +1198,10 @@ def create_access_token(user_id: str) -> str:
 
 def get_current_user_id() -> Optional[str]:
     """Authenticate from Bearer token ONLY. Never trust request body for user identity."""
-    h = request.headers.get("Authorization", "")
+    return user_id_from_authorization(request.headers.get("Authorization", ""))
+
+
+def user_id_from_authorization(h: str) -> Optional[str]:
     if not h.startswith("Bearer "):
         return None
     token = h.split(" ", 1)[1].strip()
@@ -997,15 +1223,30 @@ def mongo_insert_one(col: str, doc: Dict):
         logger.error(f"MongoDB insert error in '{col}': {e}")
 
 
-def log_interaction(action: str, meta: Optional[Dict] = None, user_id=None):
-    if mongo_db is not None:
+# A pending Mongo write: (collection, method, args, kwargs). Built by pure
+# functions so the sync routes and async_engine apply the same writes.
+WriteOp = Tuple[str, str, tuple, Dict]
+
+
+def apply_writes(ops: List[WriteOp]):
+    if mongo_db is None:
+        return
+    for col, method, args, kwargs in ops:
         try:
-            mongo_db.user_interactions.insert_one({
-                "user_id": user_id, "action_type": action,
-                "metadata": meta or {}, "timestamp": datetime.utcnow(),
-            })
+            getattr(mongo_db[col], method)(*args, **kwargs)
         except Exception as e:
-            logger.error(f"Interaction log failed: {e}")
+            logger.error(f"MongoDB {method} error in '{col}': {e}")
+
+
+def _interaction_write(action: str, meta: Optional[Dict] = None, user_id=None) -> WriteOp:
+    return ("user_interactions", "insert_one", ({
+        "user_id": user_id, "action_type": action,
+        "metadata": meta or {}, "timestamp": datetime.utcnow(),
+    },), {})
+
+
+def log_interaction(action: str, meta: Optional[Dict] = None, user_id=None):
+    apply_writes([_interaction_write(action, meta, user_id)])
 
 
 # =========================================================================
@@ -1024,9 +1265,9 @@ def home():
             "nlp_analysis":        True,
             "source_verification": True,
             "twitter_verification":bool(source_verifier.twitter_bearer_token),
-            "news_api":            newsapi is not None,
+            "news_api":            NEWSAPI_CONFIGURED,
             "google_search":       bool(source_verifier.google_api_key),
-            "openai":              openai.api_key is not None,
+            "openai":              OPENAI_CONFIGURED,
             "online_learning":     SKLEARN_AVAILABLE,
             "claim_extraction":    True,
         },
@@ -1039,8 +1280,8 @@ def health_check():
         if mongo_db is not None:
             mongo_client.admin.command("ping")
             db_s = "connected"
-            pc = mongo_db.predictions.count_documents({})
-            uc = mongo_db.users.count_documents({})
+            pc = stats_counters.read(mongo_db, stats_counters.GLOBAL).get("predictions", 0)
+            uc = mongo_db.users.estimated_document_count()
         else:
             db_s = "not configured"; pc = uc = 0
     except Exception as e:
@@ -1055,10 +1296,16 @@ def health_check():
             "transformers": TRANSFORMER_MODELS_AVAILABLE,
             "nlp": True,
             "twitter": bool(source_verifier.twitter_bearer_token),
-            "newsapi": newsapi is not None,
+            "newsapi": NEWSAPI_CONFIGURED,
             "google": bool(source_verifier.google_api_key),
-            "openai": openai.api_key is not None,
+            "openai": OPENAI_CONFIGURED,
         },
+        "upstreams": breaker_states(),
+        "quotas":    quota_manager.snapshot(),
+        "latency":   latency_states(),
+        "transformer": model_detector.stats() if model_detector else {"available": False},
+        "nltk":      nlp_assets.status(),
+        "write_behind": write_behind.stats(),
     }), 200
 
 
@@ -1074,180 +1321,239 @@ def api_login():
 # -------------------------------------------------------------------------
 #  PREDICT  (main endpoint)
 # -------------------------------------------------------------------------
+# The pipeline steps below do no I/O of their own, so async_engine.py runs
+# the same logic with async HTTP and Mongo transports.
+
+def _parse_predict_request(data: Dict) -> Tuple[str, Optional[Tuple[Dict, int]]]:
+    headline = (data.get("headline") or data.get("text") or data.get("article") or "").strip()
+    if not headline:
+        return headline, ({"error": "Missing headline / text in request body"}, 400)
+    if len(headline) > 10_000:
+        return headline, ({"error": "Input too long (max 10 000 chars)"}, 400)
+    return headline, None
+
+
+def _url_precheck(source_url: str) -> Tuple[Dict, Dict, Optional[Dict]]:
+    """URL fast-path: (url_cred, pre-filled verification, early response)."""
+    url_cred: Dict = {}
+    vr:       Dict = {}
+    if not source_url:
+        return url_cred, vr, None
+
+    url_cred = source_verifier.check_url_credibility(source_url)
+    if url_cred.get("credibility") == "satire":
+        return url_cred, vr, {
+            "prediction": "SATIRE", "confidence": 0.99,
+            "method": "url_credibility",
+            "source_verification": {
+                "verified": False, "sources_found": 0,
+                "credibility_tier": "satire",
+                "explanation": "Known satire publication - content is intentionally fictional.",
+                "twitter_verified": 0, "fact_checked": False,
+            },
+            "url_credibility": url_cred,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    if url_cred.get("credibility") == "unreliable":
+        vr = {
+            "verified": False, "confidence": 0.95,
+            "credibility_tier": "unreliable",
+            "explanation": "Known misinformation source",
+            "sources_found": 0, "fact_check_results": {},
+            "twitter_verification": {}, "trusted_sources": [],
+        }
+    return url_cred, vr, None
+
+
+def _claim_entry(claim: str, cr: Dict) -> Dict:
+    return {"claim": claim, "verified": cr.get("verified", False),
+            "confidence": cr.get("confidence", 0.5)}
+
+
+def _nlp_component(headline: str) -> Optional[Dict]:
+    try:
+        return detector.analyze(headline)
+    except Exception as e:
+        logger.error(f"NLP error: {e}")
+        return None
+
+
+def _transformer_entry(t: Dict) -> Optional[Dict]:
+    if not t.get("success", True):
+        return None
+    return {
+        "prediction": t.get("prediction", "UNKNOWN"),
+        "confidence": t.get("confidence", 0.5),
+        "raw_score":  t.get("raw_score", 0.5),
+    }
+
+
+def _transformer_component(headline: str) -> Optional[Dict]:
+    # predict() joins the shared micro-batch queue (model_loader.MicroBatcher)
+    if not (TRANSFORMER_MODELS_AVAILABLE and model_detector):
+        return None
+    try:
+        return _transformer_entry(model_detector.predict(headline))
+    except Exception as e:
+        logger.error(f"Transformer error: {e}")
+        return None
+
+
+def _score_prediction(vr: Dict, cv: List[Dict], comps: Dict, x_result: Dict) -> Dict:
+    # STEP 5: Learned ensemble
+    nlp_r = comps.get("nlp", {"prediction": "REAL", "confidence": 0.5})
+    t_r   = comps.get("transformer")
+    fv    = LearnedEnsemble.build_features(nlp_r, t_r, vr, cv)
+    raw_label, fake_prob = learned_ensemble.predict(fv)
+
+    # ---- X REALITY VALIDATION LAYER ----
+    x_social_fake = x_result.get("social_fake_prob", 0.0)
+    
+    # Confidence modulation (NOT replacement)
+    twitter_verified_mentions = x_result.get("evidence", {}).get("verified_mentions", 0)
+    TWITTER_WEIGHT  = 0.40
+    ENSEMBLE_WEIGHT = 0.60
+
+    if twitter_verified_mentions >= 3:
+        twitter_score = max(0.0, x_social_fake - 0.4)  # strong REAL signal
+    elif twitter_verified_mentions >= 1:
+        twitter_score = max(0.0, x_social_fake - 0.2)  # mild REAL signal
+    elif x_social_fake > 0.0:
+        twitter_score = x_social_fake                   # strong FAKE signal
+    else:
+        twitter_score = fake_prob                        # no Twitter data, ignore it
+        TWITTER_WEIGHT  = 0.0
+        ENSEMBLE_WEIGHT = 1.0
+    fake_prob = min(1.0, (ENSEMBLE_WEIGHT * fake_prob) + (TWITTER_WEIGHT * twitter_score))
+
+
+    # STEP 6: Confidence adjustment
+    conf = fake_prob if raw_label == "FAKE" else (1 - fake_prob)
+    preds = [comps[k]["prediction"] for k in ("nlp","transformer") if k in comps]
+    if preds and all(p == raw_label for p in preds):
+        conf = min(conf * 1.08, 1.0)
+    if len(preds) >= 2 and len(set(preds)) > 1:
+        conf *= 0.88
+    if vr.get("verified") and raw_label == "REAL":
+        conf = min(conf * 1.05, 1.0)
+
+    final = raw_label if conf >= 0.60 else "UNVERIFIED"
+    method = ("learned_ensemble" if SKLEARN_AVAILABLE and learned_ensemble.model
+              else "weighted_fallback")
+    return {"final": final, "conf": conf, "fake_prob": fake_prob, "method": method,
+            "fv": fv, "x_social_fake": x_social_fake}
+
+
+def _strip_features(comps: Dict) -> Dict:
+    return {
+        k: {kk: vv for kk, vv in v.items() if kk != "features"}
+        for k, v in comps.items()
+    }
+
+
+def _prediction_writes(user_id: Optional[str], headline: str, outcome: Dict, vr: Dict,
+                       url_cred: Dict, cv: List[Dict], comps: Dict) -> List[WriteOp]:
+    # STEP 7: Persist
+    ops: List[WriteOp] = []
+    if user_id:
+        detail_hash, detail_op = prediction_details.detail_write({
+            "source_verification": vr, "url_credibility": url_cred,
+            "claim_verification": cv,
+            "component_results": _strip_features(comps),
+        })
+        ops.append(detail_op)
+        ops.append(("predictions", "insert_one", ({
+            "user_id": user_id, "headline": headline, "topic": topics.classify(headline),
+            "prediction": outcome["final"], "confidence": outcome["conf"],
+            "method": outcome["method"], "feature_vector": outcome["fv"],
+            "detail_hash": detail_hash,
+            "timestamp": datetime.utcnow(),
+        },), {}))
+        ops.extend(stats_counters.prediction_writes(user_id, outcome["final"]))
+    return ops
+
+
+def _prediction_response(outcome: Dict, vr: Dict, url_cred: Dict, cv: List[Dict],
+                         comps: Dict, x_result: Dict) -> Dict:
+    return {
+        "prediction":      outcome["final"],
+        "confidence":      round(outcome["conf"], 4),
+        "fake_probability":round(outcome["fake_prob"], 4),
+        "method":          outcome["method"],
+        "source_verification": {
+            "verified":         vr.get("verified", False),
+            "sources_found":    vr.get("sources_found", 0),
+            "trusted_sources":  vr.get("trusted_sources", [])[:3],
+            "credibility_tier": vr.get("credibility_tier", "unknown"),
+            "explanation":      vr.get("explanation", ""),
+            "twitter_verified": vr.get("twitter_verification", {}).get("verified_mentions", 0),
+            "fact_checked":     vr.get("fact_check_results", {}).get("found", False),
+        },
+        "url_credibility":  url_cred or None,
+        "claim_verification": cv,
+        "ensemble_features": {
+            name: round(val, 4)
+            for name, val in zip(LearnedEnsemble.FEATURE_NAMES, outcome["fv"])
+        },
+        "component_results": _strip_features(comps),
+        "x_reality": {
+            "enabled": x_result.get("enabled", False),
+            "social_fake_probability": round(outcome["x_social_fake"], 4),
+            "evidence": x_result.get("evidence", {})
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
 
 @app.route("/api/predict", methods=["POST"])
 def predict():
     try:
-        data     = request.get_json() or {}
-        headline = (data.get("headline") or data.get("text") or data.get("article") or "").strip()
-        if not headline:
-            return jsonify({"error": "Missing headline / text in request body"}), 400
-        if len(headline) > 10_000:
-            return jsonify({"error": "Input too long (max 10 000 chars)"}), 400
+        data = request.get_json() or {}
+        headline, err = _parse_predict_request(data)
+        if err:
+            return jsonify(err[0]), err[1]
 
         source_url = data.get("source_url", "").strip()
         user_id    = get_current_user_id()  # JWT only
 
         # STEP 1: URL fast-path
-        url_cred: Dict = {}
-        vr:       Dict = {}
-
-        if source_url:
-            url_cred = source_verifier.check_url_credibility(source_url)
-            if url_cred.get("credibility") == "satire":
-                return jsonify({
-                    "prediction": "SATIRE", "confidence": 0.99,
-                    "method": "url_credibility",
-                    "source_verification": {
-                        "verified": False, "sources_found": 0,
-                        "credibility_tier": "satire",
-                        "explanation": "Known satire publication - content is intentionally fictional.",
-                        "twitter_verified": 0, "fact_checked": False,
-                    },
-                    "url_credibility": url_cred,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }), 200
-
-            if url_cred.get("credibility") == "unreliable":
-                vr = {
-                    "verified": False, "confidence": 0.95,
-                    "credibility_tier": "unreliable",
-                    "explanation": "Known misinformation source",
-                    "sources_found": 0, "fact_check_results": {},
-                    "twitter_verification": {}, "trusted_sources": [],
-                }
-
+        url_cred, vr, early = _url_precheck(source_url)
+        if early:
+            return jsonify(early), 200
         if not vr:
             vr = source_verifier.verify_claim(headline)
 
         # STEP 2: Claims
-        raw_claims = claim_extractor.extract_claims(headline)
-        cv: List[Dict] = []
-        for c in raw_claims[:3]:
-            cr = source_verifier.verify_claim(c)
-            cv.append({"claim": c, "verified": cr.get("verified", False),
-                       "confidence": cr.get("confidence", 0.5)})
+        cv = [_claim_entry(c, source_verifier.verify_claim(c, priority="low"))
+              for c in claim_extractor.extract_claims(headline)[:3]]
 
         # STEP 3: NLP
         comps: Dict = {}
-        if data.get("use_nlp", True):
-            try:
-                comps["nlp"] = detector.analyze(headline)
-            except Exception as e:
-                logger.error(f"NLP error: {e}")
+        if data.get("use_nlp", True) and (nlp := _nlp_component(headline)) is not None:
+            comps["nlp"] = nlp
 
         # STEP 4: Transformer
-        if data.get("use_transformer", True) and TRANSFORMER_MODELS_AVAILABLE and model_detector:
-            try:
-                t = model_detector.predict(headline)
-                comps["transformer"] = {
-                    "prediction": t.get("prediction", "UNKNOWN"),
-                    "confidence": t.get("confidence", 0.5),
-                    "raw_score":  t.get("raw_score", 0.5),
-                }
-            except Exception as e:
-                logger.error(f"Transformer error: {e}")
+        if data.get("use_transformer", True) and (t := _transformer_component(headline)) is not None:
+            comps["transformer"] = t
 
-        # STEP 5: Learned ensemble
+        # STEP 5-6: Ensemble + X reality modulation
         learned_ensemble.maybe_refresh()
-        nlp_r = comps.get("nlp", {"prediction": "REAL", "confidence": 0.5})
-        t_r   = comps.get("transformer")
-        fv    = LearnedEnsemble.build_features(nlp_r, t_r, vr, cv)
-        raw_label, fake_prob = learned_ensemble.predict(fv)
-
-        # ---- X REALITY VALIDATION LAYER ----
         x_result = x_reality_engine.analyze(headline)
-        x_social_fake = x_result.get("social_fake_prob", 0.0)
-        
-        # Confidence modulation (NOT replacement)
-        twitter_verified_mentions = x_result.get("evidence", {}).get("verified_mentions", 0)
-        TWITTER_WEIGHT  = 0.40
-        ENSEMBLE_WEIGHT = 0.60
-
-        if twitter_verified_mentions >= 3:
-            twitter_score = max(0.0, x_social_fake - 0.4)  # strong REAL signal
-        elif twitter_verified_mentions >= 1:
-            twitter_score = max(0.0, x_social_fake - 0.2)  # mild REAL signal
-        elif x_social_fake > 0.0:
-            twitter_score = x_social_fake                   # strong FAKE signal
-        else:
-            twitter_score = fake_prob                        # no Twitter data, ignore it
-            TWITTER_WEIGHT  = 0.0
-            ENSEMBLE_WEIGHT = 1.0
-        fake_prob = min(1.0, (ENSEMBLE_WEIGHT * fake_prob) + (TWITTER_WEIGHT * twitter_score))
-
-
-        # STEP 6: Confidence adjustment
-        conf = fake_prob if raw_label == "FAKE" else (1 - fake_prob)
-        preds = [comps[k]["prediction"] for k in ("nlp","transformer") if k in comps]
-        if preds and all(p == raw_label for p in preds):
-            conf = min(conf * 1.08, 1.0)
-        if len(preds) >= 2 and len(set(preds)) > 1:
-            conf *= 0.88
-        if vr.get("verified") and raw_label == "REAL":
-            conf = min(conf * 1.05, 1.0)
-
-        final = raw_label if conf >= 0.60 else "UNVERIFIED"
-        method = ("learned_ensemble" if SKLEARN_AVAILABLE and learned_ensemble.model
-                  else "weighted_fallback")
+        outcome  = _score_prediction(vr, cv, comps, x_result)
 
         # STEP 7: Persist
-        if mongo_db is not None and user_id:
-            try:
-                mongo_db.predictions.insert_one({
-                    "user_id": user_id, "headline": headline,
-                    "prediction": final, "confidence": conf,
-                    "method": method, "feature_vector": fv,
-                    "source_verification": vr, "url_credibility": url_cred,
-                    "claim_verification": cv,
-                    "component_results": {
-                        k: {kk: vv for kk, vv in v.items() if kk != "features"}
-                        for k, v in comps.items()
-                    },
-                    "timestamp": datetime.utcnow(),
-                })
-            except Exception as e:
-                logger.error(f"Failed to save prediction: {e}")
+        apply_writes(_prediction_writes(user_id, headline, outcome, vr, url_cred, cv, comps))
 
         # Seed quiz candidate pool from high-confidence predictions
-        _maybe_add_quiz_candidate(headline, final, conf, comps, fv)
+        _maybe_add_quiz_candidate(headline, outcome["final"], outcome["conf"], comps, outcome["fv"])
 
         log_interaction("prediction", {
-            "headline_length": len(headline), "method": method,
+            "headline_length": len(headline), "method": outcome["method"],
             "sources_checked": vr.get("sources_found", 0),
         }, user_id=user_id)
 
-        return jsonify({
-            "prediction":      final,
-            "confidence":      round(conf, 4),
-            "fake_probability":round(fake_prob, 4),
-            "method":          method,
-            "source_verification": {
-                "verified":         vr.get("verified", False),
-                "sources_found":    vr.get("sources_found", 0),
-                "trusted_sources":  vr.get("trusted_sources", [])[:3],
-                "credibility_tier": vr.get("credibility_tier", "unknown"),
-                "explanation":      vr.get("explanation", ""),
-                "twitter_verified": vr.get("twitter_verification", {}).get("verified_mentions", 0),
-                "fact_checked":     vr.get("fact_check_results", {}).get("found", False),
-            },
-            "url_credibility":  url_cred or None,
-            "claim_verification": cv,
-            "ensemble_features": {
-                name: round(val, 4)
-                for name, val in zip(LearnedEnsemble.FEATURE_NAMES, fv)
-            },
-            "component_results": {
-                k: {kk: vv for kk, vv in v.items() if kk != "features"}
-                for k, v in comps.items()
-            },
-            "x_reality": {
-                "enabled": x_result.get("enabled", False),
-                "social_fake_probability": round(x_social_fake, 4),
-                "evidence": x_result.get("evidence", {})
-            },
-            "timestamp": datetime.utcnow().isoformat(),
-        }), 200
+        return jsonify(_prediction_response(outcome, vr, url_cred, cv, comps, x_result)), 200
 
     except Exception as e:
         logger.exception("Prediction pipeline error")
@@ -1272,7 +1578,8 @@ def submit_feedback():
         if label not in ("REAL", "FAKE"):
             return jsonify({"error": "correct_label must be REAL or FAKE"}), 400
         try:
-            doc = mongo_db.predictions.find_one({"_id": ObjectId(pid)})
+            doc = (mongo_db.predictions.find_one({"_id": ObjectId(pid)}, {"feature_vector": 1})
+                   or (archive.find_one(user_id, ObjectId(pid)) if archive.enabled() else None))
         except Exception:
             return jsonify({"error": "Invalid prediction_id"}), 400
         if not doc:
@@ -1341,27 +1648,141 @@ def compare_sources():
 #  HISTORY + STATS
 # -------------------------------------------------------------------------
 
+def _encode_history_cursor(doc: Dict) -> str:
+    raw = json.dumps({"t": doc["timestamp"].isoformat(), "id": str(doc["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_history_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    return datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+
+
+def _history_filter(user_id: str, cursor: Optional[str]) -> Dict:
+    q: Dict = {"user_id": user_id}
+    if cursor:
+        ts, oid = _decode_history_cursor(cursor)
+        # Strictly after the last item in (timestamp desc, _id desc) order
+        q["$or"] = [{"timestamp": {"$lt": ts}}, {"timestamp": ts, "_id": {"$lt": oid}}]
+    return q
+
+
+def _history_item(doc: Dict) -> Dict:
+    doc["id"] = str(doc.pop("_id"))
+    doc.pop("detail_hash", None)
+    if isinstance(doc.get("timestamp"), datetime):
+        doc["timestamp"] = doc["timestamp"].isoformat()
+    return doc
+
+
+def _archived_item(doc: Dict) -> Dict:
+    """A cold-tier row (archive.py) trimmed to the fields history returns."""
+    return {k: v for k, v in doc.items() if k == "_id" or k in prediction_details.DETAIL_PROJECTION}
+
+
+def _user_prediction_total(user_id: str) -> int:
+    """Per-user total from stats_counters (kept by $inc in _prediction_writes)."""
+    return stats_counters.read(mongo_db, stats_counters.user_key(user_id)).get("predictions", 0)
+
+
 @app.route("/api/history", methods=["GET"])
 def get_history():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({"error": "Authentication required"}), 401
     try:
-        page  = max(int(request.args.get("page", 1)), 1)
-        limit = min(int(request.args.get("limit", 10)), 50)
-        skip  = (page - 1) * limit
-        cursor = (
+        limit  = min(max(int(request.args.get("limit", 10)), 1), 50)
+        cursor = request.args.get("cursor") or None
+        detail = request.args.get("detail", "").lower() in ("1", "true")
+        try:
+            q = _history_filter(user_id, cursor)
+        except (ValueError, KeyError, TypeError, InvalidId):
+            return jsonify({"error": "Invalid cursor"}), 400
+        projection = prediction_details.DETAIL_PROJECTION if detail else prediction_details.SUMMARY_PROJECTION
+        docs = list(
             mongo_db.predictions
-            .find({"user_id": user_id}, {"_id": 0, "feature_vector": 0})
-            .sort("timestamp", -1).skip(skip).limit(limit)
+            .find(q, projection)
+            .sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1)
         )
-        items = []
-        for doc in cursor:
-            if isinstance(doc.get("timestamp"), datetime):
-                doc["timestamp"] = doc["timestamp"].isoformat()
-            items.append(doc)
-        total = mongo_db.predictions.count_documents({"user_id": user_id})
-        return jsonify({"history": items, "total": total, "page": page, "limit": limit}), 200
+        if len(docs) <= limit and archive.enabled():
+            # MongoDB has nothing older: continue the page from the cold tier
+            before = ((docs[-1]["timestamp"], docs[-1]["_id"]) if docs
+                      else _decode_history_cursor(cursor) if cursor else None)
+            docs += [_archived_item(d) for d in archive.read_user(user_id, before, limit + 1 - len(docs))]
+        more  = len(docs) > limit
+        docs  = docs[:limit]
+        token = _encode_history_cursor(docs[-1]) if more else None
+        if detail:
+            prediction_details.attach(mongo_db, docs)
+        items = [_history_item(d) for d in docs]
+        return jsonify({"history": items, "total": _user_prediction_total(user_id),
+                        "limit": limit, "next": token}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/history/export", methods=["GET"])
+def export_history():
+    """Stream the caller's full history as NDJSON, newest first, in constant memory."""
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+    if mongo_db is None:
+        return jsonify({"error": "Database unavailable"}), 503
+
+    def flush(batch: List[Dict]) -> str:
+        prediction_details.attach(mongo_db, batch)
+        return "".join(json.dumps(_history_item(d), default=str) + "\n" for d in batch)
+
+    def generate():
+        cursor = (mongo_db.predictions
+                  .find({"user_id": user_id}, prediction_details.DETAIL_PROJECTION)
+                  .sort([("timestamp", -1), ("_id", -1)])
+                  .batch_size(500))
+        batch: List[Dict] = []
+        last = None
+        try:
+            for doc in cursor:
+                last = (doc["timestamp"], doc["_id"])
+                batch.append(doc)
+                if len(batch) == 500:
+                    yield flush(batch)
+                    batch = []
+        finally:
+            cursor.close()
+        if archive.enabled():
+            for doc in archive.iter_user(user_id, before=last):
+                batch.append(_archived_item(doc))
+                if len(batch) == 500:
+                    yield flush(batch)
+                    batch = []
+        if batch:
+            yield flush(batch)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": "attachment; filename=veritas-history.ndjson"})
+
+
+@app.route("/api/history/<prediction_id>", methods=["GET"])
+def get_history_item(prediction_id):
+    """One of the caller's predictions with its full verification detail."""
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+    try:
+        oid = ObjectId(prediction_id)
+    except (InvalidId, TypeError):
+        return jsonify({"error": "Invalid prediction_id"}), 400
+    try:
+        doc = mongo_db.predictions.find_one({"_id": oid, "user_id": user_id},
+                                            prediction_details.DETAIL_PROJECTION)
+        if not doc and archive.enabled():
+            doc = archive.find_one(user_id, oid)
+            doc = _archived_item(doc) if doc else None
+        if not doc:
+            return jsonify({"error": "Prediction not found"}), 404
+        prediction_details.attach(mongo_db, [doc])
+        return jsonify(_history_item(doc)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1370,11 +1791,11 @@ def get_history():
 def get_stats():
     try:
         user_id = get_current_user_id()
-        q = {"user_id": user_id} if user_id else {}
-        total = mongo_db.predictions.count_documents(q) if mongo_db is not None else 0
-        fake  = mongo_db.predictions.count_documents({**q, "prediction": "FAKE"})  if mongo_db is not None else 0
-        real  = mongo_db.predictions.count_documents({**q, "prediction": "REAL"})  if mongo_db is not None else 0
-        unv   = mongo_db.predictions.count_documents({**q, "prediction": "UNVERIFIED"}) if mongo_db is not None else 0
+        key     = stats_counters.user_key(user_id) if user_id else stats_counters.GLOBAL
+        doc     = stats_counters.read(mongo_db, key) if mongo_db is not None else {}
+        labels  = doc.get("labels") or {}
+        total   = doc.get("predictions", 0)
+        fake, real, unv = labels.get("FAKE", 0), labels.get("REAL", 0), labels.get("UNVERIFIED", 0)
         return jsonify({
             "total": total, "fake": fake, "real": real, "unverified": unv,
             "fake_ratio": round(fake / total, 3) if total else 0,
@@ -1383,6 +1804,50 @@ def get_stats():
         return jsonify({"error": str(e)}), 500
 
 
+# Widest window per request, in buckets' own units
+TIMESERIES_MAX_SPAN = {"hour": timedelta(days=31), "day": timedelta(days=731)}
+TIMESERIES_DEFAULT_SPAN = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+
+def _parse_utc(value: str) -> datetime:
+    """ISO-8601 timestamp as naive UTC, like the stored buckets; naive input is taken as UTC."""
+    t = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    return t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t
+
+
+@app.route("/api/stats/timeseries", methods=["GET"])
+def get_stats_timeseries():
+    """Per-hour or per-day prediction counts from the rollup buckets (rollups.py)."""
+    if mongo_db is None:
+        return jsonify({"error": "MongoDB not configured"}), 503
+    granularity = request.args.get("granularity", "day")
+    if granularity not in rollups.GRANULARITIES:
+        return jsonify({"error": "granularity must be 'hour' or 'day'"}), 400
+    try:
+        until = (_parse_utc(request.args["to"]) if request.args.get("to")
+                 else datetime.utcnow())
+        since = (_parse_utc(request.args["from"]) if request.args.get("from")
+                 else until - TIMESERIES_DEFAULT_SPAN[granularity])
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO-8601 timestamps"}), 400
+    if since >= until or until - since > TIMESERIES_MAX_SPAN[granularity]:
+        return jsonify({"error": f"range must be positive and at most "
+                                 f"{TIMESERIES_MAX_SPAN[granularity].days} days"}), 400
+    try:
+        topic = request.args.get("topic") or None
+        done  = rollups.folded_until(mongo_db)
+        return jsonify({
+            "granularity":  granularity,
+            "from":         since.isoformat(),
+            "to":           until.isoformat(),
+            "topic":        topic,
+            "folded_until": done.isoformat() if done else None,
+            "points":       rollups.series(mongo_db, granularity, since, until, topic),
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # -------------------------------------------------------------------------
 #  NEWS CACHE
 # -------------------------------------------------------------------------
@@ -1396,6 +1861,7 @@ def get_cached_news(topic: str, cache_hours: int = 1):
                 return entry.get("articles", []), True
         except Exception:
             pass
+    newsapi = get_newsapi()
     if not newsapi:
         return [], False
     cat_map = {
@@ -1462,7 +1928,8 @@ def report_content():
         label_str = d.get("correct_label", "").upper().strip()
         if label_str in ("REAL", "FAKE") and d.get("prediction_id"):
             try:
-                pd_doc = mongo_db.predictions.find_one({"_id": ObjectId(d["prediction_id"])})
+                pd_doc = mongo_db.predictions.find_one({"_id": ObjectId(d["prediction_id"])},
+                                                       {"feature_vector": 1})
                 if pd_doc and pd_doc.get("feature_vector"):
                     learned_ensemble.update_from_feedback(
                         pd_doc["feature_vector"], 1 if label_str == "FAKE" else 0
@@ -1494,88 +1961,101 @@ QUIZ_MIN_RESPONSES        = 10     # responses needed before consensus check
 QUIZ_CANDIDATE_EXPIRY_DAYS = 30    # expire old candidates
 
 
-# Topic keywords (lightweight, no extra model needed)
-_TOPIC_KEYWORDS: Dict[str, List[str]] = {
-    "politics":     ["president","government","election","congress","senate","democrat","republican","parliament","minister","policy","vote","law","military","war","nato"],
-    "health":       ["covid","virus","vaccine","cancer","drug","medicine","doctor","hospital","disease","health","fda","who","clinical","study","treatment"],
-    "technology":   ["ai","robot","tech","software","app","google","apple","microsoft","crypto","bitcoin","hack","cyber","data","algorithm","5g","internet"],
-    "science":      ["nasa","climate","earth","space","research","scientist","study","nature","physics","biology","chemistry","discovery","experiment"],
-    "business":     ["stock","market","economy","bank","finance","company","startup","billion","investment","trade","gdp","inflation","fed","revenue"],
-    "entertainment":["celebrity","movie","music","singer","actor","award","grammy","oscar","hollywood","netflix","sport","game","football","basketball"],
-}
+def _quiz_candidate_doc(headline: str, prediction: str, confidence: float,
+                        component_results: Dict, feature_vector: List[float]) -> Optional[Dict]:
+    """
+    Candidate document for a prediction, or None if it does not qualify.
+    Only REAL/FAKE predictions above threshold are kept to avoid garbage questions.
+    """
+    if prediction not in ("REAL", "FAKE"):
+        return None
+    if confidence < QUIZ_CANDIDATE_THRESHOLD:
+        return None
+
+    topic = topics.classify(headline)
+
+    # Build readable explanation from component signals
+    explanation_parts = []
+    nlp = component_results.get("nlp", {})
+    if nlp.get("confidence", 0) > 0.75:
+        explanation_parts.append(
+            f"NLP analysis found this {nlp['prediction'].lower()} "
+            f"with {nlp['confidence']*100:.0f}% confidence"
+        )
+    transformer = component_results.get("transformer", {})
+    if transformer.get("confidence", 0) > 0.75:
+        explanation_parts.append(
+            f"AI transformer model classified it as {transformer['prediction'].lower()} "
+            f"({transformer['confidence']*100:.0f}% confidence)"
+        )
+    explanation = ". ".join(explanation_parts) if explanation_parts else \
+        f"Our ensemble model detected this as {prediction.lower()} with high confidence."
+
+    return {
+        "headline":          headline,
+        "headline_key":      headline_key(headline),
+        "prediction":        prediction,          # system's ground-truth label
+        "confidence":        confidence,
+        "topic":             topic,
+        "feature_vector":    feature_vector,
+        "component_results": _strip_features(component_results),
+        "explanation":       explanation,
+        "created_at":        datetime.utcnow(),
+        "expires_at":        datetime.utcnow() + timedelta(days=QUIZ_CANDIDATE_EXPIRY_DAYS),
+        "used_count":        0,
+        "fake_votes":        0,            # $inc'd by /api/quiz/submit
+        "total_votes":       0,
+        "consensus_label":   None,         # set when consensus is reached
+    }
 
 
-def _classify_topic(headline: str) -> str:
-    hl = headline.lower()
-    scores = {topic: sum(1 for kw in kws if kw in hl)
-              for topic, kws in _TOPIC_KEYWORDS.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "general"
+def _quiz_candidate_upsert(doc: Dict) -> Tuple[Dict, Dict]:
+    """
+    (filter, update) inserting ``doc`` unless a candidate with the same
+    normalised headline exists; the unique headline_key index settles races.
+    """
+    return {"headline_key": doc["headline_key"]}, \
+        {"$setOnInsert": {k: v for k, v in doc.items() if k != "headline_key"}}
 
 
 def _maybe_add_quiz_candidate(headline: str, prediction: str, confidence: float,
                                component_results: Dict, feature_vector: List[float]):
-    """
-    Called from /api/predict after final result is computed.
-    Only stores REAL/FAKE predictions above threshold to avoid garbage questions.
-    """
+    """Called from /api/predict after final result is computed."""
     if mongo_db is None:
         return
-    if prediction not in ("REAL", "FAKE"):
-        return
-    if confidence < QUIZ_CANDIDATE_THRESHOLD:
+    doc = _quiz_candidate_doc(headline, prediction, confidence, component_results, feature_vector)
+    if doc is None:
         return
     try:
-        # Dedup: skip if identical headline seen in last 30 days
-        recent_cutoff = datetime.utcnow() - timedelta(days=QUIZ_CANDIDATE_EXPIRY_DAYS)
-        existing = mongo_db.quiz_candidates.find_one({
-            "headline": headline,
-            "created_at": {"$gte": recent_cutoff},
-        })
-        if existing:
-            return
-
-        topic = _classify_topic(headline)
-
-        # Build readable explanation from component signals
-        explanation_parts = []
-        nlp = component_results.get("nlp", {})
-        if nlp.get("confidence", 0) > 0.75:
-            explanation_parts.append(
-                f"NLP analysis found this {nlp['prediction'].lower()} "
-                f"with {nlp['confidence']*100:.0f}% confidence"
-            )
-        transformer = component_results.get("transformer", {})
-        if transformer.get("confidence", 0) > 0.75:
-            explanation_parts.append(
-                f"AI transformer model classified it as {transformer['prediction'].lower()} "
-                f"({transformer['confidence']*100:.0f}% confidence)"
-            )
-        explanation = ". ".join(explanation_parts) if explanation_parts else \
-            f"Our ensemble model detected this as {prediction.lower()} with high confidence."
-
-        mongo_db.quiz_candidates.insert_one({
-            "headline":          headline,
-            "prediction":        prediction,          # system's ground-truth label
-            "confidence":        confidence,
-            "topic":             topic,
-            "feature_vector":    feature_vector,
-            "component_results": {
-                k: {kk: vv for kk, vv in v.items() if kk != "features"}
-                for k, v in component_results.items()
-            },
-            "explanation":       explanation,
-            "created_at":        datetime.utcnow(),
-            "expires_at":        datetime.utcnow() + timedelta(days=QUIZ_CANDIDATE_EXPIRY_DAYS),
-            "used_count":        0,
-            "responses":         [],           # filled by /api/quiz/submit
-            "consensus_label":   None,         # set when consensus is reached
-        })
+        result = mongo_db.quiz_candidates.update_one(*_quiz_candidate_upsert(doc), upsert=True)
+        if result.upserted_id is None:
+            return  # seen within its lifetime
+        doc["_id"] = result.upserted_id
+        apply_writes([stats_counters.candidate_write(doc)])
+        candidate_pool.add(doc)
+    except pymongo_errors.DuplicateKeyError:
+        pass  # a concurrent request added it first
     except Exception as e:
         logger.warning(f"Failed to add quiz candidate: {e}")
 
 
-def _check_candidate_consensus(candidate_id):
+def _record_candidate_vote(candidate_id, answer: str):
+    """
+    Count one quiz answer on a candidate with a single find_one_and_update
+    and check consensus on the returned counters. The answers themselves
+    live only in quiz_attempts.
+    """
+    counts = mongo_db.quiz_candidates.find_one_and_update(
+        {"_id": candidate_id},
+        {"$inc": {"total_votes": 1, "fake_votes": 1 if answer == "FAKE" else 0}},
+        projection={"fake_votes": 1, "total_votes": 1, "consensus_label": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if counts:
+        _check_candidate_consensus(candidate_id, counts)
+
+
+def _check_candidate_consensus(candidate_id, counts: Dict):
     """
     After a quiz answer is recorded, check if consensus has been reached
     on this candidate and feed it back into the learned ensemble.
@@ -1583,18 +2063,13 @@ def _check_candidate_consensus(candidate_id):
     if mongo_db is None:
         return
     try:
-        doc = mongo_db.quiz_candidates.find_one({"_id": candidate_id})
-        if not doc:
-            return
-        responses = doc.get("responses", [])
-        if len(responses) < QUIZ_MIN_RESPONSES:
+        total_votes = counts.get("total_votes", 0)
+        if total_votes < QUIZ_MIN_RESPONSES:
             return
-        if doc.get("consensus_label"):
+        if counts.get("consensus_label"):
             return  # already processed
 
-        fake_votes  = sum(1 for r in responses if r.get("answer") == "FAKE")
-        total_votes = len(responses)
-        fake_ratio  = fake_votes / total_votes
+        fake_ratio = counts.get("fake_votes", 0) / total_votes
 
         if fake_ratio >= QUIZ_CONSENSUS_THRESHOLD:
             consensus = "FAKE"
@@ -1603,11 +2078,15 @@ def _check_candidate_consensus(candidate_id):
         else:
             return  # no strong consensus yet
 
-        # Store consensus
-        mongo_db.quiz_candidates.update_one(
-            {"_id": candidate_id},
-            {"$set": {"consensus_label": consensus, "consensus_at": datetime.utcnow()}}
+        # Store consensus (the guard keeps a concurrent check from counting it twice)
+        doc = mongo_db.quiz_candidates.find_one_and_update(
+            {"_id": candidate_id, "consensus_label": None},
+            {"$set": {"consensus_label": consensus, "consensus_at": datetime.utcnow()}},
+            projection={"feature_vector": 1},
         )
+        if not doc:
+            return
+        apply_writes([stats_counters.consensus_write()])
 
         # Feed back into learned ensemble if feature vector available
         fv = doc.get("feature_vector")
@@ -1622,31 +2101,35 @@ def _check_candidate_consensus(candidate_id):
         logger.warning(f"Consensus check error: {e}")
 
 
+QUIZ_WEAK_TOPICS_TTL = float(os.getenv("QUIZ_WEAK_TOPICS_TTL_SECONDS", "60"))
+_weak_topics_cache   = TTLCache(maxsize=int(os.getenv("QUIZ_WEAK_TOPICS_CACHE_SIZE", "4096")))
+
+
 def _get_user_weak_topics(user_id: str) -> List[str]:
     """
-    Returns topics ordered worst→best accuracy for this user.
+    Returns topics ordered worst→best accuracy for this user, from the
+    topic_attempts / topic_correct counters submit_quiz keeps in user_stats.
+    Cached per user for QUIZ_WEAK_TOPICS_TTL seconds.
     Falls back to all topics if no data.
     """
-    all_topics = list(_TOPIC_KEYWORDS.keys()) + ["general"]
+    all_topics = topics.TOPICS + [topics.GENERAL]
     if mongo_db is None or not user_id:
         return all_topics
 
+    cached = _weak_topics_cache.get(user_id)
+    if cached is not None:
+        return cached["topics"]
     try:
-        # Get all attempts that reference a quiz_candidate (have candidate_id)
-        pipeline = [
-            {"$match": {"userId": user_id, "candidate_id": {"$exists": True}}},
-            {"$group": {
-                "_id": "$topic",
-                "total":   {"$sum": 1},
-                "correct": {"$sum": {"$cond": ["$is_correct", 1, 0]}}
-            }},
-        ]
-        results = list(mongo_db.quiz_attempts.aggregate(pipeline))
-        accuracy = {r["_id"]: r["correct"] / r["total"] for r in results if r["total"] > 0}
+        stats    = mongo_db.user_stats.find_one(
+            {"userId": user_id}, {"_id": 0, "topic_attempts": 1, "topic_correct": 1}) or {}
+        attempts = stats.get("topic_attempts") or {}
+        correct  = stats.get("topic_correct") or {}
+        accuracy = {t: correct.get(t, 0) / n for t, n in attempts.items() if n > 0}
 
         # Topics with data sorted worst→best, then unseen topics appended
         seen   = sorted(accuracy.keys(), key=lambda t: accuracy[t])
         unseen = [t for t in all_topics if t not in accuracy]
+        _weak_topics_cache.set(user_id, {"topics": seen + unseen}, QUIZ_WEAK_TOPICS_TTL)
         return seen + unseen
     except Exception as e:
         logger.warning(f"Weak topic lookup error: {e}")
@@ -1691,97 +2174,22 @@ def get_quiz_questions():
         questions = []
 
         if mongo_db is not None:
-            now = datetime.utcnow()
-            base_filter = {"expires_at": {"$gt": now}, "prediction": {"$in": ["REAL", "FAKE"]}}
-
-            if diff != "mixed":
-                # Map difficulty to confidence bands
-                conf_bands = {
-                    "easy":   {"$gte": 0.90},
-                    "medium": {"$gte": 0.70, "$lt": 0.90},
-                    "hard":   {"$gte": 0.50, "$lt": 0.70},
-                }
-                if diff in conf_bands:
-                    base_filter["confidence"] = conf_bands[diff]
-
             # Get user weak topics for personalised selection
-            weak_topics = _get_user_weak_topics(user_id) if user_id else list(_TOPIC_KEYWORDS.keys())
-
-            selected_ids = set()
-            qs_raw       = []
-
-            # Phase 1: target weak topics (70% of limit)
-            target_count = max(1, int(limit * 0.7))
-            for topic in weak_topics:
-                if len(qs_raw) >= target_count:
-                    break
-                topic_filter = {**base_filter, "topic": topic, "_id": {"$nin": list(selected_ids)}}
-                batch = list(
-                    mongo_db.quiz_candidates
-                    .find(topic_filter)
-                    .sort("used_count", 1)   # least-shown first
-                    .limit(target_count - len(qs_raw))
-                )
-                for q in batch:
-                    selected_ids.add(q["_id"])
-                    qs_raw.append(q)
-
-            # Phase 2: fill remainder from any topic (or borderline for challenge)
-            remain = limit - len(qs_raw)
-            if remain > 0:
-                fill_filter = {**base_filter, "_id": {"$nin": list(selected_ids)}}
-                # Mix in uncertain predictions for extra challenge
-                fill_filter["confidence"] = {"$lt": 0.80}
-                batch = list(
-                    mongo_db.quiz_candidates
-                    .find(fill_filter)
-                    .sort("used_count", 1)
-                    .limit(remain)
-                )
-                for q in batch:
-                    selected_ids.add(q["_id"])
-                    qs_raw.append(q)
-
-            # Phase 3: if still not enough, grab high-confidence from any topic
-            if len(qs_raw) < limit:
-                fill_filter = {**base_filter, "_id": {"$nin": list(selected_ids)}}
-                batch = list(
-                    mongo_db.quiz_candidates
-                    .find(fill_filter)
-                    .sort("used_count", 1)
-                    .limit(limit - len(qs_raw))
-                )
-                qs_raw.extend(batch)
-
-            # Increment used_count for selected candidates
-            if selected_ids:
-                mongo_db.quiz_candidates.update_many(
-                    {"_id": {"$in": list(selected_ids)}},
-                    {"$inc": {"used_count": 1}}
-                )
-
-            # Shape output — include candidate_id so submit can reference it
-            for q in qs_raw:
-                conf  = q.get("confidence", 0.9)
-                # Map confidence to difficulty label
-                if conf >= 0.90:   diff_label = "easy"
-                elif conf >= 0.70: diff_label = "medium"
-                else:              diff_label = "hard"
+            weak_topics = _get_user_weak_topics(user_id) if user_id else list(topics.TOPICS)
 
+            # One in-memory pass over this worker's pool index (quiz_pool.py)
+            for q in candidate_pool.select(weak_topics, limit, diff):
                 questions.append({
                     "id":             str(q["_id"]),
                     "candidate_id":   str(q["_id"]),
                     "headline":       q["headline"],
                     "correct_answer": q["prediction"],
-                    "topic":          q.get("topic", "general"),
-                    "difficulty":     diff_label,
-                    "explanation":    q.get("explanation", ""),
+                    "topic":          q["topic"],
+                    "difficulty":     q["difficulty"],
+                    "explanation":    q["explanation"],
                     "source":         "ai_generated",
                     # Include key signal hints (educational)
-                    "signals": {
-                        "nlp_confidence":         round(q.get("component_results", {}).get("nlp", {}).get("confidence", 0), 2),
-                        "transformer_confidence": round(q.get("component_results", {}).get("transformer", {}).get("confidence", 0), 2),
-                    }
+                    "signals":        q["signals"],
                 })
 
         # Fallback to static questions if pool empty
@@ -1828,12 +2236,14 @@ def submit_quiz():
         is_candidate = False
         cand_oid    = None
 
-        # Try to resolve from quiz_candidates first
+        # Try to resolve from quiz_candidates first: the worker's pool index,
+        # then MongoDB for candidates it does not hold (expired, not yet polled)
         if mongo_db is not None and (cand_id or q_id):
             try:
                 lookup_id = cand_id or q_id
                 cand_oid  = ObjectId(lookup_id)
-                doc = mongo_db.quiz_candidates.find_one({"_id": cand_oid})
+                doc = candidate_pool.get(cand_oid) or mongo_db.quiz_candidates.find_one(
+                    {"_id": cand_oid}, {"prediction": 1, "explanation": 1, "topic": 1})
                 if doc:
                     correct      = doc.get("prediction")
                     explanation  = doc.get("explanation", "")
@@ -1842,12 +2252,15 @@ def submit_quiz():
             except Exception:
                 pass  # not a valid ObjectId — fall through to static
 
-        # Fallback to static questions
+        # Fallback to curated questions (cached map of quiz_questions)
         if correct is None and mongo_db is not None:
-            doc = mongo_db.quiz_questions.find_one({"id": q_id})
+            doc = question_bank.get(q_id)
             if doc:
                 correct     = doc.get("correct_answer")
                 explanation = doc.get("explanation", "")
+                # Imported topics are free text; only classifier topics become counter keys
+                if doc.get("topic") in topics.TOPICS:
+                    topic = doc["topic"]
 
         if correct is None:
             for q in _static_questions():
@@ -1877,34 +2290,22 @@ def submit_quiz():
             if cand_oid:
                 attempt_doc["candidate_id"] = cand_oid
 
-            mongo_insert_one("quiz_attempts", attempt_doc)
-
-            mongo_db.user_stats.update_one(
-                {"userId": user_id},
-                {"$inc": {
+            # The response does not depend on these, so they are batched off the request path
+            write_behind.submit([
+                ("quiz_attempts", "insert_one", (attempt_doc,), {}),
+                ("user_stats", "update_one", ({"userId": user_id}, {"$inc": {
                     "totalPoints":   pts,
                     "totalAttempts": 1,
                     "correctAnswers": 1 if is_correct else 0,
                     f"topic_attempts.{topic}": 1,
                     f"topic_correct.{topic}":  1 if is_correct else 0,
-                }},
-                upsert=True,
-            )
+                }, "$set": {"updatedAt": datetime.utcnow()}}), {"upsert": True}),
+            ])
 
-        # Push response to candidate and check for consensus
+        # Count the vote on the candidate and check for consensus
         if is_candidate and cand_oid and mongo_db is not None:
             try:
-                mongo_db.quiz_candidates.update_one(
-                    {"_id": cand_oid},
-                    {"$push": {"responses": {
-                        "user_id":    user_id,
-                        "answer":     answer,
-                        "is_correct": is_correct,
-                        "timestamp":  datetime.utcnow(),
-                    }}}
-                )
-                # Check consensus in background (synchronous but fast)
-                _check_candidate_consensus(cand_oid)
+                _record_candidate_vote(cand_oid, answer)
             except Exception as e:
                 logger.warning(f"Candidate response update error: {e}")
 
@@ -1970,21 +2371,15 @@ def quiz_pool_stats():
     try:
         if mongo_db is None:
             return jsonify({"error": "MongoDB not configured"}), 503
-        total      = mongo_db.quiz_candidates.count_documents({})
-        active     = mongo_db.quiz_candidates.count_documents({"expires_at": {"$gt": datetime.utcnow()}})
-        with_consensus = mongo_db.quiz_candidates.count_documents({"consensus_label": {"$ne": None}})
-        by_topic   = list(mongo_db.quiz_candidates.aggregate([
-            {"$group": {"_id": "$topic", "count": {"$sum": 1}}}
-        ]))
-        by_pred    = list(mongo_db.quiz_candidates.aggregate([
-            {"$group": {"_id": "$prediction", "count": {"$sum": 1}}}
-        ]))
+        pool = stats_counters.read(mongo_db, stats_counters.QUIZ_POOL)
         return jsonify({
-            "total_candidates":      total,
-            "active_candidates":     active,
-            "with_consensus":        with_consensus,
-            "by_topic":              {r["_id"]: r["count"] for r in by_topic},
-            "by_prediction":         {r["_id"]: r["count"] for r in by_pred},
+            "total_candidates":      pool.get("candidates", 0),
+            "active_candidates":     stats_counters.active_candidates(pool),
+            "with_consensus":        pool.get("with_consensus", 0),
+            "by_topic":              {t: n for t, n in (pool.get("topics") or {}).items() if n},
+            "by_prediction":         stats_counters.label_counts(pool),
+            "reconciled_at":         pool["reconciled_at"].isoformat() if pool.get("reconciled_at") else None,
+            "worker_index":          candidate_pool.stats(),
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1995,13 +2390,15 @@ def quiz_leaderboard():
     try:
         if mongo_db is None:
             return jsonify({"leaderboard": []}), 200
-        limit = min(int(request.args.get("limit", 10)), 50)
-        board = list(
-            mongo_db.user_stats
-            .find({}, {"_id": 0, "userId": 1, "totalPoints": 1, "correctAnswers": 1})
-            .sort("totalPoints", -1).limit(limit)
-        )
-        return jsonify({"leaderboard": board}), 200
+        limit  = min(int(request.args.get("limit", 10)), 50)
+        radius = min(max(int(request.args.get("neighbours", 2)), 0), 10)
+        leaderboard.refresh()
+        result = {"leaderboard": leaderboard.top(limit), "players": len(leaderboard)}
+        user_id = get_current_user_id()
+        if user_id:
+            # Caller's own rank with the players around it (leaderboard.py)
+            result["me"] = leaderboard.around(user_id, radius)
+        return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2013,7 +2410,8 @@ def quiz_leaderboard():
 @app.route("/api/chatbot/message", methods=["POST"])
 def chatbot_message():
     try:
-        if not openai.api_key:
+        openai = get_openai()
+        if openai is None:
             return jsonify({"error": "OpenAI not configured", "response": "AI chatbot unavailable."}), 503
         d       = request.get_json() or {}
         message = (d.get("message") or "").strip()
@@ -2062,36 +2460,6 @@ def get_scenarios():
     ], "count": 3}), 200
 
 
-# -------------------------------------------------------------------------
-#  BADGE SYSTEM
-# -------------------------------------------------------------------------
-
-def check_and_award_badges(user_id: str, db):
-    if not user_id or db is None:
-        return
-    try:
-        stats  = db.user_stats.find_one({"userId": user_id})
-        total  = db.quiz_attempts.count_documents({"userId": user_id})
-        corr   = db.quiz_attempts.count_documents({"userId": user_id, "is_correct": True})
-        streak = (stats or {}).get("currentStreak", 0)
-        for name, met, pts in [
-            ("First Steps",   total >= 1,    10),
-            ("Quiz Novice",   total >= 10,   50),
-            ("Truth Seeker",  total >= 50,  100),
-            ("Fact Master",   total >= 100, 200),
-            ("Perfect Score", corr  >= 10,  150),
-            ("Streak Master", streak >= 7,  100),
-        ]:
-            if met and not db.user_badges.find_one({"userId": user_id, "badgeName": name}):
-                db.user_badges.insert_one({"userId": user_id, "badgeName": name, "earnedAt": datetime.utcnow()})
-                db.user_stats.update_one(
-                    {"userId": user_id},
-                    {"$inc": {"badgesEarned": 1, "totalPoints": pts}, "$push": {"badges": name}},
-                )
-    except Exception as e:
-        logger.error(f"Badge check error: {e}")
-
-
 # =========================================================================
 #  ERROR HANDLERS
 # =========================================================================
@@ -2128,6 +2496,7 @@ def method_not_allowed(error):
 # =========================================================================
 
 if __name__ == "__main__":
+    init_worker()   # no-op unless VERITAS_PRELOAD left it to a post_fork hook
     host  = os.getenv("HOST",  "0.0.0.0")
     port  = int(os.getenv("PORT",  "8000"))
     debug = os.getenv("DEBUG", "True").lower() == "true"
@@ -2139,12 +2508,13 @@ if __name__ == "__main__":
     logger.info(f"  MongoDB   : {'connected' if mongo_db is not None else 'not connected'}")
     logger.info(f"  Ensemble  : {'learned (sklearn)' if SKLEARN_AVAILABLE else 'weighted fallback'}")
     logger.info(f"  Transform : {'loaded' if TRANSFORMER_MODELS_AVAILABLE else 'not loaded'}")
-    logger.info(f"  NewsAPI   : {'configured' if newsapi else 'not configured'}")
+    logger.info(f"  NewsAPI   : {'configured' if NEWSAPI_CONFIGURED else 'not configured'}")
     logger.info(f"  Twitter   : {'configured' if source_verifier.twitter_bearer_token else 'not configured'}")
     logger.info(f"  Google    : {'configured' if source_verifier.google_api_key else 'not configured'}")
-    logger.info(f"  OpenAI    : {'configured' if openai.api_key else 'not configured'}")
+    logger.info(f"  OpenAI    : {'configured' if OPENAI_CONFIGURED else 'not configured'}")
     logger.info("=" * 65)
-    logger.info("  Recommended: gunicorn app:app --workers 2 --threads 4 --timeout 120")
+    logger.info("  Recommended: gunicorn app:app   (gunicorn.conf.py: preload + per-worker init)")
+    logger.info("  Async     : uvicorn asgi:application --workers 2")
     logger.info("=" * 65)
 
     app.run(debug=debug, host=host, port=port, use_reloader=False)
@@ -0,0 +1,344 @@
+"""
+archive.py - cold tier for old prediction records.
+
+Predictions older than ARCHIVE_AFTER_DAYS move out of MongoDB into
+gzip-compressed, column-oriented JSON segments on disk, partitioned by month
+and by a hash of the user id:
+
+    ARCHIVE_DIR/predictions/2024-03/u7/part-20240918T031500-4821.json.gz
+
+A segment stores each field as one list ("columns") and is read whole, so
+next to it a small ``part-....users.json`` lists the user ids it holds: a
+reader skips every segment without the user and only decompresses and
+parses the ones that have some of their rows. Every run writes new parts,
+and readers drop duplicate ids, so a run that dies between writing a part
+and deleting its records only repeats work. Once the cutoff has moved past
+a month nothing more is archived into it, and its parts are compacted into
+one segment per bucket. The reader API below is what /api/history and
+feedback fall back to once a record is no longer in MongoDB.
+
+ARCHIVE_DIR must be storage every worker can read (one host, or a shared
+volume); one worker at a time archives every ARCHIVE_INTERVAL_MINUTES.
+
+    python archive.py run                     # archive now
+    python archive.py run --older-than 365
+    python archive.py compact                 # merge the parts of finished months
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+
+import prediction_details
+import stats_counters
+
+logger = logging.getLogger("veritas_ai.archive")
+
+ARCHIVE_AFTER_DAYS        = int(os.getenv("ARCHIVE_AFTER_DAYS", "0"))   # 0 disables the cold tier
+ARCHIVE_INTERVAL_MINUTES  = int(os.getenv("ARCHIVE_INTERVAL_MINUTES", "1440"))
+ARCHIVE_BATCH             = int(os.getenv("ARCHIVE_BATCH", "5000"))
+ARCHIVE_DIR = (os.getenv("ARCHIVE_DIR")
+               or os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+
+FORMAT_VERSION = 1
+COLUMNS = ("_id", "user_id", "timestamp", "headline", "topic", "prediction",
+           "confidence", "method", "detail_hash", "feature_vector")
+
+Position = Tuple[datetime, ObjectId]   # (timestamp, _id) - the history sort key
+
+
+def enabled() -> bool:
+    return ARCHIVE_AFTER_DAYS > 0
+
+
+def _root() -> str:
+    return os.path.join(ARCHIVE_DIR, "predictions")
+
+
+def _user_bucket(user_id: str) -> str:
+    # 16 buckets: fixed, since changing it would orphan existing partitions
+    return "u" + hashlib.sha1(str(user_id).encode()).hexdigest()[0]
+
+
+def _month(t: datetime) -> str:
+    return t.strftime("%Y-%m")
+
+
+# -------------------------------------------------------------------------
+#  Writing
+# -------------------------------------------------------------------------
+
+def _users_path(path: str) -> str:
+    return path[:-len(".json.gz")] + ".users.json"
+
+
+def _replace(tmp: str, path: str):
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)   # readers never see a partial file
+
+
+def _write_segment(month: str, bucket: str, rows: List[Dict]) -> str:
+    directory = os.path.join(_root(), month, bucket)
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}.json.gz"
+    path = os.path.join(directory, name)
+    segment = {
+        "version": FORMAT_VERSION,
+        "rows":    len(rows),
+        "columns": {c: [_cell(r.get(c)) for r in rows] for c in COLUMNS},
+    }
+    # The user list goes first, so a visible segment always has one
+    users = sorted({str(u) for u in segment["columns"]["user_id"] if u is not None})
+    with open(_users_path(path) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "users": users}, f, separators=(",", ":"))
+    _replace(_users_path(path) + ".tmp", _users_path(path))
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(segment, f, separators=(",", ":"))
+    _replace(tmp, path)
+    return path
+
+
+def _remove_segment(path: str):
+    for p in (path, _users_path(path)):
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+
+
+def _parts(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, n) for n in sorted(os.listdir(directory)) if n.endswith(".json.gz")]
+
+
+def compact(month: str, bucket: str) -> int:
+    """Merge the parts of one finished partition into a single segment; returns parts merged."""
+    parts = _parts(os.path.join(_root(), month, bucket))
+    if len(parts) < 2:
+        return 0
+    rows: Dict[str, Dict] = {}
+    for path in parts:
+        cols = _read_columns(path)
+        for i, oid in enumerate(cols["_id"]):
+            rows.setdefault(oid, {c: cols[c][i] for c in COLUMNS})
+    _write_segment(month, bucket, list(rows.values()))
+    for path in parts:
+        _remove_segment(path)
+    return len(parts)
+
+
+def compact_finished(before: datetime, months: Optional[List[str]] = None) -> Dict[str, int]:
+    """Compact every bucket of ``months`` (default: all) that ended before ``before``."""
+    current = _month(before)
+    merged = partitions = 0
+    for month in (months if months is not None else _months(None)):
+        if month >= current:
+            continue
+        for bucket in sorted(os.listdir(os.path.join(_root(), month))):
+            n = compact(month, bucket)
+            if n:
+                merged += n
+                partitions += 1
+    if partitions:
+        logger.info(f"Compacted {merged} archive parts into {partitions} segments")
+    return {"compacted": partitions, "parts": merged}
+
+
+def _cell(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def run(db, older_than_days: int = ARCHIVE_AFTER_DAYS, batch: int = ARCHIVE_BATCH) -> Dict[str, int]:
+    """Move predictions older than ``older_than_days`` to disk; returns counts."""
+    if older_than_days <= 0:
+        return {"archived": 0, "segments": 0}
+    # Legacy records must carry detail by hash before they leave MongoDB; the
+    # migration scans predictions unindexed, so it runs until it has completed once.
+    if not prediction_details.migrated(db):
+        prediction_details.migrate(db)
+    cutoff   = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = segments = 0
+    months: set = set()
+    while True:
+        docs = list(db.predictions.find({"timestamp": {"$lt": cutoff}},
+                                        {c: 1 for c in COLUMNS}).sort("timestamp", 1).limit(batch))
+        if not docs:
+            break
+        parts: Dict[Tuple[str, str], List[Dict]] = defaultdict(list)
+        for d in docs:
+            parts[(_month(d["timestamp"]), _user_bucket(d.get("user_id")))].append(d)
+        for (month, bucket), rows in parts.items():
+            _write_segment(month, bucket, rows)
+            months.add(month)
+        segments += len(parts)
+
+        # Counters before the delete, keyed by the batch's ids: a run that dies
+        # in between finds the same oldest records again and counts them once.
+        ids = [d["_id"] for d in docs]
+        per_user: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for d in docs:
+            per_user[d.get("user_id")][d.get("prediction")] += 1
+        batch_id = hashlib.sha1(b"".join(i.binary for i in sorted(ids))).hexdigest()
+        stats_counters.record_archived(db, batch_id, per_user)
+        db.predictions.delete_many({"_id": {"$in": ids}})
+        archived += len(docs)
+        logger.info(f"Archived {archived} predictions older than {cutoff:%Y-%m-%d}")
+    # Months wholly before the cutoff receive nothing more
+    compact_finished(cutoff, sorted(months))
+    return {"archived": archived, "segments": segments}
+
+
+def start_archiver(db, minutes: int = ARCHIVE_INTERVAL_MINUTES) -> Optional[threading.Thread]:
+    """Background archival for this worker; off unless ARCHIVE_AFTER_DAYS is set."""
+    if not enabled() or minutes <= 0:
+        return None
+
+    def loop():
+        while True:
+            try:
+                if stats_counters.claim_lease(db, "archive", minutes):
+                    run(db)
+            except Exception as e:
+                logger.warning(f"Prediction archival failed: {e}")
+            time.sleep(minutes * 60)
+
+    thread = threading.Thread(target=loop, name="prediction-archiver", daemon=True)
+    thread.start()
+    return thread
+
+
+# -------------------------------------------------------------------------
+#  Reading
+# -------------------------------------------------------------------------
+
+def _read_columns(path: str) -> Dict[str, list]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)["columns"]
+
+
+@lru_cache(maxsize=8)   # whole parsed segments are large; keep the few being paged through
+def _load_segment(path: str, mtime: float) -> Dict[str, list]:
+    return _read_columns(path)
+
+
+@lru_cache(maxsize=4096)
+def _segment_users(path: str, mtime: float) -> Optional[frozenset]:
+    """User ids in a segment, or None for parts written before user lists existed."""
+    try:
+        with open(_users_path(path), encoding="utf-8") as f:
+            return frozenset(json.load(f)["users"])
+    except FileNotFoundError:
+        return None
+
+
+def _partition_rows(month: str, bucket: str, user_id: str, retry: bool = True) -> List[Dict]:
+    rows: Dict[str, Dict] = {}
+    for path in _parts(os.path.join(_root(), month, bucket)):
+        try:
+            mtime = os.path.getmtime(path)
+            users = _segment_users(path, mtime)
+            if users is not None and str(user_id) not in users:
+                continue
+            cols = _load_segment(path, mtime)
+        except FileNotFoundError:
+            # Compacted since the listing; the merged segment holds its rows
+            if retry:
+                return _partition_rows(month, bucket, user_id, retry=False)
+            continue
+        for i, uid in enumerate(cols["user_id"]):
+            if uid == user_id and cols["_id"][i] not in rows:
+                rows[cols["_id"][i]] = {c: cols[c][i] for c in COLUMNS}
+    return [_document(r) for r in rows.values()]
+
+
+def _document(row: Dict) -> Dict:
+    """A segment row in the shape MongoDB returns it."""
+    doc = dict(row)
+    doc["_id"] = ObjectId(row["_id"])
+    doc["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return {k: v for k, v in doc.items() if v is not None}
+
+
+def _months(before: Optional[datetime]) -> List[str]:
+    if not os.path.isdir(_root()):
+        return []
+    months = sorted((m for m in os.listdir(_root()) if len(m) == 7), reverse=True)
+    return [m for m in months if before is None or m <= _month(before)]
+
+
+def iter_user(user_id: str, before: Optional[Position] = None) -> Iterator[Dict]:
+    """
+    Archived predictions of one user, newest first, strictly after ``before``
+    in (timestamp desc, _id desc) order. Reads one month partition at a time.
+    """
+    bucket = _user_bucket(user_id)
+    for month in _months(before[0] if before else None):
+        rows = sorted(_partition_rows(month, bucket, user_id),
+                      key=lambda d: (d["timestamp"], d["_id"]), reverse=True)
+        for doc in rows:
+            if before is None or (doc["timestamp"], doc["_id"]) < before:
+                yield doc
+
+
+def read_user(user_id: str, before: Optional[Position] = None, limit: int = 10) -> List[Dict]:
+    out: List[Dict] = []
+    for doc in iter_user(user_id, before):
+        out.append(doc)
+        if len(out) >= limit:
+            break
+    return out
+
+
+def find_one(user_id: str, prediction_id: ObjectId) -> Optional[Dict]:
+    """
+    An archived prediction by id. The ObjectId is minted just after the
+    record's timestamp, so its own time names the month (or the one before).
+    """
+    minted = prediction_id.generation_time.replace(tzinfo=None)
+    for month in dict.fromkeys((_month(minted), _month(minted - timedelta(minutes=1)))):
+        for doc in _partition_rows(month, _user_bucket(user_id), user_id):
+            if doc["_id"] == prediction_id:
+                return doc
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Prediction cold tier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="archive old predictions now")
+    r.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_DAYS or 180, metavar="DAYS")
+    sub.add_parser("compact", help="merge the parts of every finished month")
+    args = parser.parse_args()
+
+    if args.command == "compact":   # files only, no database needed
+        print(compact_finished(datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS or 180)))
+    else:
+        uri = os.getenv("MONGODB_URI")
+        if not uri:
+            sys.exit("MONGODB_URI environment variable is required")
+        database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+        print(run(database, older_than_days=args.older_than))
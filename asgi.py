@@ -0,0 +1,100 @@
+"""
+asgi.py - ASGI entry point.
+
+POST /api/predict is served natively by async_engine.AsyncPredictor, so one
+worker holds hundreds of in-flight verifications instead of one per thread.
+Every other route (and CORS preflight) falls through to the Flask app via
+asgiref's WSGI adapter.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 2
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+"""
+
+import json
+import logging
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as core
+from async_engine import AsyncPredictor
+
+logger = logging.getLogger("veritas_ai.asgi")
+
+MAX_BODY_BYTES = 64 * 1024   # 10 000-char headline plus JSON overhead
+
+flask_asgi = WsgiToAsgi(core.app)
+predictor  = AsyncPredictor()
+
+
+class BodyTooLarge(ValueError):
+    pass
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise BodyTooLarge(f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status: int, payload, origin: str = ""):
+    body = json.dumps(payload, default=str).encode()
+    headers = {"content-type": "application/json", "content-length": str(len(body)),
+               **core.security_headers()}
+    if origin and origin in core._cors_origins:
+        headers.update({"access-control-allow-origin": origin,
+                        "access-control-allow-credentials": "true",
+                        "vary": "Origin"})
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _predict(scope, receive, send):
+    headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+    origin  = headers.get("origin", "")
+    try:
+        raw  = await _read_body(receive)
+        data = json.loads(raw) if raw else {}
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+    except BodyTooLarge as e:
+        await _send_json(send, 413, {"error": str(e)}, origin)
+        return
+    except ValueError as e:
+        await _send_json(send, 400, {"error": f"Invalid request body: {e}"}, origin)
+        return
+    payload, status = await predictor.predict(data, headers.get("authorization", ""))
+    await _send_json(send, status, payload, origin)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                # No gunicorn post_fork hook here, even if VERITAS_PRELOAD is set
+                core.init_worker()
+                await predictor.start()
+                await send({"type": "lifespan.startup.complete"})
+            except Exception as e:
+                logger.error(f"Async predictor startup failed: {e}")
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+        elif message["type"] == "lifespan.shutdown":
+            await predictor.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif (scope["type"] == "http" and scope["method"] == "POST"
+          and scope["path"] == "/api/predict"):
+        await _predict(scope, receive, send)
+    else:
+        await flask_asgi(scope, receive, send)
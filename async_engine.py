@@ -0,0 +1,394 @@
+"""
+async_engine.py - asyncio implementation of the /api/predict pipeline.
+
+Mirrors SourceVerifier, XRealityEngine and the prediction persistence in
+app.py on top of httpx.AsyncClient and Motor, so one worker can hold
+hundreds of in-flight verifications while they wait on HTTP and MongoDB.
+Request specs, parsers, scoring and write documents are shared with the
+sync pipeline; only the transports differ. Served by asgi.py.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+
+import app as core
+import stats_counters
+from model_loader import TRANSFORMER_RESULT_TIMEOUT
+from upstream import (
+    HEDGING_ENABLED, CircuitOpenError, LatencyTracker, QuotaExceededError, UpstreamUnavailable,
+    get_breaker, get_latency, hedge_budget, quota_manager,
+)
+
+logger = logging.getLogger("veritas_ai.async")
+
+
+# =========================================================================
+#  ASYNC UPSTREAM CLIENT
+# =========================================================================
+
+class AsyncUpstream:
+    """
+    Async counterpart of ``upstream.upstream_get``. Shares the breakers,
+    quota manager, latency trackers and hedge budget with the sync client,
+    and - unlike threads - can really cancel the losing hedged request.
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def get(self, name: str, url: str, priority: str = "normal", hedge: bool = False,
+                  **kwargs) -> httpx.Response:
+        breaker = get_breaker(name)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name} circuit open")
+        if not await quota_manager.try_acquire_async(name, priority=priority):
+            breaker.release()
+            raise QuotaExceededError(f"{name} quota exhausted")
+        tracker = get_latency(f"{name}:{urlparse(url).path}")
+        kwargs["timeout"] = tracker.timeout(kwargs.get("timeout", 8))
+        start = time.monotonic()
+        try:
+            if hedge and HEDGING_ENABLED:
+                resp = await self._hedged(name, tracker, url, **kwargs)
+            else:
+                resp = await self._timed(tracker, url, **kwargs)
+        except Exception as e:
+            breaker.record(False, time.monotonic() - start, f"{type(e).__name__}: {e}")
+            raise
+        ok = resp.status_code < 500 and resp.status_code != 429
+        breaker.record(ok, time.monotonic() - start, None if ok else f"HTTP {resp.status_code}")
+        return resp
+
+    async def _timed(self, tracker: LatencyTracker, url: str, **kwargs) -> httpx.Response:
+        start = time.monotonic()
+        try:
+            resp = await self.client.get(url, **kwargs)
+        except asyncio.CancelledError:
+            raise                              # cancelled hedge loser - not a latency sample
+        except Exception:
+            tracker.observe(time.monotonic() - start)
+            raise
+        tracker.observe(time.monotonic() - start)
+        return resp
+
+    async def _hedged(self, name: str, tracker: LatencyTracker, url: str, **kwargs) -> httpx.Response:
+        primary = asyncio.ensure_future(self._timed(tracker, url, **kwargs))
+        hedge_budget.on_request()
+        p95 = tracker.percentile(95)
+        if p95 is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=p95)
+        if done:
+            return primary.result()
+        if not hedge_budget.try_spend():
+            return await primary
+        if not await quota_manager.try_acquire_async(name, priority="low"):
+            hedge_budget.refund()
+            return await primary
+
+        hedge   = asyncio.ensure_future(self._timed(tracker, url, **kwargs))
+        pending = {primary, hedge}
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if f is hedge:
+                        hedge_budget.record_win()
+                    return f.result()
+                first_error = first_error or f.exception()
+        raise first_error
+
+
+# =========================================================================
+#  ASYNC SOURCE VERIFIER
+# =========================================================================
+
+class AsyncSourceVerifier:
+    """Async transport around a SourceVerifier; shares its in-memory cache."""
+
+    def __init__(self, verifier: "core.SourceVerifier", http: AsyncUpstream, adb=None):
+        self.verifier = verifier
+        self.http     = http
+        self.adb      = adb
+
+    async def verify_claim(self, headline: str, priority: str = "normal") -> Dict:
+        v   = self.verifier
+        key = v._cache_key(headline)
+        hit = v._mem_get(key)
+        if hit is not None:
+            return hit
+        if self.adb is not None:
+            try:
+                doc = await self.adb.verification_cache.find_one({"key": key})
+                if v._cache_doc_usable(doc):
+                    v._mem_put(key, doc["result"])
+                    return doc["result"]
+            except Exception:
+                pass
+
+        result = await self._run(headline, priority)
+        if result.get("degraded"):
+            return result
+        v._mem_put(key, result)
+        if self.adb is not None:
+            try:
+                await self.adb.verification_cache.update_one(
+                    *v._cache_update(key, headline, result), upsert=True,
+                )
+            except Exception:
+                pass
+        return result
+
+    async def _run(self, headline: str, priority: str) -> Dict:
+        v = self.verifier
+        tw = self._lookup("twitter", headline, priority) if v.twitter_bearer_token else _none()
+        if quota_manager.is_low("google_cse"):
+            # Google may be skipped depending on the fact-check verdict
+            fc, news, tw = await asyncio.gather(
+                self._lookup("factcheck", headline, priority),
+                self._lookup("newsapi", headline, priority), tw,
+            )
+            gs = await self._lookup("google", headline, priority) if v._want_google(fc) else None
+        else:
+            gs = self._lookup("google", headline, priority) if v._want_google({}) else _none()
+            fc, news, tw, gs = await asyncio.gather(
+                self._lookup("factcheck", headline, priority),
+                self._lookup("newsapi", headline, priority), tw, gs,
+            )
+        return v._combine(fc, news, tw, gs)
+
+    async def _lookup(self, kind: str, headline: str, priority: str) -> Dict:
+        v     = self.verifier
+        spec  = v._request(kind, headline)
+        empty = v._EMPTY[kind]
+        if spec is None:
+            return dict(empty)
+        name, url, kwargs = spec
+        try:
+            resp = await self.http.get(name, url, priority=priority, **kwargs)
+            if resp.status_code != 200:
+                return {**empty, "error": f"{v._LABEL[kind]} {resp.status_code}"}
+            return v._parse(kind, resp.json())
+        except UpstreamUnavailable as e:
+            return {**empty, "error": str(e)}
+        except Exception as e:
+            logger.warning(f"{v._LABEL[kind]} error: {e}")
+            return {**empty, "error": str(e)}
+
+
+# =========================================================================
+#  ASYNC X REALITY ENGINE
+# =========================================================================
+
+class AsyncXRealityEngine:
+    """Async transport around an XRealityEngine; shares its L1 cache."""
+
+    def __init__(self, engine: "core.XRealityEngine", http: AsyncUpstream, adb=None):
+        self.engine = engine
+        self.http   = http
+        self.cache  = adb.x_reality_cache if adb is not None else None
+
+    async def analyze(self, text: str) -> Dict:
+        e = self.engine
+        if not e.bearer:
+            return {"enabled": False, "social_fake_prob": 0.0, "evidence": {}}
+
+        cache_key = hashlib.md5(text.encode()).hexdigest()
+        hit = e._l1.get(cache_key)
+        if hit is not None:
+            return hit
+        if self.cache is not None:
+            try:
+                cached = e._l2_hit(cache_key, await self.cache.find_one({"_id": cache_key}))
+                if cached is not None:
+                    return cached
+            except Exception as ex:
+                logger.warning(f"Cache read error: {ex}")
+
+        try:
+            url, kwargs = e._search_request(text)
+            r = await self.http.get("twitter", url, **kwargs)
+            if r.status_code != 200:
+                raise httpx.HTTPStatusError(f"Twitter API error: {r.status_code}",
+                                            request=r.request, response=r)
+            result, ttl = e._evaluate(e._enrich(r.json()))
+        except Exception as ex:
+            return e._error_result(cache_key, ex)
+
+        e._l1.set(cache_key, result, ttl)
+        if self.cache is not None:
+            try:
+                await self.cache.update_one(*e._cache_update(cache_key, result, ttl), upsert=True)
+            except Exception as ex:
+                logger.warning(f"Cache write error: {ex}")
+        return result
+
+
+# =========================================================================
+#  PREDICTOR
+# =========================================================================
+
+async def _none():
+    return None
+
+
+async def _value(v):
+    return v
+
+
+async def _transformer(headline: str) -> Optional[Dict]:
+    """Await the shared micro-batch queue without parking a thread per request."""
+    try:
+        fut = core.model_detector.submit(headline)
+        t = await asyncio.wait_for(asyncio.wrap_future(fut), TRANSFORMER_RESULT_TIMEOUT)
+        return core._transformer_entry(t)
+    except Exception as e:
+        logger.error(f"Transformer error: {e}")
+        return None
+
+
+async def apply_writes_async(adb, ops: List["core.WriteOp"]):
+    if adb is None:
+        return
+    for col, method, args, kwargs in ops:
+        try:
+            await getattr(adb[col], method)(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"MongoDB {method} error in '{col}': {e}")
+
+
+class AsyncPredictor:
+    """
+    The /api/predict pipeline on one event loop. Clients are created in
+    ``start()`` because httpx and Motor bind to the running loop.
+    """
+
+    def __init__(self):
+        self.max_inflight = int(os.getenv("ASYNC_MAX_INFLIGHT", "512"))
+        self.http:  Optional[httpx.AsyncClient]  = None
+        self.mongo: Optional[AsyncIOMotorClient] = None
+        self.adb = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self):
+        if self.http is not None:
+            return
+        self.http = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200")),
+            max_keepalive_connections=int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "50")),
+        ))
+        if core.MONGO_URI:
+            self.mongo = AsyncIOMotorClient(core.MONGO_URI, serverSelectionTimeoutMS=5000)
+            self.adb   = self.mongo.get_database("veritas_ai")
+            quota_manager.bind_async(self.adb.upstream_quota)
+        upstream       = AsyncUpstream(self.http)
+        self.verifier  = AsyncSourceVerifier(core.source_verifier, upstream, self.adb)
+        self.x_engine  = AsyncXRealityEngine(core.x_reality_engine, upstream, self.adb)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        logger.info(f"Async predictor started (max in-flight {self.max_inflight})")
+
+    async def ensure_started(self):
+        if self.http is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            await self.start()
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        if self.mongo is not None:
+            self.mongo.close()
+            self.mongo = self.adb = None
+            quota_manager.bind_async(None)
+
+    async def predict(self, data: Dict, authorization: str = "") -> Tuple[Dict, int]:
+        await self.ensure_started()
+        async with self._inflight:
+            try:
+                return await self._predict(data, authorization)
+            except Exception as e:
+                logger.exception("Async prediction pipeline error")
+                return {"error": "Prediction failed", "details": str(e)}, 500
+
+    async def _predict(self, data: Dict, authorization: str) -> Tuple[Dict, int]:
+        headline, err = core._parse_predict_request(data)
+        if err:
+            return err
+        source_url = (data.get("source_url") or "").strip()
+        user_id    = core.user_id_from_authorization(authorization)
+
+        # STEP 1: URL fast-path
+        url_cred, vr, early = core._url_precheck(source_url)
+        if early:
+            return early, 200
+
+        # STEPS 1-4 overlap: headline + claim verification, social signal
+        # and the transformer (micro-batch queue) all wait on different things.
+        claims = core.claim_extractor.extract_claims(headline)[:3]
+        want_t = data.get("use_transformer", True) and core.TRANSFORMER_MODELS_AVAILABLE
+        vr_task = self.verifier.verify_claim(headline) if not vr else _value(vr)
+        results = await asyncio.gather(
+            vr_task,
+            self.x_engine.analyze(headline),
+            _transformer(headline) if want_t else _none(),
+            *(self.verifier.verify_claim(c, priority="low") for c in claims),
+        )
+        vr, x_result, transformer = results[0], results[1], results[2]
+        cv = [core._claim_entry(c, cr) for c, cr in zip(claims, results[3:])]
+
+        comps: Dict = {}
+        if data.get("use_nlp", True) and (nlp := core._nlp_component(headline)) is not None:
+            comps["nlp"] = nlp
+        if transformer is not None:
+            comps["transformer"] = transformer
+
+        # STEP 5-6: Ensemble + X reality modulation
+        if core.learned_ensemble.refresh_due():
+            await asyncio.to_thread(core.learned_ensemble.maybe_refresh)
+        outcome = core._score_prediction(vr, cv, comps, x_result)
+
+        # STEP 7: Persist
+        await apply_writes_async(
+            self.adb, core._prediction_writes(user_id, headline, outcome, vr, url_cred, cv, comps),
+        )
+        await self._maybe_add_quiz_candidate(headline, outcome, comps)
+        await apply_writes_async(self.adb, [core._interaction_write("prediction", {
+            "headline_length": len(headline), "method": outcome["method"],
+            "sources_checked": vr.get("sources_found", 0),
+        }, user_id)])
+
+        return core._prediction_response(outcome, vr, url_cred, cv, comps, x_result), 200
+
+    async def _maybe_add_quiz_candidate(self, headline: str, outcome: Dict, comps: Dict):
+        if self.adb is None:
+            return
+        doc = core._quiz_candidate_doc(headline, outcome["final"], outcome["conf"], comps, outcome["fv"])
+        if doc is None:
+            return
+        try:
+            result = await self.adb.quiz_candidates.update_one(*core._quiz_candidate_upsert(doc), upsert=True)
+            if result.upserted_id is None:
+                return
+            doc["_id"] = result.upserted_id
+            await apply_writes_async(self.adb, [stats_counters.candidate_write(doc)])
+            core.candidate_pool.add(doc)
+        except DuplicateKeyError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to add quiz candidate: {e}")
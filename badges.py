@@ -0,0 +1,141 @@
+"""
+badges.py - quiz badges awarded from user_stats counters.
+
+Every badge is a threshold on one counter the quiz submit already keeps in
+user_stats (totalAttempts, correctAnswers, currentStreak), so deciding what
+a player has earned needs no query over quiz_attempts. One worker at a time
+checks every BADGE_CHECK_SECONDS: it reads the user_stats documents whose
+updatedAt moved since the last check, evaluates all rules in memory and
+awards each player's new badges with a single guarded update:
+
+    {"userId": u, "badges": {"$nin": new}}
+        -> $addToSet badges, $inc badgesEarned and totalPoints
+
+The guard makes a repeated or concurrent check a no-op, so a badge (and its
+points) is never awarded twice.
+
+    python badges.py check                    # check recently active players now
+    python badges.py check --all              # every player
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from pymongo import UpdateOne
+
+import stats_counters
+
+logger = logging.getLogger("veritas_ai.badges")
+
+BADGE_CHECK_SECONDS = int(os.getenv("BADGE_CHECK_SECONDS", "30"))
+
+
+class Badge(NamedTuple):
+    name:      str
+    counter:   str     # user_stats field
+    threshold: int
+    points:    int
+
+
+BADGES = (
+    Badge("First Steps",   "totalAttempts",  1,   10),
+    Badge("Quiz Novice",   "totalAttempts",  10,  50),
+    Badge("Truth Seeker",  "totalAttempts",  50,  100),
+    Badge("Fact Master",   "totalAttempts",  100, 200),
+    Badge("Perfect Score", "correctAnswers", 10,  150),
+    Badge("Streak Master", "currentStreak",  7,   100),
+)
+
+_WATERMARK  = "badge_watermark"   # stats_counters _id
+# Submits stamp updatedAt before the write-behind applies them
+_OVERLAP    = timedelta(seconds=30)
+_PROJECTION = {"_id": 0, "userId": 1, "badges": 1, "updatedAt": 1,
+               **{b.counter: 1 for b in BADGES}}
+
+
+def earned(stats: Dict) -> List[Badge]:
+    """Badges whose threshold ``stats`` meets and that it does not hold yet."""
+    held = set(stats.get("badges") or ())
+    return [b for b in BADGES
+            if b.name not in held and (stats.get(b.counter) or 0) >= b.threshold]
+
+
+def award(user_id: str, new: List[Badge], now: Optional[datetime] = None) -> UpdateOne:
+    now   = now or datetime.utcnow()
+    names = [b.name for b in new]
+    return UpdateOne(
+        {"userId": user_id, "badges": {"$nin": names}},
+        {
+            "$addToSet": {"badges": {"$each": names}},
+            "$inc":      {"badgesEarned": len(new), "totalPoints": sum(b.points for b in new)},
+            "$set":      {"updatedAt": now, **{f"badgeEarnedAt.{n}": now for n in names}},
+        },
+    )
+
+
+def check(db, everyone: bool = False) -> Dict[str, int]:
+    """Award badges to players whose counters changed since the last check."""
+    started = datetime.utcnow()
+    query: Dict = {}
+    if not everyone:
+        mark = db.stats_counters.find_one({"_id": _WATERMARK})
+        if mark:
+            query = {"updatedAt": {"$gt": mark["checked_until"] - _OVERLAP}}
+    ops, players = [], 0
+    for stats in db.user_stats.find(query, _PROJECTION):
+        players += 1
+        new = earned(stats)
+        if new and stats.get("userId"):
+            ops.append(award(stats["userId"], new, started))
+    awarded = 0
+    if ops:
+        awarded = db.user_stats.bulk_write(ops, ordered=False).modified_count
+    db.stats_counters.update_one({"_id": _WATERMARK},
+                                 {"$set": {"checked_until": started}}, upsert=True)
+    return {"players": players, "awarded": awarded}
+
+
+def start_checker(db, seconds: int = BADGE_CHECK_SECONDS) -> Optional[threading.Thread]:
+    """Background badge checks for this worker; 0 seconds disables them."""
+    if seconds <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(seconds)
+            try:
+                if stats_counters.claim_lease(db, "badges", seconds / 60):
+                    result = check(db)
+                    if result["awarded"]:
+                        logger.info(f"Badges awarded: {result}")
+            except Exception as e:
+                logger.warning(f"Badge check failed: {e}")
+
+    thread = threading.Thread(target=loop, name="badge-checker", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Quiz badges")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("check", help="award badges earned since the last check")
+    c.add_argument("--all", action="store_true", help="check every player, not just recent ones")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(check(database, everyone=args.all))
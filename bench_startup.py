@@ -0,0 +1,105 @@
+"""
+bench_startup.py - cold-start time and RSS of a Veritas worker.
+
+Imports the app module in fresh interpreters and reports import wall time,
+resident memory after import, and which heavy packages got loaded. One
+extra run under ``python -X importtime`` lists the slowest packages.
+
+    python bench_startup.py                          # app.py, 5 runs
+    python bench_startup.py --module asgi --runs 10
+    python bench_startup.py --budget-seconds 3 --budget-mb 250   # exit 1 if over
+
+Uses the same .env as the server; MONGODB_URI is pinged during import.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("torch", "transformers", "openai", "newsapi", "onnxruntime",
+                 "tokenizers", "sklearn", "nltk", "motor", "httpx")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+with open("/proc/self/status") as f:
+    status = dict(l.split(":", 1) for l in f if ":" in l)
+kb = lambda k: int(status.get(k, "0 kB").split()[0])
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": kb("VmRSS") / 1024,
+    "anon_mb": kb("RssAnon") / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def _run(module: str, extra: list) -> subprocess.CompletedProcess:
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run([sys.executable, *extra, "-c", code], cwd=here,
+                          capture_output=True, text=True, timeout=300)
+
+
+def measure(module: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        proc = _run(module, [])
+        if proc.returncode != 0:
+            sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def slowest_imports(module: str, top: int) -> list:
+    """(cumulative_ms, package) per top-level package, from -X importtime."""
+    proc = _run(module, ["-X", "importtime"])
+    cost = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        package = name.strip().split(".")[0]
+        if package != module and cumulative.strip().isdigit():
+            cost[package] = max(cost.get(package, 0), int(cumulative) / 1000)
+    return sorted(((ms, p) for p, ms in cost.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker cold start")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--budget-seconds", type=float, default=None)
+    parser.add_argument("--budget-mb", type=float, default=None)
+    args = parser.parse_args()
+
+    samples = measure(args.module, args.runs)
+    secs = [s["seconds"] for s in samples]
+    rss  = [s["rss_mb"] for s in samples]
+    print(f"import {args.module}: {args.runs} cold starts")
+    print(f"  time    median {statistics.median(secs):.2f}s  min {min(secs):.2f}s  max {max(secs):.2f}s")
+    print(f"  RSS     median {statistics.median(rss):.0f} MB  "
+          f"(anonymous {statistics.median(s['anon_mb'] for s in samples):.0f} MB)")
+    print(f"  loaded  {', '.join(samples[0]['heavy']) or 'no heavy packages'}")
+    print("  slowest packages:")
+    for ms, name in slowest_imports(args.module, args.top):
+        print(f"    {ms:8.0f} ms  {name}")
+
+    over = []
+    if args.budget_seconds is not None and statistics.median(secs) > args.budget_seconds:
+        over.append(f"time {statistics.median(secs):.2f}s > {args.budget_seconds}s")
+    if args.budget_mb is not None and statistics.median(rss) > args.budget_mb:
+        over.append(f"RSS {statistics.median(rss):.0f} MB > {args.budget_mb} MB")
+    if over:
+        print("OVER BUDGET: " + "; ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+db_indexes.py - MongoDB index and TTL bootstrapper.
+
+Declares the indexes behind every hot query in app.py and creates them
+idempotently; app.init_worker() runs it on startup (MONGO_ENSURE_INDEXES).
+TTL indexes let MongoDB delete expired cache entries and quiz candidates
+instead of keeping them forever.
+
+    python db_indexes.py              # create / update indexes
+    python db_indexes.py --check      # explain() each hot query, exit 1 on COLLSCAN
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("veritas_ai.indexes")
+
+# Expired verifications are still served while upstream quota is low
+# (SourceVerifier._cache_doc_usable), so they are kept for a grace period.
+VERIFICATION_GRACE_SECONDS = int(os.getenv("VERIFICATION_CACHE_GRACE_DAYS", "7")) * 86400
+QUIZ_CANDIDATE_GRACE_SECONDS = int(os.getenv("QUIZ_CANDIDATE_GRACE_DAYS", "7")) * 86400
+# Hourly rollups only feed short-range charts; daily buckets are kept forever.
+ROLLUP_HOURLY_RETENTION_SECONDS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "90")) * 86400
+
+# Mongo error codes for an index whose name/options differ from ours
+_INDEX_CONFLICT_CODES = {85, 86}
+
+
+def _ttl(field: str, seconds: int, name: str) -> IndexModel:
+    return IndexModel([(field, ASCENDING)], name=name, expireAfterSeconds=seconds)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "verification_cache": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+        _ttl("expires_at", VERIFICATION_GRACE_SECONDS, "expires_at_ttl"),
+    ],
+    "x_reality_cache": [
+        _ttl("expires", 0, "expires_ttl"),
+    ],
+    "news_cache": [
+        IndexModel([("topic", ASCENDING)], name="topic_unique", unique=True),
+        _ttl("expires_at", 0, "expires_at_ttl"),
+    ],
+    "upstream_quota": [
+        _ttl("expires_at", 0, "expires_at_ttl"),
+    ],
+    "predictions": [
+        # Keyset pagination: (timestamp, _id) is the history sort and cursor
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+                   name="user_timestamp_id"),
+        IndexModel([("user_id", ASCENDING), ("prediction", ASCENDING)], name="user_prediction"),
+        IndexModel([("prediction", ASCENDING)], name="prediction"),
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+    ],
+    "quiz_candidates": [
+        # Selection runs in memory (quiz_pool.py); MongoDB serves its full
+        # load (expires_at) and the incremental created_at poll.
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+        # Dedup by normalised headline hash; partial so unkeyed legacy docs do not collide
+        IndexModel([("headline_key", ASCENDING)], name="headline_key_unique", unique=True,
+                   partialFilterExpression={"headline_key": {"$exists": True}}),
+        _ttl("expires_at", QUIZ_CANDIDATE_GRACE_SECONDS, "expires_at_ttl"),
+    ],
+    "quiz_attempts": [
+        IndexModel([("userId", ASCENDING), ("candidate_id", ASCENDING)], name="user_candidate"),
+    ],
+    "quiz_questions": [
+        IndexModel([("id", ASCENDING)], name="id"),
+        # Import upserts (import_quiz_questions.py); partial for unkeyed legacy questions
+        IndexModel([("content_hash", ASCENDING)], name="content_hash_unique", unique=True,
+                   partialFilterExpression={"content_hash": {"$exists": True}}),
+    ],
+    "user_stats": [
+        IndexModel([("userId", ASCENDING)], name="userId_unique", unique=True),
+        # Leaderboard and badge polling (leaderboard.py, badges.py)
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt"),
+    ],
+    "prediction_rollups_hourly": [
+        IndexModel([("start", ASCENDING), ("topic", ASCENDING)], name="start_topic"),
+        _ttl("start", ROLLUP_HOURLY_RETENTION_SECONDS, "start_ttl"),
+    ],
+    "prediction_rollups_daily": [
+        IndexModel([("start", ASCENDING), ("topic", ASCENDING)], name="start_topic"),
+    ],
+    "leaderboard_snapshots": [
+        IndexModel([("snapshot", ASCENDING), ("seq", ASCENDING)], name="snapshot_seq"),
+    ],
+}
+
+
+def _sync_ttl(db, collection: str, model: IndexModel) -> bool:
+    """Bring an existing TTL index's expireAfterSeconds in line via collMod."""
+    doc = model.document
+    if "expireAfterSeconds" not in doc:
+        return False
+    try:
+        db.command("collMod", collection, index={
+            "keyPattern": dict(doc["key"]), "expireAfterSeconds": doc["expireAfterSeconds"],
+        })
+        return True
+    except OperationFailure as e:
+        logger.error(f"Index {collection}.{doc['name']}: collMod failed: {e}")
+        return False
+
+
+def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create every declared index; safe to run on every start."""
+    report: Dict[str, List[str]] = {}
+    for collection, models in INDEXES.items():
+        done = report.setdefault(collection, [])
+        for model in models:
+            name = model.document["name"]
+            try:
+                db[collection].create_indexes([model])
+                done.append(name)
+            except OperationFailure as e:
+                if e.code not in _INDEX_CONFLICT_CODES:
+                    logger.error(f"Index {collection}.{name} not created: {e}")
+                elif _sync_ttl(db, collection, model):
+                    done.append(f"{name} (ttl updated)")
+                else:
+                    logger.warning(f"Index {collection}.{name} exists with other options: {e}")
+    logger.info(f"Mongo indexes ensured on {len(report)} collections")
+    return report
+
+
+# -------------------------------------------------------------------------
+#  --check: explain() the hot queries
+# -------------------------------------------------------------------------
+
+def _hot_queries(db) -> List[Tuple[str, Callable[[], Dict[str, Any]]]]:
+    now  = datetime.utcnow()
+    uid  = "index-check-user"
+    live = {"expires_at": {"$gt": now}, "prediction": {"$in": ["REAL", "FAKE"]}}
+
+    def find(col, flt, sort=None, limit=0):
+        def run():
+            cur = db[col].find(flt)
+            if sort:
+                cur = cur.sort(sort)
+            if limit:
+                cur = cur.limit(limit)
+            return cur.explain()
+        return run
+
+    return [
+        ("verification_cache by key", find("verification_cache", {"key": "x"})),
+        ("x_reality_cache by _id", find("x_reality_cache", {"_id": "x"})),
+        ("news_cache by topic", find("news_cache", {"topic": "general"})),
+        ("history page", find("predictions", {"user_id": uid},
+                              [("timestamp", -1), ("_id", -1)], 11)),
+        ("stats by label", find("predictions", {"user_id": uid, "prediction": "FAKE"})),
+        ("ensemble recent", find("predictions", {}, [("timestamp", -1)], 500)),
+        ("quiz pool load", find("quiz_candidates", live)),
+        ("quiz pool poll", find("quiz_candidates", {
+            "created_at": {"$gt": now - timedelta(minutes=1)}, "expires_at": {"$gt": now}})),
+        ("quiz candidate dedup", find("quiz_candidates", {"headline_key": "x"})),
+        ("user stats", find("user_stats", {"userId": uid})),
+        ("leaderboard poll", find("user_stats", {"updatedAt": {"$gt": now - timedelta(seconds=30)}})),
+        ("leaderboard snapshot", find("leaderboard_snapshots", {"snapshot": "x"}, [("seq", 1)])),
+        ("rollup fold", find("predictions", {"timestamp": {"$gte": now - timedelta(hours=1)}})),
+        ("timeseries", find("prediction_rollups_daily", {"start": {"$gte": now - timedelta(days=30)}},
+                            [("start", 1)])),
+    ]
+
+
+def _stages(plan: Any):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def _winning_plan(explain: Dict) -> Any:
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"].get("winningPlan", {})
+    # Aggregation explain: the $cursor stage (or sharded "shards") holds it
+    return [s.get("$cursor", {}).get("queryPlanner", {}).get("winningPlan", {})
+            for s in explain.get("stages", [])] or explain
+
+
+def check_indexes(db) -> List[str]:
+    """Return the names of hot queries whose winning plan contains a COLLSCAN."""
+    scans = []
+    for name, explain in _hot_queries(db):
+        try:
+            stages = set(_stages(_winning_plan(explain())))
+        except OperationFailure as e:
+            logger.error(f"explain failed for {name}: {e}")
+            scans.append(name)
+            continue
+        status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+        print(f"  {name:<26} {status:<9} {', '.join(sorted(stages))}")
+        if status != "ok":
+            scans.append(name)
+    return scans
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Create or verify MongoDB indexes")
+    parser.add_argument("--check", action="store_true",
+                        help="explain() hot queries and exit 1 if any does a collection scan")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+
+    if args.check:
+        print("Explaining hot queries:")
+        failed = check_indexes(database)
+        if failed:
+            print(f"COLLSCAN in {len(failed)} queries: {', '.join(failed)}")
+            sys.exit(1)
+        print("No collection scans.")
+    else:
+        for col, names in ensure_indexes(database).items():
+            print(f"  {col:<20} {', '.join(names)}")
@@ -0,0 +1,33 @@
+"""
+gunicorn.conf.py - production server settings, read automatically by gunicorn.
+
+    gunicorn app:app
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker
+
+With preload_app the master imports app.py once and loads the read-only
+assets (NLTK lexicons, domain sets, the ensemble pickle) before forking, so
+workers share those pages copy-on-write. Fork-unsafe state - the Mongo
+client, the onnxruntime session, thread pools - is created in each worker
+by app.init_worker() from post_fork. Set VERITAS_PRELOAD=False to disable.
+"""
+
+import os
+
+os.environ.setdefault("VERITAS_PRELOAD", "True")
+
+bind         = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers      = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads      = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout      = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app  = os.environ["VERITAS_PRELOAD"].lower() == "true"
+
+
+def post_fork(server, worker):
+    import app as core
+    core.init_worker()
+
+
+def worker_exit(server, worker):
+    # Apply batched quiz writes still queued in this worker
+    from write_behind import write_behind
+    write_behind.flush()
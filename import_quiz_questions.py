@@ -0,0 +1,287 @@
+"""
+import_quiz_questions.py - bulk import of curated quiz questions.
+
+Streams questions from JSONL or CSV files of any size into
+``quiz_questions``. Every record is validated, keyed by the SHA-256 of its
+identity (normalised question text, type, options and answer) and written
+as an upsert on that ``content_hash``, CHUNK records per unordered
+bulk_write. Re-running an import is therefore harmless: known questions
+have their explanation, hints, tags etc. refreshed, new ones are added,
+nothing is duplicated.
+
+Progress is logged per chunk and checkpointed in stats_counters after each
+one, so an interrupted import of the same, unchanged file picks up where
+it stopped (--restart ignores the checkpoint).
+
+Record fields (JSONL objects, or CSV columns with "|" between list items):
+
+    question        required
+    correctAnswer   required (correct_answer also accepted)
+    type            true-false (default; answer REAL or FAKE) | multiple-choice
+    options         multiple-choice only, 2+ items containing the answer
+    id, category, difficulty, topic, explanation, hints, tags, isActive
+
+    python import_quiz_questions.py data/quiz_questions.jsonl
+    python import_quiz_questions.py questions.csv --chunk 5000
+    python import_quiz_questions.py big.jsonl.gz --dry-run
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger("veritas_ai.quiz_import")
+
+CHUNK = int(os.getenv("QUIZ_IMPORT_CHUNK", "1000"))
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "quiz_questions.jsonl")
+
+TYPES       = ("true-false", "multiple-choice")
+LIST_FIELDS = ("options", "hints", "tags")
+TEXT_FIELDS = ("id", "category", "difficulty", "topic", "explanation")
+
+_SPACES = re.compile(r"\s+")
+
+
+class InvalidQuestion(ValueError):
+    pass
+
+
+# -------------------------------------------------------------------------
+#  Reading
+# -------------------------------------------------------------------------
+
+def _open(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "jsonl"
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+    """(position, raw record) pairs; position counts records, not bytes."""
+    fmt = fmt or _format(path)
+    with _open(path) as f:
+        if fmt == "csv":
+            for position, row in enumerate(csv.DictReader(f), 1):
+                yield position, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+            return
+        position = 0
+        for line in f:
+            if not line.strip():
+                continue
+            position += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"__error__": f"invalid JSON: {e}"}
+            yield position, record
+
+
+# -------------------------------------------------------------------------
+#  Validation
+# -------------------------------------------------------------------------
+
+def _list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split("|") if v.strip()]
+    if not isinstance(value, list):
+        raise InvalidQuestion(f"expected a list, got {type(value).__name__}")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "")
+    return bool(value)
+
+
+def normalise(record: Dict) -> Dict:
+    """The stored shape of one raw record; raises InvalidQuestion."""
+    if not isinstance(record, dict):
+        raise InvalidQuestion("record is not an object")
+    if "__error__" in record:
+        raise InvalidQuestion(record["__error__"])
+    question = _SPACES.sub(" ", str(record.get("question") or "")).strip()
+    if not question:
+        raise InvalidQuestion("question is required")
+    qtype = str(record.get("type") or "true-false").strip().lower()
+    if qtype not in TYPES:
+        raise InvalidQuestion(f"unknown type '{qtype}'")
+    answer = str(record.get("correctAnswer") or record.get("correct_answer") or "").strip()
+    doc: Dict = {"question": question, "type": qtype}
+    for field in LIST_FIELDS:
+        doc[field] = _list(record.get(field))
+    if qtype == "true-false":
+        answer = answer.upper()
+        if answer not in ("REAL", "FAKE"):
+            raise InvalidQuestion("true-false answer must be REAL or FAKE")
+        doc.pop("options")
+    elif len(doc["options"]) < 2 or answer not in doc["options"]:
+        raise InvalidQuestion("multiple-choice needs 2+ options including the answer")
+    doc["correctAnswer"] = answer
+    for field in TEXT_FIELDS:
+        if record.get(field) not in (None, ""):
+            doc[field] = str(record[field]).strip()
+    doc["isActive"] = _bool(record.get("isActive", True))
+    return doc
+
+
+def content_hash(doc: Dict) -> str:
+    """Identity of a question: wording (case/spacing-insensitive), type, options and answer."""
+    identity = [doc["question"].lower(), doc["type"], sorted(doc.get("options", [])), doc["correctAnswer"]]
+    return hashlib.sha256(json.dumps(identity, separators=(",", ":")).encode()).hexdigest()
+
+
+def upsert(doc: Dict, h: str, now: datetime) -> UpdateOne:
+    fields = {**doc, "updatedAt": now}
+    on_insert = {"createdAt": now}
+    if "id" not in doc:
+        on_insert["id"] = f"qq-{h[:16]}"
+    return UpdateOne({"content_hash": h}, {"$set": fields, "$setOnInsert": on_insert}, upsert=True)
+
+
+# -------------------------------------------------------------------------
+#  Import
+# -------------------------------------------------------------------------
+
+def key_legacy(db) -> int:
+    """Give questions inserted before content hashing their content_hash (and an id)."""
+    keyed = 0
+    for d in db.quiz_questions.find({"content_hash": {"$exists": False}}):
+        try:
+            doc = normalise(d)
+        except InvalidQuestion:
+            continue
+        h = content_hash(doc)
+        if db.quiz_questions.find_one({"content_hash": h}, {"_id": 1}):
+            continue   # a duplicate of a keyed question; left as is
+        db.quiz_questions.update_one({"_id": d["_id"]}, {"$set": {
+            "content_hash": h, "id": d.get("id") or f"qq-{h[:16]}"}})
+        keyed += 1
+    return keyed
+
+
+def _checkpoint_id(path: str) -> str:
+    return "quiz_import:" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+
+
+def _file_version(path: str) -> Dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+def _resume_position(db, path: str) -> int:
+    state = db.stats_counters.find_one({"_id": _checkpoint_id(path)})
+    if not state or state.get("done") or state.get("version") != _file_version(path):
+        return 0
+    return state.get("position", 0)
+
+
+def run(db, path: str, fmt: Optional[str] = None, chunk: int = CHUNK,
+        restart: bool = False, dry_run: bool = False) -> Dict[str, int]:
+    counts = {"read": 0, "inserted": 0, "updated": 0, "invalid": 0, "duplicates": 0, "skipped": 0}
+    skip = 0 if restart or dry_run else _resume_position(db, path)
+    if skip:
+        logger.info(f"Resuming {path} after record {skip}")
+    elif not dry_run:
+        counts["legacy_keyed"] = key_legacy(db)
+
+    checkpoint = {"_id": _checkpoint_id(path)}
+    version    = _file_version(path)
+    seen: set  = set()
+    ops: List[UpdateOne] = []
+    position   = 0
+    started    = time.monotonic()
+
+    def write():
+        if dry_run:
+            counts["valid"] = counts.get("valid", 0) + len(ops)
+        elif ops:
+            try:
+                result = db.quiz_questions.bulk_write(ops, ordered=False).bulk_api_result
+            except BulkWriteError as e:
+                result = e.details
+                counts["invalid"] += len(result.get("writeErrors", []))
+                for err in result.get("writeErrors", [])[:5]:
+                    logger.warning(f"Write failed: {err.get('errmsg')}")
+            counts["inserted"] += result.get("nUpserted", 0)
+            counts["updated"]  += result.get("nMatched", 0)
+        ops.clear()
+        if not dry_run:
+            db.stats_counters.update_one(checkpoint, {"$set": {
+                "path": os.path.abspath(path), "version": version, "position": position,
+                "done": False, "updated_at": datetime.utcnow()}}, upsert=True)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(f"{position} records: {counts['inserted']} new, {counts['updated']} updated, "
+                    f"{counts['invalid']} invalid, {counts['duplicates']} duplicate "
+                    f"({counts['read'] / elapsed:.0f}/s)")
+
+    now = datetime.utcnow()
+    for position, record in read_records(path, fmt):
+        if position <= skip:
+            counts["skipped"] += 1
+            continue
+        counts["read"] += 1
+        try:
+            doc = normalise(record)
+        except InvalidQuestion as e:
+            counts["invalid"] += 1
+            if counts["invalid"] <= 20:
+                logger.warning(f"{path} record {position}: {e}")
+            continue
+        h = content_hash(doc)
+        if h in seen:
+            counts["duplicates"] += 1
+            continue
+        seen.add(h)
+        ops.append(upsert(doc, h, now))
+        if len(ops) >= chunk:
+            write()
+    write()
+    if not dry_run:
+        db.stats_counters.update_one(checkpoint, {"$set": {"done": True}})
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Import curated quiz questions")
+    parser.add_argument("files", nargs="*", default=[DEFAULT_FILE], help="JSONL or CSV files (.gz ok)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="override detection by extension")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="records per bulk_write")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args()
+
+    database = None
+    if not args.dry_run:
+        uri = os.getenv("MONGODB_URI")
+        if not uri:
+            sys.exit("MONGODB_URI environment variable is required")
+        database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    for file in args.files:
+        print(file, run(database, file, fmt=args.format, chunk=args.chunk,
+                        restart=args.restart, dry_run=args.dry_run))
@@ -0,0 +1,323 @@
+"""
+leaderboard.py - in-memory ranked leaderboard over user_stats.totalPoints.
+
+Each worker keeps every player's points in a Fenwick tree over the sorted
+distinct scores (how many players hold each score) plus, per score, the
+players holding it in userId order. That gives, with n players and S distinct point values:
+
+    rank_of(user)   O(log S) tree query + O(log n) bisect in the score bucket
+    at_rank(k)      O(log S) tree descent + O(1) bucket index
+    update(user)    O(log S) tree update + bucket insert
+
+so top-N and "my rank and neighbours" never touch MongoDB. The board is
+kept fresh by polling user_stats.updatedAt every LEADERBOARD_REFRESH_SECONDS.
+A cold worker starts from the latest snapshot in ``leaderboard_snapshots``
+(a few large chunk documents) instead of scanning user_stats; one worker
+writes a new snapshot every LEADERBOARD_SNAPSHOT_MINUTES.
+
+    python leaderboard.py snapshot
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+
+import stats_counters
+
+logger = logging.getLogger("veritas_ai.leaderboard")
+
+REFRESH_SECONDS   = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "10"))
+SNAPSHOT_MINUTES  = int(os.getenv("LEADERBOARD_SNAPSHOT_MINUTES", "30"))
+SNAPSHOT_CHUNK    = 20000    # players per snapshot document (well under 16 MB)
+
+# Polls overlap so writes committed slightly out of updatedAt order are not missed
+_POLL_OVERLAP = timedelta(seconds=30)
+_PROJECTION   = {"_id": 0, "userId": 1, "totalPoints": 1, "correctAnswers": 1, "updatedAt": 1}
+
+
+class _Fenwick:
+    """
+    Counts per distinct score with prefix sums. Slots are the sorted scores
+    seen so far, so size and rebuilds scale with distinct scores rather than
+    the highest one: a new top score is appended in O(log S), other new
+    scores (a whole poll's worth at once, see reserve) rebuild the tree in
+    O(S) and drop the scores nobody holds any more.
+    """
+
+    def __init__(self):
+        self.scores: List[int] = []    # slot -> score, ascending
+        self.counts: List[int] = []    # slot -> players
+        self.tree = [0]
+
+    def _rebuild(self, scores: List[int], counts: List[int]):
+        self.scores, self.counts = scores, counts
+        n = len(scores)
+        self.tree = [0] * (n + 1)
+        for i in range(1, n + 1):
+            self.tree[i] += counts[i - 1]
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+
+    def load(self, counts: Dict[int, int]):
+        """Replace the contents with ``counts`` (score -> players) in O(S log S)."""
+        scores = sorted(s for s, c in counts.items() if c)
+        self._rebuild(scores, [counts[s] for s in scores])
+
+    def _sum(self, slots: int) -> int:
+        """Players in the lowest ``slots`` slots."""
+        total = 0
+        while slots > 0:
+            total += self.tree[slots]
+            slots -= slots & -slots
+        return total
+
+    def _has(self, score: int) -> bool:
+        i = bisect_left(self.scores, score)
+        return i < len(self.scores) and self.scores[i] == score
+
+    def reserve(self, scores: Iterable[int]):
+        """Give every score a slot: appends above the top, otherwise at most one rebuild."""
+        new = sorted({s for s in scores if not self._has(s)})
+        if not new:
+            return
+        if self.scores and new[0] < self.scores[-1]:
+            live = sorted([(s, c) for s, c in zip(self.scores, self.counts) if c] + [(s, 0) for s in new])
+            self._rebuild([s for s, _ in live], [c for _, c in live])
+            return
+        for score in new:
+            self.scores.append(score)
+            self.counts.append(0)
+            n = len(self.scores)
+            self.tree.append(self._sum(n - 1) - self._sum(n - (n & -n)))
+
+    def add(self, score: int, delta: int):
+        if not self._has(score):
+            self.reserve((score,))
+        i = bisect_left(self.scores, score)
+        self.counts[i] += delta
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, score: int) -> int:
+        """Players with points <= score."""
+        return self._sum(bisect_right(self.scores, score))
+
+    def lowest_with_prefix(self, k: int) -> int:
+        """Smallest score whose prefix count reaches k (1-based)."""
+        n = len(self.scores)
+        pos, step = 0, 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return self.scores[pos]   # slot pos is tree index pos + 1
+
+
+class Leaderboard:
+    def __init__(self, collection=None):
+        self.collection = collection
+        self.snapshots  = None
+        self._lock      = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._fenwick = _Fenwick()
+        self._points: Dict[str, Tuple[int, int]] = {}     # userId -> (points, correct)
+        self._by_score: Dict[int, List[str]] = {}         # score -> userIds, sorted
+        self._since: Optional[datetime] = None
+        self._refreshed: Optional[float] = None
+
+    def bind(self, db):
+        self.collection = db.user_stats
+        self.snapshots  = db.leaderboard_snapshots
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    # ---------------------------------------------------------------------
+    #  Updates
+    # ---------------------------------------------------------------------
+
+    def update(self, user_id: str, points, correct=0):
+        points = max(int(points or 0), 0)
+        with self._lock:
+            old = self._points.get(user_id)
+            if old is not None:
+                if old[0] == points:
+                    self._points[user_id] = (points, int(correct or 0))
+                    return
+                bucket = self._by_score[old[0]]
+                del bucket[bisect_left(bucket, user_id)]
+                if not bucket:
+                    del self._by_score[old[0]]
+                self._fenwick.add(old[0], -1)
+            self._points[user_id] = (points, int(correct or 0))
+            insort(self._by_score.setdefault(points, []), user_id)
+            self._fenwick.add(points, 1)
+
+    def _load(self, rows):
+        """Cold start into an empty board: index (userId, points, correct) rows in one pass."""
+        for user_id, points, correct in rows:
+            self._points[user_id] = (max(int(points or 0), 0), int(correct or 0))
+        for user_id, (points, _) in self._points.items():
+            self._by_score.setdefault(points, []).append(user_id)
+        for bucket in self._by_score.values():
+            bucket.sort()
+        self._fenwick.load({points: len(bucket) for points, bucket in self._by_score.items()})
+
+    def _apply(self, docs):
+        docs = list(docs)
+        self._fenwick.reserve(max(int(d.get("totalPoints") or 0), 0) for d in docs if d.get("userId"))
+        newest = self._since
+        for d in docs:
+            if d.get("userId"):
+                self.update(d["userId"], d.get("totalPoints"), d.get("correctAnswers"))
+            if d.get("updatedAt") and (newest is None or d["updatedAt"] > newest):
+                newest = d["updatedAt"]
+        return newest
+
+    def _load_snapshot(self) -> bool:
+        if self.snapshots is None:
+            return False
+        head = self.snapshots.find_one({"_id": "latest"})
+        if not head:
+            return False
+        self._load(row for chunk in self.snapshots.find({"snapshot": head["current"]}).sort("seq", 1)
+                   for row in chunk["players"])
+        self._since = head["taken_at"]
+        logger.info(f"Leaderboard loaded from snapshot: {len(self)} players")
+        return True
+
+    def refresh(self, force: bool = False):
+        """Cold start from snapshot (or a full scan), then poll for changes."""
+        if self.collection is None:
+            return
+        now = time.monotonic()
+        if not force and self._refreshed is not None and now - self._refreshed < REFRESH_SECONDS:
+            return
+        with self._lock:
+            if not force and self._refreshed is not None and now - self._refreshed < REFRESH_SECONDS:
+                return
+            started = datetime.utcnow()
+            if self._refreshed is None and not self._load_snapshot():
+                self._load((d["userId"], d.get("totalPoints"), d.get("correctAnswers"))
+                           for d in self.collection.find({}, _PROJECTION) if d.get("userId"))
+                self._since = started
+            else:
+                newest = self._apply(self.collection.find(
+                    {"updatedAt": {"$gt": self._since - _POLL_OVERLAP}}, _PROJECTION))
+                self._since = max(self._since, newest or self._since)
+            self._refreshed = now
+
+    # ---------------------------------------------------------------------
+    #  Queries
+    # ---------------------------------------------------------------------
+
+    def rank_of(self, user_id: str) -> Optional[int]:
+        """1-based position, ties broken by userId."""
+        with self._lock:
+            entry = self._points.get(user_id)
+            if entry is None:
+                return None
+            above = len(self._points) - self._fenwick.prefix(entry[0])
+            return above + bisect_left(self._by_score[entry[0]], user_id) + 1
+
+    def at_rank(self, rank: int) -> Optional[Dict]:
+        with self._lock:
+            n = len(self._points)
+            if not 1 <= rank <= n:
+                return None
+            score = self._fenwick.lowest_with_prefix(n - rank + 1)
+            above = n - self._fenwick.prefix(score)
+            user_id = self._by_score[score][rank - above - 1]
+            points, correct = self._points[user_id]
+            return {"rank": rank, "userId": user_id, "totalPoints": points, "correctAnswers": correct}
+
+    def top(self, limit: int) -> List[Dict]:
+        with self._lock:
+            return [e for e in (self.at_rank(r) for r in range(1, limit + 1)) if e]
+
+    def around(self, user_id: str, radius: int) -> Optional[Dict]:
+        with self._lock:
+            rank = self.rank_of(user_id)
+            if rank is None:
+                return None
+            window = [self.at_rank(r) for r in range(max(1, rank - radius), rank + radius + 1)]
+            return {"rank": rank, "players": len(self._points),
+                    "neighbours": [e for e in window if e]}
+
+    # ---------------------------------------------------------------------
+    #  Snapshots
+    # ---------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, int]:
+        """Persist the board as chunked documents and point 'latest' at them."""
+        self.refresh(force=True)
+        with self._lock:
+            players = [[u, p, c] for u, (p, c) in self._points.items()]
+            taken_at = self._since
+        snap = str(ObjectId())
+        chunks = [players[i:i + SNAPSHOT_CHUNK] for i in range(0, len(players), SNAPSHOT_CHUNK)]
+        for seq, chunk in enumerate(chunks):
+            self.snapshots.insert_one({"snapshot": snap, "seq": seq, "players": chunk})
+        previous = self.snapshots.find_one_and_update(
+            {"_id": "latest"}, {"$set": {"current": snap, "taken_at": taken_at}}, upsert=True)
+        if previous:
+            self.snapshots.delete_many({"snapshot": previous["current"]})
+        return {"players": len(players), "chunks": len(chunks)}
+
+
+def start_snapshotter(board: Leaderboard, db, minutes: int = SNAPSHOT_MINUTES) -> Optional[threading.Thread]:
+    """Periodic snapshots from one worker at a time; 0 minutes disables them."""
+    if minutes <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(minutes * 60)
+            try:
+                if stats_counters.claim_lease(db, "leaderboard_snapshot", minutes):
+                    logger.info(f"Leaderboard snapshot: {board.snapshot()}")
+            except Exception as e:
+                logger.warning(f"Leaderboard snapshot failed: {e}")
+
+    thread = threading.Thread(target=loop, name="leaderboard-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+
+leaderboard = Leaderboard()
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Quiz leaderboard")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("snapshot", help="persist a leaderboard snapshot for cold starts")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    leaderboard.bind(database)
+    print(leaderboard.snapshot())
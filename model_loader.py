@@ -1,33 +1,374 @@
-git add model_loader.py requirements.txt
-git commit -m "remove transformer model - run on free tier without OOM"
-git push"""
-model_loader.py - Transformer model disabled (free tier deployment)
-App runs on scikit-learn ensemble + NLP + NewsAPI + sentiment analysis.
 """
+model_loader.py - CPU-only quantized transformer backend.
 
+Serves a distilled classifier exported to ONNX with int8 dynamic quantization
+through onnxruntime; tokenization uses the Rust `tokenizers` package, so
+neither torch nor transformers is needed at serve time. Weights are stored
+as ONNX external data and prepacking is off by default, which lets
+onnxruntime memory-map them: pages come from the shared page cache and every
+gunicorn worker on the host reuses the same copy.
+
+Model directory layout (TRANSFORMER_MODEL_DIR):
+    model.int8.onnx        graph
+    model.int8.onnx.data   int8 weights (memory-mapped)
+    tokenizer.json         fast tokenizer
+    config.json            id2label
+
+Build it once, offline, with torch + transformers + onnx installed:
+    python model_loader.py export <hf-model-id-or-path> --out models/fake-news-int8
+
+Without the files (or onnxruntime) available() is False and app.py falls
+back to the scikit-learn ensemble exactly as before.
+"""
+
+import json
 import logging
-from typing import Dict, Any, Optional
+import os
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Optional
+
+from worker_queue import WorkerQueue
 
 logger = logging.getLogger(__name__)
 
+# Backend modules are imported by _import_backend() only once a model is
+# actually present, so a disabled or missing transformer costs no import time.
+np = ort = Tokenizer = None
+
+
+def _import_backend() -> bool:
+    global np, ort, Tokenizer
+    try:
+        import numpy as np
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        return True
+    except ImportError:
+        return False
+
+MODEL_FILE     = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE    = "config.json"
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "models", "fake-news-int8")
+
+TRANSFORMER_ENABLED    = os.getenv("TRANSFORMER_ENABLED", "True").lower() == "true"
+TRANSFORMER_MODEL_DIR  = os.getenv("TRANSFORMER_MODEL_DIR", DEFAULT_MODEL_DIR)
+TRANSFORMER_THREADS    = max(1, int(os.getenv("TRANSFORMER_THREADS", "2")))
+TRANSFORMER_MAX_LENGTH = int(os.getenv("TRANSFORMER_MAX_LENGTH", "256"))
+# Prepacking copies weights into anonymous memory (faster GEMM, no sharing).
+TRANSFORMER_PREPACK    = os.getenv("TRANSFORMER_PREPACK", "False").lower() == "true"
+
+# Micro-batching across concurrent requests (see MicroBatcher)
+TRANSFORMER_BATCHING       = os.getenv("TRANSFORMER_BATCHING", "True").lower() == "true"
+TRANSFORMER_MAX_BATCH      = max(1, int(os.getenv("TRANSFORMER_MAX_BATCH", "16")))
+TRANSFORMER_BATCH_WAIT_MS  = float(os.getenv("TRANSFORMER_BATCH_WAIT_MS", "5"))
+TRANSFORMER_QUEUE_MAX      = int(os.getenv("TRANSFORMER_QUEUE_MAX", "256"))
+TRANSFORMER_RESULT_TIMEOUT = float(os.getenv("TRANSFORMER_RESULT_TIMEOUT", "5"))
+
+UNAVAILABLE = {
+    "prediction": "UNAVAILABLE",
+    "confidence": 0.0,
+    "fake_probability": 0.0,
+    "real_probability": 0.0,
+    "success": False,
+}
+
 
 class FakeNewsDetectorModels:
-    def __init__(self, model_dir: Optional[str] = None):
+    def __init__(self, model_dir: Optional[str] = None, load: bool = True):
+        self.model_dir = model_dir or TRANSFORMER_MODEL_DIR
         self._available = False
-        logger.info("Transformer model disabled - using scikit-learn ensemble")
+        self._session = None
+        self._tokenizer = None
+        self._input_names: List[str] = []
+        self._fake_index = 1
+        self._pad_id = 0
+        self._batcher: Optional[MicroBatcher] = None
+        self._loaded_pid: Optional[int] = None
+        if load:
+            self.load()
+
+    def load(self) -> bool:
+        """
+        Build the onnxruntime session in this process. Sessions own a thread
+        pool and are not fork-safe, so preloaded servers call this after fork;
+        the weights are memory-mapped and still shared through the page cache.
+        """
+        if self._loaded_pid == os.getpid():
+            return self._available
+        self._loaded_pid = os.getpid()
+        self._available = False
+        if not TRANSFORMER_ENABLED:
+            logger.info("Transformer disabled (TRANSFORMER_ENABLED=False) - using scikit-learn ensemble")
+            return False
+        try:
+            self._load()
+            self._available = True
+            if TRANSFORMER_BATCHING:
+                self._batcher = MicroBatcher(self._forward)
+            logger.info(f"Transformer loaded from {self.model_dir} "
+                        f"(int8 ONNX, {TRANSFORMER_THREADS} threads)")
+        except FileNotFoundError as e:
+            logger.info(f"Transformer model not found ({e}) - using scikit-learn ensemble")
+        except Exception as e:
+            logger.warning(f"Transformer load failed: {e} - using scikit-learn ensemble")
+        return self._available
+
+    def _load(self):
+        model_path = os.path.join(self.model_dir, MODEL_FILE)
+        tok_path   = os.path.join(self.model_dir, TOKENIZER_FILE)
+        for p in (model_path, tok_path):
+            if not os.path.exists(p):
+                raise FileNotFoundError(p)
+        if not _import_backend():
+            raise RuntimeError("onnxruntime/tokenizers not installed")
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = TRANSFORMER_THREADS
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # The arena keeps peak activation memory forever; release it per run.
+        opts.enable_cpu_mem_arena = False
+        if not TRANSFORMER_PREPACK:
+            opts.add_session_config_entry("session.disable_prepacking", "1")
+        self._session = ort.InferenceSession(model_path, opts,
+                                             providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self._session.get_inputs()]
+
+        self._tokenizer = Tokenizer.from_file(tok_path)
+        self._tokenizer.enable_truncation(max_length=TRANSFORMER_MAX_LENGTH)
+        # Padding is applied per length bucket in _forward, not by the tokenizer.
+        self._tokenizer.no_padding()
+        self._pad_id = next((self._tokenizer.token_to_id(t) for t in ("[PAD]", "<pad>")
+                             if self._tokenizer.token_to_id(t) is not None), 0)
+        self._fake_index = self._read_fake_index()
+
+    def _read_fake_index(self) -> int:
+        try:
+            with open(os.path.join(self.model_dir, CONFIG_FILE)) as f:
+                id2label = json.load(f).get("id2label", {})
+        except (OSError, ValueError):
+            return 1
+        for idx, label in id2label.items():
+            if "FAKE" in str(label).upper():
+                return int(idx)
+        return 1   # LABEL_MAP convention: 0 REAL, 1 FAKE
 
     def available(self) -> bool:
-        return False
+        return self._available
 
-    def predict(self, text: str) -> Dict[str, Any]:
+    def _forward(self, texts: List[str]) -> List[float]:
+        """
+        Return P(fake) per text. Texts are grouped into power-of-two length
+        buckets and each bucket is padded only to its own longest member, so
+        one long headline does not inflate the whole batch.
+        """
+        encodings = self._tokenizer.encode_batch(texts)
+        buckets: Dict[int, List[int]] = {}
+        for i, e in enumerate(encodings):
+            buckets.setdefault(_length_bucket(len(e.ids)), []).append(i)
+
+        out = [0.0] * len(texts)
+        for idxs in buckets.values():
+            width = max(len(encodings[i].ids) for i in idxs)
+            arrays = {n: np.full((len(idxs), width), self._pad_id if n == "input_ids" else 0,
+                                 dtype=np.int64)
+                      for n in ("input_ids", "attention_mask", "token_type_ids")}
+            for row, i in enumerate(idxs):
+                e, n = encodings[i], len(encodings[i].ids)
+                arrays["input_ids"][row, :n]      = e.ids
+                arrays["attention_mask"][row, :n] = 1
+                arrays["token_type_ids"][row, :n] = e.type_ids
+            logits = self._session.run(None, {n: arrays[n] for n in self._input_names})[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probs  = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            for row, i in enumerate(idxs):
+                out[i] = float(probs[row, self._fake_index])
+        return out
+
+    @staticmethod
+    def _result(fake_prob: float) -> Dict[str, Any]:
+        fake_prob = float(fake_prob)
+        label = "FAKE" if fake_prob >= 0.5 else "REAL"
         return {
-            "prediction": "UNAVAILABLE",
-            "confidence": 0.0,
-            "fake_probability": 0.0,
-            "real_probability": 0.0,
-            "success": False,
+            "prediction": label,
+            "confidence": round(max(fake_prob, 1 - fake_prob), 4),
+            "raw_score": round(fake_prob, 4),
+            "fake_probability": round(fake_prob, 4),
+            "real_probability": round(1 - fake_prob, 4),
+            "success": True,
         }
 
+    def submit(self, text: str) -> Future:
+        """Queue text for the next micro-batch; the future resolves to predict()'s dict."""
+        if not self._available or not text:
+            done: Future = Future()
+            done.set_result(dict(UNAVAILABLE))
+            return done
+        if self._batcher is None:
+            done = Future()
+            try:
+                done.set_result(self._result(self._forward([text])[0]))
+            except Exception as e:
+                done.set_exception(e)
+            return done
+        return self._batcher.submit(text, self._result)
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        return self.submit(text).result(timeout=TRANSFORMER_RESULT_TIMEOUT)
+
+    def stats(self) -> Dict[str, Any]:
+        if not self._available:
+            return {"available": False}
+        return {"available": True, "threads": TRANSFORMER_THREADS,
+                **(self._batcher.stats() if self._batcher else {"batching": False})}
+
+
+def _length_bucket(n: int) -> int:
+    return max(16, 1 << (max(n, 1) - 1).bit_length())
+
+
+class MicroBatcher(WorkerQueue):
+    """
+    Shared inference queue. A single worker thread takes the first waiting
+    request, keeps collecting for up to TRANSFORMER_BATCH_WAIT_MS or until
+    TRANSFORMER_MAX_BATCH requests are queued, runs one forward pass and
+    resolves each caller's future. The thread starts on first use and is
+    restarted after fork (see worker_queue), so a preloaded parent never
+    hands a dead thread to its workers.
+    """
+
+    thread_name = "transformer-batcher"
+
+    def __init__(self, forward: Callable[[List[str]], List[float]],
+                 max_batch: Optional[int] = None, wait_ms: Optional[float] = None,
+                 max_queue: Optional[int] = None):
+        self.forward   = forward
+        self.max_batch = max_batch or TRANSFORMER_MAX_BATCH
+        self.wait      = (wait_ms if wait_ms is not None else TRANSFORMER_BATCH_WAIT_MS) / 1000.0
+        self.max_queue = max_queue or TRANSFORMER_QUEUE_MAX
+        super().__init__()
+        self._batches = self._items = self._rejected = self._largest = 0
+        self._wait_total = 0.0
+        self._sizes = {"1": 0, "2-4": 0, "5-8": 0, "9-16": 0, "17+": 0}
+
+    def submit(self, text: str, shape: Callable[[float], Dict[str, Any]]) -> Future:
+        fut: Future = Future()
+        self._ensure_worker()
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._rejected += 1
+                fut.set_exception(RuntimeError("Transformer queue full"))
+                return fut
+            self._queue.append((text, shape, fut, time.monotonic()))
+            self._cond.notify()
+        return fut
+
+    def _collect(self) -> list:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            started = time.monotonic()
+            try:
+                probs = self.forward([text for text, _, _, _ in batch])
+                for (_, shape, fut, _), p in zip(batch, probs):
+                    fut.set_result(shape(p))
+            except Exception as e:
+                logger.error(f"Transformer batch of {len(batch)} failed: {e}")
+                for _, _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            self._record(batch, started)
+
+    def _record(self, batch: list, started: float):
+        n = len(batch)
+        with self._cond:
+            self._batches += 1
+            self._items   += n
+            self._largest  = max(self._largest, n)
+            self._wait_total += sum(started - queued for _, _, _, queued in batch)
+            key = "1" if n == 1 else "2-4" if n <= 4 else "5-8" if n <= 8 else "9-16" if n <= 16 else "17+"
+            self._sizes[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "batching":        True,
+                "queue_depth":     len(self._queue),
+                "batches":         self._batches,
+                "items":           self._items,
+                "rejected":        self._rejected,
+                "avg_batch_size":  round(self._items / self._batches, 2) if self._batches else 0.0,
+                "max_batch_size":  self._largest,
+                "batch_sizes":     dict(self._sizes),
+                "avg_queue_ms":    round(self._wait_total / self._items * 1000, 2) if self._items else 0.0,
+                "max_batch":       self.max_batch,
+                "wait_ms":         self.wait * 1000,
+            }
+
+
+def export_model(model_name: str, out_dir: str, opset: int = 17):
+    """Export a Hugging Face sequence classifier to int8 ONNX with external weights."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["placeholder headline"], return_tensors="pt")
+    names  = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    fp32_path = os.path.join(out_dir, "model.fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[n] for n in names), fp32_path,
+            input_names=names, output_names=["logits"], opset_version=opset,
+            dynamic_axes={**{n: {0: "batch", 1: "sequence"} for n in names},
+                          "logits": {0: "batch"}},
+        )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, MODEL_FILE),
+                     weight_type=QuantType.QInt8, use_external_data_format=True)
+    os.remove(fp32_path)
+
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+    with open(os.path.join(out_dir, CONFIG_FILE), "w") as f:
+        json.dump({"source": model_name,
+                   "id2label": {str(k): v for k, v in model.config.id2label.items()}}, f, indent=2)
+    print(f"Exported {model_name} -> {out_dir}")
+
+
+# Global singleton used by app.py. Under gunicorn --preload (VERITAS_PRELOAD)
+# the session is built per worker by app.init_worker() instead.
+model_detector = FakeNewsDetectorModels(
+    load=os.getenv("VERITAS_PRELOAD", "False").lower() != "true",
+)
+
 
-# Global singleton used by app.py
-model_detector = FakeNewsDetectorModels()
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Transformer model tooling")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="export + int8-quantize a HF classifier")
+    exp.add_argument("model", help="Hugging Face model id or local path")
+    exp.add_argument("--out", default=TRANSFORMER_MODEL_DIR)
+    exp.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    if args.command == "export":
+        export_model(args.model, args.out, args.opset)
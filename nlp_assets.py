@@ -0,0 +1,216 @@
+"""
+nlp_assets.py - offline NLTK data for the NLP detector and claim extractor.
+
+Workers never download anything. The corpora live in a versioned local cache
+(NLTK_ASSETS_DIR/v<ASSETS_VERSION>) built once, at image build time:
+
+    python nlp_assets.py prepare-assets          # download into the cache
+    python nlp_assets.py prepare-assets --from ~/nltk_data   # copy, no network
+    python nlp_assets.py check                   # exit 1 if anything is missing
+
+NLTK itself is imported on first use, not at worker boot. If the cache (or
+the user's own nltk_data) lacks a resource, tokenization falls back to regex
+splitting and sentiment features are skipped until assets are prepared.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("veritas_ai.nlp_assets")
+
+# Bump when RESOURCES changes so old images never serve a partial cache.
+ASSETS_VERSION = "1"
+
+RESOURCES = {
+    "punkt":         "tokenizers/punkt",
+    "punkt_tab":     "tokenizers/punkt_tab",
+    "stopwords":     "corpora/stopwords",
+    "vader_lexicon": "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt",  # kept zipped
+}
+
+ASSETS_ROOT = (os.getenv("NLTK_ASSETS_DIR")
+               or os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data"))
+MANIFEST = "manifest.json"
+
+_lock     = threading.Lock()
+_nltk     = None
+_missing: List[str] = []
+_sia      = None
+_fallback = set()
+
+
+def cache_dir() -> str:
+    return os.path.join(ASSETS_ROOT, f"v{ASSETS_VERSION}")
+
+
+def _load():
+    """Import NLTK and point it at the versioned cache (first caller only)."""
+    global _nltk, _missing
+    if _nltk is not None:
+        return _nltk
+    with _lock:
+        if _nltk is None:
+            import nltk
+            if cache_dir() not in nltk.data.path:
+                nltk.data.path.insert(0, cache_dir())
+            _missing = [name for name, path in RESOURCES.items() if not _found(nltk, path)]
+            if _missing:
+                logger.warning(f"NLTK data missing: {', '.join(_missing)} - "
+                               f"run `python nlp_assets.py prepare-assets`")
+            _nltk = nltk
+    return _nltk
+
+
+def _found(nltk, path: str) -> bool:
+    try:
+        nltk.data.find(path)
+        return True
+    except (LookupError, OSError):
+        # OSError: punkt_tab path resolution bug in NLTK on Python 3.14
+        return False
+
+
+def preload():
+    """Import NLTK and build the sentiment analyzer now (e.g. before fork)."""
+    _load()
+    try:
+        sentiment_analyzer()
+    except LookupError:
+        pass
+
+
+def _degraded(kind: str, err: Exception, fallback: str = "regex fallback"):
+    if kind not in _fallback:
+        _fallback.add(kind)
+        logger.warning(f"NLTK {kind} unavailable ({type(err).__name__}) - using {fallback}")
+
+
+def sent_tokenize(text: str) -> List[str]:
+    if "sent_tokenize" not in _fallback:
+        try:
+            return _load().sent_tokenize(text)
+        except (LookupError, OSError) as e:
+            _degraded("sent_tokenize", e)
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+
+def word_tokenize(text: str) -> List[str]:
+    if "word_tokenize" not in _fallback:
+        try:
+            return _load().word_tokenize(text)
+        except (LookupError, OSError) as e:
+            _degraded("word_tokenize", e)
+    return re.findall(r"\w+|[^\w\s]", text)
+
+
+def sentiment_analyzer():
+    """
+    Shared VADER analyzer. Raises LookupError when vader_lexicon is missing;
+    the first failure is remembered, so later calls raise without retrying.
+    """
+    global _sia
+    if _sia is None:
+        if "sentiment" in _fallback:
+            raise LookupError("vader_lexicon unavailable")
+        _load()
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        with _lock:
+            if _sia is None:
+                try:
+                    _sia = SentimentIntensityAnalyzer()
+                except (LookupError, OSError) as e:
+                    _degraded("sentiment", e, "neutral scores")
+                    raise LookupError("vader_lexicon unavailable") from e
+    return _sia
+
+
+def status() -> Dict:
+    """Cheap health summary; does not import NLTK."""
+    manifest = os.path.join(cache_dir(), MANIFEST)
+    return {
+        "version":  ASSETS_VERSION,
+        "prepared": os.path.exists(manifest),
+        "loaded":   _nltk is not None,
+        "missing":  list(_missing) if _nltk is not None else None,
+        "fallback": sorted(_fallback),
+    }
+
+
+def prepare(force: bool = False, source: Optional[str] = None) -> Dict:
+    """
+    Fill the versioned cache and write its manifest. Resources are downloaded,
+    or copied from ``source`` (an existing nltk_data directory) for fully
+    offline builds.
+    """
+    import nltk
+    target = cache_dir()
+    os.makedirs(target, exist_ok=True)
+    # Newer NLTK only opens zip resources that live under nltk.data.path.
+    for d in filter(None, (target, source)):
+        if d not in nltk.data.path:
+            nltk.data.path.append(d)
+    for name, path in RESOURCES.items():
+        if not force and _found_in(nltk, path, target):
+            print(f"  {name:<14} cached")
+            continue
+        if source:
+            if not _found_in(nltk, path, source):
+                raise RuntimeError(f"{name} not found in {source}")
+            package  = re.match(r"(.*?\.zip)", path).group(1) if ".zip" in path else path
+            src, dst = os.path.join(source, package), os.path.join(target, package)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.isdir(src):
+                shutil.copytree(src, dst, dirs_exist_ok=True)
+            else:
+                shutil.copy2(src, dst)
+            print(f"  {name:<14} copied")
+            continue
+        if not nltk.download(name, download_dir=target, quiet=True, raise_on_error=True):
+            raise RuntimeError(f"NLTK download failed for {name}")
+        print(f"  {name:<14} downloaded")
+    manifest = {
+        "version":     ASSETS_VERSION,
+        "nltk":        nltk.__version__,
+        "resources":   sorted(RESOURCES),
+        "prepared_at": datetime.utcnow().isoformat(),
+    }
+    with open(os.path.join(target, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _found_in(nltk, path: str, directory: str) -> bool:
+    try:
+        nltk.data.find(path, paths=[directory])
+        return True
+    except (LookupError, OSError):
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="NLTK asset cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    prep = sub.add_parser("prepare-assets", help="build the versioned NLTK cache")
+    prep.add_argument("--force", action="store_true", help="re-fetch cached resources")
+    prep.add_argument("--from", dest="source", help="copy from an existing nltk_data dir")
+    sub.add_parser("check", help="exit 1 if any resource is missing")
+    args = parser.parse_args()
+
+    if args.command == "prepare-assets":
+        print(f"Preparing NLTK assets in {cache_dir()}")
+        prepare(force=args.force, source=args.source)
+        print("Done.")
+    else:
+        _load()
+        if _missing:
+            print(f"Missing: {', '.join(_missing)}")
+            sys.exit(1)
+        print(f"All NLTK resources present (cache {cache_dir()})")
@@ -0,0 +1,116 @@
+"""
+prediction_details.py - content-addressed storage for prediction detail.
+
+Prediction records keep only what history lists (headline, label,
+confidence, method, topic, timestamp) plus the feature vector used for
+feedback. The heavy detail - source verification, URL credibility, claim
+checks and component results - goes to ``prediction_details`` under the
+SHA-256 of its canonical JSON, referenced by ``detail_hash``. Repeat checks
+of a headline served from the verification cache produce the same payload,
+so it is stored once. The store is append-only: records archived to the
+cold tier keep their detail_hash and still read detail from here, so a
+detail document is never removed.
+
+    python prediction_details.py migrate      # move detail out of legacy records
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger("veritas_ai.details")
+
+COLLECTION    = "prediction_details"
+_MIGRATED_ID  = "prediction_details_migrated"   # stats_counters _id
+DETAIL_FIELDS = ("source_verification", "url_credibility", "claim_verification", "component_results")
+
+# What history needs; legacy records that still embed detail are never read whole.
+SUMMARY_PROJECTION = {"headline": 1, "prediction": 1, "confidence": 1, "method": 1,
+                      "topic": 1, "timestamp": 1, "detail_hash": 1}
+DETAIL_PROJECTION  = {**SUMMARY_PROJECTION, **{f: 1 for f in DETAIL_FIELDS}}
+
+
+def content_hash(detail: Dict) -> str:
+    canonical = json.dumps(detail, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def detail_write(detail: Dict) -> Tuple[str, tuple]:
+    """(hash, WriteOp) storing ``detail`` once; apply it before the record referencing it."""
+    h = content_hash(detail)
+    return h, (COLLECTION, "update_one", (
+        {"_id": h},
+        {"$setOnInsert": {**detail, "created_at": datetime.utcnow()}},
+    ), {"upsert": True})
+
+
+def attach(db, docs: List[Dict]) -> List[Dict]:
+    """
+    Put the detail fields back on prediction docs: one $in query for the
+    hashed ones, legacy docs already carry them inline.
+    """
+    hashes = {d["detail_hash"] for d in docs if d.get("detail_hash")}
+    found  = {}
+    if hashes:
+        proj  = {f: 1 for f in DETAIL_FIELDS}
+        found = {p["_id"]: p for p in db[COLLECTION].find({"_id": {"$in": list(hashes)}}, proj)}
+    for d in docs:
+        stored = found.get(d.get("detail_hash"), {})
+        for f in DETAIL_FIELDS:
+            d.setdefault(f, stored.get(f))
+    return docs
+
+
+def migrated(db) -> bool:
+    """Whether a migrate() has completed; records written since never embed detail."""
+    return db.stats_counters.find_one({"_id": _MIGRATED_ID}) is not None
+
+
+def migrate(db, batch: int = 500) -> Dict[str, int]:
+    """Move embedded detail of legacy prediction records into the store, then record that it is done."""
+    moved = 0
+    query = {"detail_hash": {"$exists": False}, "source_verification": {"$exists": True}}
+    while True:
+        docs = list(db.predictions.find(query, {f: 1 for f in DETAIL_FIELDS}).limit(batch))
+        if not docs:
+            break
+        details, records = [], []
+        for d in docs:
+            h, op = detail_write({f: d.get(f) for f in DETAIL_FIELDS})
+            details.append(UpdateOne(*op[2], **op[3]))
+            records.append(UpdateOne({"_id": d["_id"]}, {
+                "$set":   {"detail_hash": h},
+                "$unset": {f: "" for f in DETAIL_FIELDS},
+            }))
+        db[COLLECTION].bulk_write(details, ordered=False)
+        db.predictions.bulk_write(records, ordered=False)
+        moved += len(docs)
+        logger.info(f"Migrated {moved} prediction records")
+    db.stats_counters.update_one({"_id": _MIGRATED_ID},
+                                 {"$set": {"done_at": datetime.utcnow(), "migrated": moved}}, upsert=True)
+    return {"migrated": moved}
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Prediction detail store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="move embedded detail out of legacy prediction records")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(migrate(database))
@@ -0,0 +1,422 @@
+"""
+quiz_pool.py - per-worker in-memory index of the quiz candidate pool.
+
+get_quiz_questions used to run one sorted find() per weak topic plus two
+fills, each with a growing $nin list, then an update_many. The pool keeps
+the active, quiz-eligible candidates in memory instead:
+
+    (topic, band) -> candidates ordered by used_count
+
+where band is the difficulty label of the candidate's confidence. Selection
+is one pass over those lists (a k-way merge when any topic will do).
+The index is refreshed incrementally by polling ``created_at`` every
+QUIZ_POOL_REFRESH_SECONDS and rebuilt every QUIZ_POOL_RELOAD_SECONDS, which
+also picks up other workers' used_count, TTL deletions and re-topics.
+used_count increments are counted locally and flushed as grouped
+update_many calls every QUIZ_POOL_FLUSH_SECONDS by a background thread.
+
+Candidates are unique by ``headline_key``, a hash of the normalised
+headline, so /api/predict adds one with a single upsert.
+
+    python quiz_pool.py migrate-votes    # fold legacy responses arrays into vote counters
+    python quiz_pool.py migrate-keys     # give legacy candidates their headline_key
+"""
+
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("veritas_ai.quiz_pool")
+
+REFRESH_SECONDS = float(os.getenv("QUIZ_POOL_REFRESH_SECONDS", "30"))
+RELOAD_SECONDS  = float(os.getenv("QUIZ_POOL_RELOAD_SECONDS", "600"))
+FLUSH_SECONDS   = float(os.getenv("QUIZ_POOL_FLUSH_SECONDS", "5"))
+QUESTIONS_CACHE_SECONDS = float(os.getenv("QUIZ_QUESTIONS_CACHE_SECONDS", "300"))
+
+# Polls overlap so a candidate committed slightly out of created_at order is not missed
+_POLL_OVERLAP = timedelta(seconds=60)
+
+LABELS = ("REAL", "FAKE")
+BANDS  = ("easy", "medium", "hard", "low")
+
+_PROJECTION = {"headline": 1, "prediction": 1, "confidence": 1, "topic": 1,
+               "explanation": 1, "used_count": 1, "expires_at": 1, "created_at": 1,
+               "component_results.nlp.confidence": 1,
+               "component_results.transformer.confidence": 1}
+
+
+_WORDS = re.compile(r"\w+")
+
+
+def headline_key(headline: str) -> str:
+    """Dedup key of a candidate: case, punctuation and spacing do not count."""
+    normalised = " ".join(_WORDS.findall(headline.lower()))
+    return hashlib.sha1(normalised.encode()).hexdigest()
+
+
+def band(confidence: float) -> str:
+    """Difficulty label of a candidate; 'low' is only served in mixed quizzes."""
+    if confidence >= 0.90:
+        return "easy"
+    if confidence >= 0.70:
+        return "medium"
+    if confidence >= 0.50:
+        return "hard"
+    return "low"
+
+
+def difficulty(confidence: float) -> str:
+    """Label shown to players; below the hard band still reads as hard."""
+    b = band(confidence)
+    return "hard" if b == "low" else b
+
+
+class CandidatePool:
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._lock      = threading.Lock()
+        self._reload_lock = threading.Lock()                   # one refresh at a time
+        self._docs: Dict = {}                                  # _id -> slim doc
+        self._buckets: Dict[Tuple[str, str], List] = defaultdict(list)   # sorted (used, seq, _id)
+        self._keys: Dict = {}                                  # _id -> its current sort key
+        self._seq       = itertools.count()
+        self._newest: Optional[datetime] = None
+        self._refreshed = 0.0
+        self._reloaded: Optional[float] = None
+        self._pending: Counter = Counter()                     # used_count deltas to flush
+        self._flusher_pid: Optional[int] = None
+
+    def bind(self, collection):
+        self.collection = collection
+        with self._lock:
+            self._reloaded = None   # reload from the new handle on next use
+
+    # ---------------------------------------------------------------------
+    #  Index maintenance
+    # ---------------------------------------------------------------------
+
+    def _bucket(self, doc: Dict) -> Tuple[str, str]:
+        return doc.get("topic", "general"), band(doc.get("confidence", 0.9))
+
+    def _insert(self, doc: Dict):
+        if doc.get("prediction") not in LABELS:
+            return
+        if doc["_id"] in self._docs:
+            self._remove(doc["_id"])
+        key = (doc.get("used_count", 0) + self._pending.get(doc["_id"], 0), next(self._seq), doc["_id"])
+        self._docs[doc["_id"]] = doc
+        self._keys[doc["_id"]] = key
+        insort(self._buckets[self._bucket(doc)], key)
+
+    def _remove(self, oid):
+        doc = self._docs.pop(oid)
+        key = self._keys.pop(oid)
+        bucket = self._buckets[self._bucket(doc)]
+        i = bisect_left(bucket, key)
+        if i < len(bucket) and bucket[i] == key:
+            del bucket[i]
+
+    def _bump(self, oid):
+        doc, key = self._docs[oid], self._keys[oid]
+        self._remove(oid)
+        self._docs[oid], self._keys[oid] = doc, (key[0] + 1, key[1], oid)
+        insort(self._buckets[self._bucket(doc)], self._keys[oid])
+
+    def get(self, oid) -> Optional[Dict]:
+        """Indexed candidate by _id (answer, explanation, topic), or None."""
+        with self._lock:
+            return self._docs.get(oid)
+
+    def add(self, doc: Dict):
+        """Index a candidate this worker just inserted."""
+        with self._lock:
+            self._insert(self._slim(doc))
+
+    @staticmethod
+    def _slim(doc: Dict) -> Dict:
+        comps = doc.get("component_results") or {}
+        return {
+            "_id": doc["_id"], "headline": doc["headline"], "prediction": doc.get("prediction"),
+            "confidence": doc.get("confidence", 0.9), "topic": doc.get("topic", "general"),
+            "difficulty": difficulty(doc.get("confidence", 0.9)),
+            "explanation": doc.get("explanation", ""), "used_count": doc.get("used_count", 0),
+            "expires_at": doc.get("expires_at"), "created_at": doc.get("created_at"),
+            "signals": {
+                "nlp_confidence":         round((comps.get("nlp") or {}).get("confidence", 0), 2),
+                "transformer_confidence": round((comps.get("transformer") or {}).get("confidence", 0), 2),
+            },
+        }
+
+    def _load(self, flt: Dict) -> List[Dict]:
+        return [self._slim(d) for d in self.collection.find(flt, _PROJECTION)]
+
+    def _index(self, docs: List[Dict], pending: Counter) -> Tuple[Dict, Dict, Dict]:
+        """A fresh (docs, keys, buckets) index of ``docs``, built without holding _lock."""
+        by_id: Dict = {}
+        keys: Dict = {}
+        buckets: Dict[Tuple[str, str], List] = defaultdict(list)
+        for doc in docs:
+            if doc.get("prediction") not in LABELS:
+                continue
+            key = (doc.get("used_count", 0) + pending.get(doc["_id"], 0), next(self._seq), doc["_id"])
+            by_id[doc["_id"]], keys[doc["_id"]] = doc, key
+            buckets[self._bucket(doc)].append(key)
+        for bucket in buckets.values():
+            bucket.sort()
+        return by_id, keys, buckets
+
+    def _due(self, force: bool) -> bool:
+        return force or self._reloaded is None or time.monotonic() - self._refreshed >= REFRESH_SECONDS
+
+    def refresh(self, force: bool = False):
+        """
+        Full reload when due, otherwise pull candidates created since the last
+        poll. One thread refreshes at a time; the others keep selecting from
+        the current index instead of waiting (only the first load and a forced
+        reload block).
+        """
+        if self.collection is None or not self._due(force):
+            return
+        if not self._reload_lock.acquire(blocking=force or self._reloaded is None):
+            return
+        try:
+            if not self._due(force):   # another thread refreshed while we waited
+                return
+            now_mono = time.monotonic()
+            now = datetime.utcnow()
+            if force or self._reloaded is None or now_mono - self._reloaded >= RELOAD_SECONDS:
+                docs = self._load({"expires_at": {"$gt": now}, "prediction": {"$in": list(LABELS)}})
+                with self._lock:
+                    pending = Counter(self._pending)
+                index = self._index(docs, pending)
+                with self._lock:
+                    self._docs, self._keys, self._buckets = index
+                    self._newest = max((d["created_at"] for d in docs if d.get("created_at")), default=now)
+                    self._reloaded = self._refreshed = now_mono
+                logger.info(f"Quiz pool loaded: {len(docs)} candidates")
+                return
+            docs = self._load({"created_at": {"$gt": self._newest - _POLL_OVERLAP}, "expires_at": {"$gt": now}})
+            with self._lock:
+                for d in docs:
+                    self._insert(d)
+                    if d.get("created_at") and d["created_at"] > self._newest:
+                        self._newest = d["created_at"]
+                self._refreshed = now_mono
+        finally:
+            self._reload_lock.release()
+
+    # ---------------------------------------------------------------------
+    #  Selection
+    # ---------------------------------------------------------------------
+
+    def _walk(self, buckets: Iterable[List], now: datetime, taken: set,
+              max_conf: Optional[float] = None) -> Iterator[Dict]:
+        """Live candidates of ``buckets`` in ascending used_count order."""
+        for _, _, oid in heapq.merge(*buckets):
+            doc = self._docs.get(oid)
+            if doc is None or oid in taken:
+                continue
+            if doc["expires_at"] and doc["expires_at"] <= now:
+                continue
+            if max_conf is not None and doc["confidence"] >= max_conf:
+                continue
+            yield doc
+
+    def select(self, weak_topics: List[str], limit: int, difficulty: str = "mixed") -> List[Dict]:
+        """
+        Same policy as the old query sequence: ~70% from the user's weak
+        topics in order, then borderline (< 0.80) candidates from any topic,
+        then anything left - least-shown first throughout.
+        """
+        self.refresh()
+        now   = datetime.utcnow()
+        bands = [difficulty] if difficulty in BANDS[:3] else list(BANDS)
+        chosen: List[Dict] = []
+        taken: set = set()
+        with self._lock:
+            def take(docs: Iterator[Dict], n: int):
+                for doc in itertools.islice(docs, max(n, 0)):
+                    taken.add(doc["_id"])
+                    chosen.append(doc)
+
+            target = max(1, int(limit * 0.7))
+            for topic in weak_topics:
+                if len(chosen) >= target:
+                    break
+                take(self._walk([self._buckets.get((topic, b), []) for b in bands], now, taken),
+                     target - len(chosen))
+            # Borderline fill ignores the band, as the 0.80 cut-off replaces it
+            take(self._walk(list(self._buckets.values()), now, taken, max_conf=0.80), limit - len(chosen))
+            take(self._walk([v for (_, b), v in self._buckets.items() if b in bands], now, taken),
+                 limit - len(chosen))
+            for doc in chosen:
+                self._bump(doc["_id"])
+                self._pending[doc["_id"]] += 1
+        self._ensure_flusher()
+        return chosen
+
+    # ---------------------------------------------------------------------
+    #  Batched used_count writes
+    # ---------------------------------------------------------------------
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending or self.collection is None:
+            return 0
+        by_count: Dict[int, List] = defaultdict(list)
+        for oid, n in pending.items():
+            by_count[n].append(oid)
+        try:
+            for n, ids in by_count.items():
+                self.collection.update_many({"_id": {"$in": ids}}, {"$inc": {"used_count": n}})
+        except Exception as e:
+            logger.warning(f"used_count flush failed: {e}")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return len(pending)
+
+    def _ensure_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def loop():
+            while True:
+                time.sleep(FLUSH_SECONDS)
+                self.flush()
+
+        threading.Thread(target=loop, name="quiz-pool-flush", daemon=True).start()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "candidates": len(self._docs),
+                "buckets":    {f"{t}/{b}": len(v) for (t, b), v in self._buckets.items() if v},
+                "pending_used_counts": sum(self._pending.values()),
+            }
+
+
+def _question(doc: Dict) -> Dict:
+    # import_quiz_questions.py stores the answer as correctAnswer
+    doc.setdefault("correct_answer", doc.pop("correctAnswer", None))
+    return doc
+
+
+class QuestionBank:
+    """Curated quiz_questions keyed by id, reloaded every QUIZ_QUESTIONS_CACHE_SECONDS."""
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._by_id: Dict[str, Dict] = {}
+        self._loaded: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def bind(self, collection):
+        self.collection = collection
+        self._loaded = None
+
+    def get(self, question_id: str) -> Optional[Dict]:
+        if self.collection is not None and (
+                self._loaded is None or time.monotonic() - self._loaded >= QUESTIONS_CACHE_SECONDS):
+            with self._lock:
+                if self._loaded is None or time.monotonic() - self._loaded >= QUESTIONS_CACHE_SECONDS:
+                    try:
+                        self._by_id = {d["id"]: d for d in map(_question, self.collection.find(
+                            {}, {"_id": 0, "id": 1, "correct_answer": 1, "correctAnswer": 1,
+                                 "explanation": 1, "topic": 1}))
+                            if d.get("id")}
+                    except Exception as e:
+                        logger.warning(f"Quiz question reload failed: {e}")
+                    self._loaded = time.monotonic()
+        return self._by_id.get(question_id)
+
+
+candidate_pool = CandidatePool()
+question_bank  = QuestionBank()
+
+
+def migrate_votes(db, batch: int = 500) -> Dict[str, int]:
+    """
+    Replace the ``responses`` array of legacy candidates with the
+    fake_votes / total_votes counters /api/quiz/submit now maintains.
+    """
+    from pymongo import UpdateOne
+    migrated = 0
+    while True:
+        docs = list(db.quiz_candidates.find({"responses": {"$exists": True}},
+                                            {"responses.answer": 1}).limit(batch))
+        if not docs:
+            break
+        ops = []
+        for d in docs:
+            answers = [r.get("answer") for r in d.get("responses") or []]
+            ops.append(UpdateOne({"_id": d["_id"]}, {
+                "$inc":   {"total_votes": len(answers), "fake_votes": answers.count("FAKE")},
+                "$unset": {"responses": ""},
+            }))
+        db.quiz_candidates.bulk_write(ops, ordered=False)
+        migrated += len(ops)
+    return {"migrated": migrated}
+
+
+def migrate_keys(db, batch: int = 500) -> Dict[str, int]:
+    """
+    Set ``headline_key`` on legacy candidates, oldest first. A later
+    duplicate of an already keyed headline stays unkeyed (the unique index
+    is partial) and simply ages out through the TTL.
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+    keyed = duplicates = 0
+    last  = None
+    while True:
+        query = {"headline_key": {"$exists": False}}
+        if last is not None:
+            query["_id"] = {"$gt": last}
+        docs = list(db.quiz_candidates.find(query, {"headline": 1}).sort("_id", 1).limit(batch))
+        if not docs:
+            break
+        last = docs[-1]["_id"]
+        ops  = [UpdateOne({"_id": d["_id"]}, {"$set": {"headline_key": headline_key(d.get("headline") or "")}})
+                for d in docs]
+        try:
+            keyed += db.quiz_candidates.bulk_write(ops, ordered=False).modified_count
+        except BulkWriteError as e:
+            keyed      += e.details.get("nModified", 0)
+            duplicates += len(e.details.get("writeErrors", []))
+    return {"keyed": keyed, "duplicates": duplicates}
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Quiz candidate pool maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate-votes", help="fold legacy responses arrays into vote counters")
+    sub.add_parser("migrate-keys", help="set headline_key on legacy candidates")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(migrate_keys(database) if args.command == "migrate-keys" else migrate_votes(database))
@@ -0,0 +1,203 @@
+"""
+rollups.py - hourly and daily prediction rollups for analytics.
+
+A background folder turns new predictions into bucket documents, so
+dashboards never aggregate over the ``predictions`` collection itself:
+
+    prediction_rollups_hourly   one doc per (hour, topic)
+    prediction_rollups_daily    one doc per (day, topic), summed from hourly
+
+Each bucket holds total, labels.<label>, methods.<method> and
+confidence_sum (mean = confidence_sum / total). Every fold recomputes whole
+hours from the stored watermark hour up to now - ROLLUP_LAG_SECONDS, then
+rebuilds the days those hours fall in. Rerunning a fold is therefore
+harmless, and a prediction that commits slightly late is still counted.
+One worker folds every ROLLUP_INTERVAL_MINUTES; the CLI folds on demand.
+
+    python rollups.py fold
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+import stats_counters
+
+logger = logging.getLogger("veritas_ai.rollups")
+
+HOURLY = "prediction_rollups_hourly"
+DAILY  = "prediction_rollups_daily"
+GRANULARITIES = {"hour": (HOURLY, timedelta(hours=1)), "day": (DAILY, timedelta(days=1))}
+
+ROLLUP_INTERVAL_MINUTES = int(os.getenv("ROLLUP_INTERVAL_MINUTES", "5"))
+ROLLUP_LAG_SECONDS      = int(os.getenv("ROLLUP_LAG_SECONDS", "120"))
+
+_WATERMARK = "rollup_watermark"   # stats_counters _id
+_FIELDS    = {"_id": 0, "timestamp": 1, "topic": 1, "headline": 1,
+              "prediction": 1, "method": 1, "confidence": 1}
+
+
+def _hour(t: datetime) -> datetime:
+    return t.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(t: datetime) -> datetime:
+    return t.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _bucket_id(start: datetime, topic: str) -> str:
+    return f"{start.isoformat()}|{topic}"
+
+
+def _empty(start: datetime, topic: str) -> Dict:
+    return {"_id": _bucket_id(start, topic), "start": start, "topic": topic,
+            "total": 0, "labels": {}, "methods": {}, "confidence_sum": 0.0}
+
+
+def _add(bucket: Dict, label: str, method: str, n: int, confidence_sum: float):
+    bucket["total"] += n
+    bucket["labels"][label] = bucket["labels"].get(label, 0) + n
+    bucket["methods"][method] = bucket["methods"].get(method, 0) + n
+    bucket["confidence_sum"] += confidence_sum
+
+
+def _watermark(db) -> Optional[datetime]:
+    doc = db.stats_counters.find_one({"_id": _WATERMARK})
+    if doc:
+        return doc["folded_until"]
+    first = db.predictions.find_one({"timestamp": {"$ne": None}}, {"timestamp": 1},
+                                    sort=[("timestamp", 1)])
+    return first["timestamp"] if first else None
+
+
+def folded_until(db) -> Optional[datetime]:
+    doc = db.stats_counters.find_one({"_id": _WATERMARK})
+    return doc["folded_until"] if doc else None
+
+
+def _replace(db, collection: str, buckets: Iterable[Dict]) -> int:
+    ops = [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in buckets]
+    if ops:
+        db[collection].bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def fold(db, classify: Optional[Callable[[str], str]] = None,
+         now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Fold predictions up to ``now - ROLLUP_LAG_SECONDS`` into the buckets.
+    ``classify`` supplies a topic for records written before predictions
+    carried one.
+    """
+    upto  = (now or datetime.utcnow()) - timedelta(seconds=ROLLUP_LAG_SECONDS)
+    start = _watermark(db)
+    if start is None or start >= upto:
+        return {"predictions": 0, "hourly": 0, "daily": 0}
+    start = _hour(start)
+
+    hourly: Dict[Tuple[datetime, str], Dict] = {}
+    cursor = db.predictions.find({"timestamp": {"$gte": start, "$lt": upto}}, _FIELDS).batch_size(1000)
+    seen = 0
+    for p in cursor:
+        topic = p.get("topic") or (classify(p.get("headline", "")) if classify else "general")
+        key   = (_hour(p["timestamp"]), topic)
+        if key not in hourly:
+            hourly[key] = _empty(*key)
+        _add(hourly[key], p.get("prediction", "UNKNOWN"), p.get("method") or "unknown",
+             1, float(p.get("confidence") or 0.0))
+        seen += 1
+    n_hourly = _replace(db, HOURLY, hourly.values())
+
+    # Rebuild every touched day from its hourly buckets
+    first_day = _day(start)
+    daily: Dict[Tuple[datetime, str], Dict] = {}
+    for h in db[HOURLY].find({"start": {"$gte": first_day, "$lt": _day(upto) + timedelta(days=1)}}):
+        key = (_day(h["start"]), h["topic"])
+        if key not in daily:
+            daily[key] = _empty(*key)
+        d = daily[key]
+        d["total"] += h["total"]
+        d["confidence_sum"] += h["confidence_sum"]
+        for field in ("labels", "methods"):
+            for name, n in h[field].items():
+                d[field][name] = d[field].get(name, 0) + n
+    n_daily = _replace(db, DAILY, daily.values())
+
+    db.stats_counters.update_one({"_id": _WATERMARK},
+                                 {"$set": {"folded_until": upto}}, upsert=True)
+    return {"predictions": seen, "hourly": n_hourly, "daily": n_daily}
+
+
+def series(db, granularity: str, since: datetime, until: datetime,
+           topic: Optional[str] = None) -> List[Dict]:
+    """Bucket points in [since, until), summed over topics unless one is given."""
+    collection, step = GRANULARITIES[granularity]
+    flt: Dict = {"start": {"$gte": since, "$lt": until}}
+    if topic:
+        flt["topic"] = topic
+    points: Dict[datetime, Dict] = {}
+    for b in db[collection].find(flt, {"_id": 0}).sort("start", 1):
+        p = points.setdefault(b["start"], _empty(b["start"], topic or "all"))
+        p["total"] += b["total"]
+        p["confidence_sum"] += b["confidence_sum"]
+        for field in ("labels", "methods"):
+            for name, n in b[field].items():
+                p[field][name] = p[field].get(name, 0) + n
+    return [{
+        "start":           p["start"].isoformat(),
+        "total":           p["total"],
+        "fake":            p["labels"].get("FAKE", 0),
+        "real":            p["labels"].get("REAL", 0),
+        "unverified":      p["labels"].get("UNVERIFIED", 0),
+        "mean_confidence": round(p["confidence_sum"] / p["total"], 4) if p["total"] else None,
+        "methods":         p["methods"],
+    } for p in points.values()]
+
+
+def start_folder(db, classify: Optional[Callable[[str], str]] = None,
+                 minutes: int = ROLLUP_INTERVAL_MINUTES) -> Optional[threading.Thread]:
+    """
+    Background folding for this worker; 0 minutes disables it. The first
+    fold waits one interval so it never races the worker's own start-up.
+    """
+    if minutes <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(minutes * 60)
+            try:
+                if stats_counters.claim_lease(db, "rollups", minutes):
+                    result = fold(db, classify)
+                    logger.info(f"Rollups folded: {result}")
+            except Exception as e:
+                logger.warning(f"Rollup fold failed: {e}")
+
+    thread = threading.Thread(target=loop, name="rollup-folder", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Prediction rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("fold", help="fold new predictions into hourly/daily buckets")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(fold(database))
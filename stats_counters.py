@@ -0,0 +1,256 @@
+"""
+stats_counters.py - materialised counters behind /api/stats,
+/api/quiz/pool-stats and /api/health.
+
+Writers $inc small documents in the stats_counters collection next to the
+record they insert, so the read endpoints fetch one document instead of
+counting whole collections:
+
+    global      predictions, labels.<label>
+    user:<id>   predictions, labels.<label>
+    quiz_pool   candidates, with_consensus, topics.<topic>,
+                labels.<prediction>, expiring.<YYYYMMDDHH>
+
+Counters drift when documents disappear behind the app's back (TTL expiry of
+quiz candidates, manual deletes), so ``reconcile`` recomputes them from the
+source collections. A missing or outdated counter is reconciled on first
+read; workers also run it every STATS_RECONCILE_MINUTES (one at a time).
+
+    python stats_counters.py reconcile            # global + quiz_pool
+    python stats_counters.py reconcile --users    # every user:<id> as well
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger("veritas_ai.counters")
+
+# Documents reconciled under an older layout are rebuilt on first read
+# (v1 held only per-user prediction totals, without labels).
+COUNTERS_VERSION = 2
+
+GLOBAL    = "global"
+QUIZ_POOL = "quiz_pool"
+ARCHIVED  = "archived:"   # prefix of the cold-tier totals for global / user:<id>
+
+RECONCILE_MINUTES = int(os.getenv("STATS_RECONCILE_MINUTES", "60"))
+
+_EXPIRY_BUCKET = "%Y%m%d%H"
+_ARCHIVED_BATCHES = 20   # batch ids kept per archived: document for idempotent re-runs
+
+
+def user_key(user_id: str) -> str:
+    """stats_counters _id for a user's running totals."""
+    return f"user:{user_id}"
+
+
+def _expiry_bucket(expires_at: datetime) -> str:
+    return expires_at.strftime(_EXPIRY_BUCKET)
+
+
+# -------------------------------------------------------------------------
+#  Write side: WriteOps applied with the record they count
+# -------------------------------------------------------------------------
+
+def _inc(key: str, fields: Dict[str, int]):
+    return ("stats_counters", "update_one",
+            ({"_id": key}, {"$inc": fields}), {"upsert": True})
+
+
+def prediction_writes(user_id: str, label: str) -> List[tuple]:
+    fields = {"predictions": 1, f"labels.{label}": 1}
+    return [_inc(GLOBAL, fields), _inc(user_key(user_id), fields)]
+
+
+def candidate_write(doc: Dict) -> tuple:
+    return _inc(QUIZ_POOL, {
+        "candidates": 1,
+        f"topics.{doc['topic']}": 1,
+        f"labels.{doc['prediction']}": 1,
+        f"expiring.{_expiry_bucket(doc['expires_at'])}": 1,
+    })
+
+
+def consensus_write() -> tuple:
+    return _inc(QUIZ_POOL, {"with_consensus": 1})
+
+
+def record_archived(db, batch_id: str, per_user: Dict[str, Dict[str, int]]) -> bool:
+    """
+    Add a batch of records moved to the cold tier (archive.py) to the
+    ``archived:`` side documents that keep reconciliation counting them.
+    Each document remembers its recent batch ids, so applying the same
+    batch again (a run that died before deleting it) changes nothing.
+    Returns False if the batch had already been counted everywhere.
+    """
+    totals: Dict[str, int] = {}
+    for labels in per_user.values():
+        for label, n in labels.items():
+            totals[label] = totals.get(label, 0) + n
+    applied = False
+    for key, labels in [(GLOBAL, totals)] + [(user_key(u), l) for u, l in per_user.items()]:
+        fields = {"predictions": sum(labels.values()),
+                  **{f"labels.{label}": n for label, n in labels.items()}}
+        try:
+            db.stats_counters.update_one(
+                {"_id": ARCHIVED + key, "batches": {"$ne": batch_id}},
+                {"$inc": fields, "$push": {"batches": {"$each": [batch_id], "$slice": -_ARCHIVED_BATCHES}}},
+                upsert=True,
+            )
+            applied = True
+        except DuplicateKeyError:
+            pass   # document exists and already holds this batch
+    return applied
+
+
+# -------------------------------------------------------------------------
+#  Read side
+# -------------------------------------------------------------------------
+
+def read(db, key: str) -> Dict:
+    """Counter document for ``key``, reconciling it first if it is stale."""
+    doc = db.stats_counters.find_one({"_id": key})
+    if doc and doc.get("seeded") == COUNTERS_VERSION:
+        return doc
+    return reconcile_key(db, key)
+
+
+def label_counts(doc: Dict) -> Dict[str, int]:
+    return {label: n for label, n in (doc.get("labels") or {}).items() if n}
+
+
+def active_candidates(doc: Dict, now: Optional[datetime] = None) -> int:
+    """Candidates that have not expired yet, to the hour."""
+    current = _expiry_bucket(now or datetime.utcnow())
+    return sum(n for bucket, n in (doc.get("expiring") or {}).items() if bucket > current)
+
+
+# -------------------------------------------------------------------------
+#  Reconciliation: recompute from source
+# -------------------------------------------------------------------------
+
+def _grouped(collection, field: str, match: Optional[Dict] = None) -> Dict[str, int]:
+    pipeline = ([{"$match": match}] if match else []) + [
+        {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+    ]
+    return {str(r["_id"]): r["n"] for r in collection.aggregate(pipeline) if r["_id"] is not None}
+
+
+def _prediction_counts(db, key: str, match: Optional[Dict] = None) -> Dict:
+    labels   = _grouped(db.predictions, "prediction", match)
+    archived = db.stats_counters.find_one({"_id": ARCHIVED + key}) or {}
+    for label, n in (archived.get("labels") or {}).items():
+        labels[label] = labels.get(label, 0) + n
+    return {"predictions": sum(labels.values()), "labels": labels}
+
+
+def _pool_counts(db) -> Dict:
+    now = datetime.utcnow()
+    col = db.quiz_candidates
+    expiring: Dict[str, int] = {}
+    # Bucketing happens client-side on a projection of one indexed field.
+    for row in col.find({"expires_at": {"$gt": now}}, {"expires_at": 1, "_id": 0}):
+        bucket = _expiry_bucket(row["expires_at"])
+        expiring[bucket] = expiring.get(bucket, 0) + 1
+    return {
+        "candidates":     col.count_documents({}),
+        "with_consensus": col.count_documents({"consensus_label": {"$ne": None}}),
+        "topics":         _grouped(col, "topic"),
+        "labels":         _grouped(col, "prediction"),
+        "expiring":       expiring,
+    }
+
+
+def _compute(db, key: str) -> Dict:
+    if key == GLOBAL:
+        return _prediction_counts(db, key)
+    if key == QUIZ_POOL:
+        return _pool_counts(db)
+    if key.startswith("user:"):
+        return _prediction_counts(db, key, {"user_id": key[len("user:"):]})
+    raise ValueError(f"unknown counter {key!r}")
+
+
+def reconcile_key(db, key: str) -> Dict:
+    """
+    Overwrite one counter document with freshly computed values. Increments
+    that land between the count and the $set are lost until the next run.
+    """
+    values = {**_compute(db, key), "seeded": COUNTERS_VERSION, "reconciled_at": datetime.utcnow()}
+    try:
+        db.stats_counters.replace_one({"_id": key}, values, upsert=True)
+    except DuplicateKeyError:
+        pass   # another worker created it first; its values are as fresh
+    return {"_id": key, **values}
+
+
+def reconcile(db, users: bool = False) -> Dict[str, int]:
+    """Rebuild the global and pool counters (and optionally every user's)."""
+    started = time.perf_counter()
+    keys = [GLOBAL, QUIZ_POOL]
+    if users:
+        keys += [user_key(uid) for uid in db.predictions.distinct("user_id") if uid]
+    for key in keys:
+        reconcile_key(db, key)
+    logger.info(f"Reconciled {len(keys)} counters in {time.perf_counter() - started:.2f}s")
+    return {"counters": len(keys)}
+
+
+def claim_lease(db, name: str, minutes: int) -> bool:
+    """True for the one worker that gets to run job ``name`` this interval."""
+    now = datetime.utcnow()
+    try:
+        db.stats_counters.update_one(
+            {"_id": f"lease:{name}", "next_at": {"$lte": now}},
+            {"$set": {"next_at": now + timedelta(minutes=minutes), "pid": os.getpid()}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def start_reconciler(db, minutes: int = RECONCILE_MINUTES) -> Optional[threading.Thread]:
+    """Background reconciliation for this worker; 0 minutes disables it."""
+    if minutes <= 0:
+        return None
+
+    def loop():
+        while True:
+            try:
+                if claim_lease(db, "reconcile", minutes):
+                    reconcile(db)
+            except Exception as e:
+                logger.warning(f"Counter reconciliation failed: {e}")
+            time.sleep(minutes * 60)
+
+    thread = threading.Thread(target=loop, name="stats-reconciler", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Materialised stats counters")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("reconcile", help="recompute counters from source collections")
+    rec.add_argument("--users", action="store_true", help="also rebuild every user:<id> counter")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(reconcile(database, users=args.users))
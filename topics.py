@@ -0,0 +1,146 @@
+"""
+topics.py - keyword topic classifier for headlines.
+
+TOPIC_KEYWORDS is turned into an inverted index (keyword -> topics) once at
+import. Classifying a headline is then one pass over its word tokens with a
+dict lookup each, and a keyword only matches a whole word ("ai" no longer
+matches "said"); a trailing plural "s" is ignored, so "vaccines" still
+counts for "vaccine". Each topic scores one point per distinct keyword
+found, ties go to the topic listed first, and no match at all is "general".
+
+Quiz candidates store the topic they were classified with. When the
+keyword table changes, the pool is reclassified in bulk: one worker does
+it after start-up when the table's fingerprint differs from the one
+recorded in stats_counters, or on demand:
+
+    python topics.py reclassify
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+import stats_counters
+
+logger = logging.getLogger("veritas_ai.topics")
+
+GENERAL = "general"
+
+# Topic keywords (lightweight, no extra model needed)
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    "politics":     ["president","government","election","congress","senate","democrat","republican","parliament","minister","policy","vote","law","military","war","nato"],
+    "health":       ["covid","virus","vaccine","cancer","drug","medicine","doctor","hospital","disease","health","fda","who","clinical","study","treatment"],
+    "technology":   ["ai","robot","tech","software","app","google","apple","microsoft","crypto","bitcoin","hack","cyber","data","algorithm","5g","internet"],
+    "science":      ["nasa","climate","earth","space","research","scientist","study","nature","physics","biology","chemistry","discovery","experiment"],
+    "business":     ["stock","market","economy","bank","finance","company","startup","billion","investment","trade","gdp","inflation","fed","revenue"],
+    "entertainment":["celebrity","movie","music","singer","actor","award","grammy","oscar","hollywood","netflix","sport","game","football","basketball"],
+}
+TOPICS = list(TOPIC_KEYWORDS)
+
+_TOKENS = re.compile(r"[a-z0-9]+")
+_FINGERPRINT_ID = "topic_keywords"   # stats_counters _id
+
+
+def _build_index(table: Dict[str, List[str]]) -> Dict[str, List[int]]:
+    """keyword -> positions (in table order) of the topics listing it."""
+    index: Dict[str, List[int]] = {}
+    for i, keywords in enumerate(table.values()):
+        for kw in keywords:
+            positions = index.setdefault(kw, [])
+            if i not in positions:
+                positions.append(i)
+    return index
+
+
+_INDEX = _build_index(TOPIC_KEYWORDS)
+
+
+def classify(headline: str) -> str:
+    matched = set()
+    for token in set(_TOKENS.findall((headline or "").lower())):
+        if token in _INDEX:
+            matched.add(token)
+        elif token.endswith("s") and token[:-1] in _INDEX:
+            matched.add(token[:-1])
+    if not matched:
+        return GENERAL
+    scores = [0] * len(TOPICS)
+    for kw in matched:
+        for i in _INDEX[kw]:
+            scores[i] += 1
+    best = max(range(len(TOPICS)), key=lambda i: (scores[i], -i))
+    return TOPICS[best]
+
+
+def fingerprint() -> str:
+    canonical = json.dumps(TOPIC_KEYWORDS, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def reclassify_candidates(db, batch: int = 1000) -> Dict[str, int]:
+    """
+    Re-run ``classify`` over every quiz candidate and rewrite the topics
+    that changed, ``batch`` updates per bulk_write. The quiz_pool counter
+    document is reconciled afterwards; workers pick the new topics up on
+    their next pool reload.
+    """
+    scanned = changed = 0
+    ops: List[UpdateOne] = []
+    for doc in db.quiz_candidates.find({}, {"headline": 1, "topic": 1}).batch_size(batch):
+        scanned += 1
+        topic = classify(doc.get("headline", ""))
+        if topic != doc.get("topic"):
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"topic": topic}}))
+        if len(ops) >= batch:
+            changed += db.quiz_candidates.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        changed += db.quiz_candidates.bulk_write(ops, ordered=False).modified_count
+    if changed:
+        stats_counters.reconcile_key(db, stats_counters.QUIZ_POOL)
+    db.stats_counters.update_one({"_id": _FINGERPRINT_ID},
+                                 {"$set": {"fingerprint": fingerprint()}}, upsert=True)
+    logger.info(f"Reclassified quiz candidates: {changed} of {scanned} changed topic")
+    return {"scanned": scanned, "changed": changed}
+
+
+def start_reclassifier(db) -> threading.Thread:
+    """After start-up, one worker reclassifies the pool if TOPIC_KEYWORDS changed."""
+    def run():
+        try:
+            recorded = db.stats_counters.find_one({"_id": _FINGERPRINT_ID}) or {}
+            if recorded.get("fingerprint") != fingerprint() \
+                    and stats_counters.claim_lease(db, "reclassify_topics", 60):
+                reclassify_candidates(db)
+        except Exception as e:
+            logger.warning(f"Topic reclassification failed: {e}")
+
+    thread = threading.Thread(target=run, name="topic-reclassifier", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Headline topic classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("reclassify", help="rewrite the topic of every quiz candidate")
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGODB_URI")
+    if not uri:
+        sys.exit("MONGODB_URI environment variable is required")
+    database = MongoClient(uri, serverSelectionTimeoutMS=5000).get_database("veritas_ai")
+    print(reclassify_candidates(database))
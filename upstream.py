@@ -0,0 +1,566 @@
+"""
+upstream.py - Resilience layer for third-party HTTP APIs
+(NewsAPI, Google Custom Search, Twitter).
+
+Every outbound call goes through ``upstream_get`` so that a failing or
+rate-limiting provider is detected once and then skipped cheaply, instead
+of costing every verification the full request timeout, and so that spend
+against each provider's quota is tracked across all workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream call was skipped without touching the network."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class QuotaExceededError(UpstreamUnavailable):
+    """Raised instead of calling an upstream whose quota is spent."""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    CLOSED     - calls flow; the last ``window`` outcomes are tracked.
+    OPEN       - calls are rejected until ``open_seconds`` have passed.
+    HALF_OPEN  - up to ``half_open_probes`` calls are let through; if they
+                 all succeed the breaker closes, any failure re-opens it.
+
+    The breaker trips when, over at least ``min_calls`` calls, either the
+    error rate reaches ``failure_rate`` or the share of calls slower than
+    ``slow_call_seconds`` reaches ``slow_call_rate``.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 4.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 2,
+    ):
+        self.name              = name
+        self.min_calls         = min_calls
+        self.failure_rate      = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate    = slow_call_rate
+        self.open_seconds      = open_seconds
+        self.half_open_probes  = half_open_probes
+
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._state            = self.CLOSED
+        self._opened_at        = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes  = 0
+        self._lock             = threading.Lock()
+
+        self.rejected   = 0
+        self.trips      = 0
+        self.last_error: Optional[str] = None
+
+    # ----------------------------
+    # State machine
+    # ----------------------------
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state            = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes  = 0
+            logger.info(f"Circuit '{self.name}' half-open - probing")
+
+    def _trip(self):
+        self._state     = self.OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self.trips += 1
+        logger.warning(f"Circuit '{self.name}' opened ({self.last_error or 'slow calls'})")
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._calls.clear()
+        logger.info(f"Circuit '{self.name}' closed")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Give back a half-open probe slot for a call that was never made."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None):
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if error:
+                self.last_error = error
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if ok and not slow:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._close()
+                else:
+                    self._trip()
+                return
+            if self._state == self.OPEN:
+                return  # late result from a call started before the breaker opened
+
+            self._calls.append((not ok, slow))
+            n = len(self._calls)
+            if n < self.min_calls:
+                return
+            failed = sum(1 for f, _ in self._calls if f) / n
+            slowed = sum(1 for _, s in self._calls if s) / n
+            if failed >= self.failure_rate or slowed >= self.slow_call_rate:
+                self._trip()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            n = len(self._calls)
+            return {
+                "state":        self._state,
+                "window_calls": n,
+                "error_rate":   round(sum(1 for f, _ in self._calls if f) / n, 3) if n else 0.0,
+                "slow_rate":    round(sum(1 for _, s in self._calls if s) / n, 3) if n else 0.0,
+                "rejected":     self.rejected,
+                "trips":        self.trips,
+                "last_error":   self.last_error,
+                "retry_in":     (round(max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0), 1)
+                                 if self._state == self.OPEN else 0.0),
+            }
+
+
+# =========================================================================
+#  QUOTA MANAGER
+# =========================================================================
+
+class QuotaManager:
+    """
+    Per-upstream token buckets shared by every worker through MongoDB.
+
+    Each upstream has ``limit`` calls per ``window`` seconds. Spend is a
+    counter document per window, bumped with an atomic ``$inc``, so all
+    gunicorn workers draw from the same budget. Tokens refill linearly
+    across the window (plus a small burst), which paces a daily quota over
+    the whole day instead of exhausting it by mid-afternoon.
+
+    Calls made with ``priority="low"`` may not dip into the last
+    ``reserve`` fraction of the paced allowance.
+    """
+
+    def __init__(self, collection=None, burst: float = 0.1, reserve: float = 0.2):
+        self.collection = collection
+        self.async_collection = None
+        self.burst      = burst
+        self.reserve    = reserve
+        self._limits: Dict[str, Tuple[int, int]] = {}
+        self._used: Dict[str, int] = {}        # last known spend per window key
+        self._lock = threading.Lock()
+
+    def bind(self, collection):
+        self.collection = collection
+
+    def bind_async(self, collection):
+        self.async_collection = collection
+
+    def configure(self, name: str, limit: int, window: int):
+        if limit > 0:
+            self._limits[name] = (limit, window)
+
+    def _window(self, name: str) -> Tuple[str, float, float]:
+        limit, window = self._limits[name]
+        now   = time.time()
+        start = now - (now % window)
+        paced = min(limit, limit * self.burst + limit * (now - start) / window)
+        return f"{name}:{int(start)}", paced, start + window
+
+    @staticmethod
+    def _update(key: str, name: str, cost: int, expires: float) -> Tuple[Dict, Dict]:
+        return {"_id": key}, {"$inc": {"used": cost},
+                              "$setOnInsert": {"upstream": name,
+                                               "expires_at": datetime.utcfromtimestamp(expires)}}
+
+    def _note(self, key: str, used: Optional[int], cost: int) -> int:
+        """Record the shared count (or fall back to a local one) and return it."""
+        with self._lock:
+            if key not in self._used:
+                # A new window for this upstream: its earlier windows are done with
+                prefix = key.rsplit(":", 1)[0] + ":"
+                for old in [k for k in self._used if k.startswith(prefix)]:
+                    del self._used[old]
+            self._used[key] = used if used is not None else self._used.get(key, 0) + cost
+            return self._used[key]
+
+    def _inc(self, key: str, name: str, cost: int, expires: float) -> int:
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one_and_update(
+                    *self._update(key, name, cost, expires),
+                    upsert=True,
+                    return_document=True,  # ReturnDocument.AFTER
+                )
+                return self._note(key, doc["used"], cost)
+            except Exception as e:
+                logger.warning(f"Quota store error ({name}): {e} - using local count")
+        return self._note(key, None, cost)
+
+    async def _inc_async(self, key: str, name: str, cost: int, expires: float) -> int:
+        if self.async_collection is not None:
+            try:
+                doc = await self.async_collection.find_one_and_update(
+                    *self._update(key, name, cost, expires),
+                    upsert=True,
+                    return_document=True,  # ReturnDocument.AFTER
+                )
+                return self._note(key, doc["used"], cost)
+            except Exception as e:
+                logger.warning(f"Quota store error ({name}): {e} - using local count")
+        return self._note(key, None, cost)
+
+    def _precheck(self, name: str, cost: int, priority: str) -> Optional[Tuple[str, float, float]]:
+        """(window key, allowance, window end), or None if known to be exhausted."""
+        key, paced, expires = self._window(name)
+        if priority == "low":
+            paced *= 1 - self.reserve
+        with self._lock:
+            known = self._used.get(key, 0)
+        if known + cost > paced:
+            return None                        # known exhausted - no round-trip
+        return key, paced, expires
+
+    def try_acquire(self, name: str, cost: int = 1, priority: str = "normal") -> bool:
+        if name not in self._limits:
+            return True
+        plan = self._precheck(name, cost, priority)
+        if plan is None:
+            return False
+        key, paced, expires = plan
+        if self._inc(key, name, cost, expires) > paced:
+            self._inc(key, name, -cost, expires)
+            return False
+        return True
+
+    async def try_acquire_async(self, name: str, cost: int = 1, priority: str = "normal") -> bool:
+        """``try_acquire`` for the asyncio engine, using the Motor collection."""
+        if name not in self._limits:
+            return True
+        plan = self._precheck(name, cost, priority)
+        if plan is None:
+            return False
+        key, paced, expires = plan
+        if await self._inc_async(key, name, cost, expires) > paced:
+            await self._inc_async(key, name, -cost, expires)
+            return False
+        return True
+
+    def is_low(self, *names: str) -> bool:
+        """True when any of ``names`` is into its reserve (last known spend)."""
+        for name in names:
+            if name not in self._limits:
+                continue
+            key, paced, _ = self._window(name)
+            with self._lock:
+                known = self._used.get(key, 0)
+            if known > paced * (1 - self.reserve):
+                return True
+        return False
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for name, (limit, window) in self._limits.items():
+            key, paced, _ = self._window(name)
+            with self._lock:
+                used = self._used.get(key, 0)
+            out[name] = {"limit": limit, "window_seconds": window, "used": used,
+                         "available_now": max(int(paced) - used, 0), "low": self.is_low(name)}
+        return out
+
+
+quota_manager = QuotaManager(
+    burst   = float(os.getenv("QUOTA_BURST_FRACTION", "0.1")),
+    reserve = float(os.getenv("QUOTA_RESERVE_FRACTION", "0.2")),
+)
+quota_manager.configure("newsapi",    int(os.getenv("QUOTA_NEWSAPI_PER_DAY", "100")),    86400)
+quota_manager.configure("google_cse", int(os.getenv("QUOTA_GOOGLE_CSE_PER_DAY", "100")), 86400)
+quota_manager.configure("twitter",    int(os.getenv("QUOTA_TWITTER_PER_15MIN", "60")),   900)
+
+
+# =========================================================================
+#  ADAPTIVE TIMEOUTS + HEDGING
+# =========================================================================
+
+class LatencyTracker:
+    """
+    Rolling sample of an endpoint's recent latencies. Percentiles come from
+    the last ``size`` calls, so the estimate follows the upstream as it
+    speeds up or slows down. Failed calls are recorded at their elapsed
+    time, which keeps a timing-out upstream from looking fast.
+    """
+
+    def __init__(self, size: int = 256, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * p / 100.0), len(ordered) - 1)]
+
+    def timeout(self, ceiling: float) -> float:
+        """Timeout derived from the observed p99, never above ``ceiling``."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(TIMEOUT_FLOOR, p99 * TIMEOUT_P99_MULTIPLIER))
+
+    def snapshot(self) -> Dict[str, Any]:
+        pcts = {f"p{p}": self.percentile(p) for p in (50, 95, 99)}
+        return {"samples": len(self._samples),
+                **{k: round(v, 3) if v is not None else None for k, v in pcts.items()}}
+
+
+class HedgeBudget:
+    """Caps hedged requests at ``ratio`` of all hedgeable requests (token bucket)."""
+
+    def __init__(self, ratio: float = 0.05, burst: float = 10.0):
+        self.ratio  = ratio
+        self.burst  = burst
+        self.tokens = burst
+        self.sent   = 0
+        self.won    = 0
+        self.denied = 0
+        self._lock  = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.sent   += 1
+                return True
+            self.denied += 1
+            return False
+
+    def refund(self):
+        """Give back a token whose hedge was not sent (the quota refused it)."""
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1.0)
+            self.sent  -= 1
+
+    def record_win(self):
+        with self._lock:
+            self.won += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sent": self.sent, "won": self.won, "denied": self.denied,
+                    "tokens": round(self.tokens, 2)}
+
+
+TIMEOUT_FLOOR          = float(os.getenv("UPSTREAM_TIMEOUT_FLOOR", "1.0"))
+TIMEOUT_P99_MULTIPLIER = float(os.getenv("UPSTREAM_TIMEOUT_P99_MULTIPLIER", "2.0"))
+HEDGING_ENABLED        = os.getenv("UPSTREAM_HEDGING", "True").lower() == "true"
+
+_latency: Dict[str, LatencyTracker] = {}
+_latency_lock = threading.Lock()
+hedge_budget  = HedgeBudget(ratio=float(os.getenv("HEDGE_BUDGET_RATIO", "0.05")))
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def get_latency(endpoint: str) -> LatencyTracker:
+    with _latency_lock:
+        if endpoint not in _latency:
+            _latency[endpoint] = LatencyTracker()
+        return _latency[endpoint]
+
+
+def latency_states() -> Dict[str, Any]:
+    with _latency_lock:
+        trackers = dict(_latency)
+    return {"endpoints": {k: t.snapshot() for k, t in trackers.items()},
+            "hedging": {"enabled": HEDGING_ENABLED, **hedge_budget.snapshot()}}
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv("HEDGE_POOL_SIZE", "16")),
+                thread_name_prefix="upstream-hedge",
+            )
+        return _hedge_pool
+
+
+def reset_after_fork():
+    """Forget the parent's hedge pool (and its lock); a forked child has none of its threads."""
+    global _hedge_pool, _hedge_pool_lock
+    _hedge_pool      = None
+    _hedge_pool_lock = threading.Lock()
+
+
+def _timed_get(tracker: LatencyTracker, url: str, **kwargs) -> requests.Response:
+    start = time.monotonic()
+    try:
+        return requests.get(url, **kwargs)
+    finally:
+        tracker.observe(time.monotonic() - start)
+
+
+def _discard(future):
+    """Done-callback for the losing request: drop its connection."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _hedged_get(name: str, tracker: LatencyTracker, url: str, **kwargs) -> requests.Response:
+    """
+    Send the request; if it has not answered by the endpoint's p95, send a
+    duplicate (budget and quota permitting) and return whichever finishes
+    first. ``requests`` cannot abort a call mid-flight, so the loser is
+    cancelled if still queued and otherwise has its response closed.
+    """
+    pool    = _get_hedge_pool()
+    primary = pool.submit(_timed_get, tracker, url, **kwargs)
+    hedge_budget.on_request()
+    p95 = tracker.percentile(95)
+    if p95 is None:
+        return primary.result()
+    try:
+        return primary.result(timeout=p95)
+    except FutureTimeout:
+        pass
+    if not hedge_budget.try_spend():
+        return primary.result()
+    if not quota_manager.try_acquire(name, priority="low"):
+        hedge_budget.refund()
+        return primary.result()
+
+    hedge   = pool.submit(_timed_get, tracker, url, **kwargs)
+    pending = {primary, hedge}
+    first_error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            if f.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                    loser.add_done_callback(_discard)
+                if f is hedge:
+                    hedge_budget.record_win()
+                return f.result()
+            first_error = first_error or f.exception()
+    raise first_error
+
+
+# =========================================================================
+#  REGISTRY
+# =========================================================================
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                window            = int(os.getenv("BREAKER_WINDOW", "20")),
+                min_calls         = int(os.getenv("BREAKER_MIN_CALLS", "5")),
+                failure_rate      = float(os.getenv("BREAKER_FAILURE_RATE", "0.5")),
+                slow_call_seconds = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "4")),
+                slow_call_rate    = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8")),
+                open_seconds      = float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+                half_open_probes  = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "2")),
+            )
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
+
+
+def upstream_get(name: str, url: str, priority: str = "normal", hedge: bool = False,
+                 **kwargs) -> requests.Response:
+    """
+    ``requests.get`` guarded by the breaker and quota for ``name``.
+    Raises CircuitOpenError / QuotaExceededError without touching the network.
+    Server errors and 429s count as failures; other 4xx do not.
+
+    The ``timeout`` argument is a ceiling: the actual timeout follows the
+    endpoint's observed latency. ``hedge=True`` (idempotent GETs only)
+    enables a duplicate request once the first exceeds the endpoint's p95.
+    """
+    breaker = get_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{name} circuit open")
+    if not quota_manager.try_acquire(name, priority=priority):
+        breaker.release()
+        raise QuotaExceededError(f"{name} quota exhausted")
+    tracker = get_latency(f"{name}:{urlparse(url).path}")
+    kwargs["timeout"] = tracker.timeout(kwargs.get("timeout", 8))
+    start = time.monotonic()
+    try:
+        if hedge and HEDGING_ENABLED:
+            resp = _hedged_get(name, tracker, url, **kwargs)
+        else:
+            resp = _timed_get(tracker, url, **kwargs)
+    except Exception as e:
+        breaker.record(False, time.monotonic() - start, f"{type(e).__name__}: {e}")
+        raise
+    ok = resp.status_code < 500 and resp.status_code != 429
+    breaker.record(ok, time.monotonic() - start, None if ok else f"HTTP {resp.status_code}")
+    return resp
@@ -0,0 +1,41 @@
+"""
+worker_queue.py - a queue per process drained by one background thread.
+
+The transformer MicroBatcher and the WriteBehind writer both hand work to a
+single daemon thread. That thread starts on first use and again after fork,
+as a preloaded parent's thread does not survive into its workers. The
+Condition, the deque and the thread are replaced together under a lock, and
+the pid that marks them current is assigned last: a caller that sees its
+own pid always sees this process's queue, never the discarded one.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Optional
+
+
+class WorkerQueue:
+    """Base for a Condition-guarded deque served by ``_loop`` in one thread per process."""
+
+    thread_name = "worker-queue"
+
+    def __init__(self):
+        self._cond  = threading.Condition()
+        self._queue: deque = deque()
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._cond  = threading.Condition()
+            self._queue = deque()
+            threading.Thread(target=self._loop, name=self.thread_name, daemon=True).start()
+            self._pid = os.getpid()   # last: publishes the queue above
+
+    def _loop(self):
+        raise NotImplementedError
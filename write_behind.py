@@ -0,0 +1,134 @@
+"""
+write_behind.py - batched background writer for MongoDB WriteOps.
+
+Request handlers hand over the same (collection, method, args, kwargs)
+WriteOps that app.apply_writes runs inline; a single thread per worker
+drains the queue every WRITE_BEHIND_MS (or once WRITE_BEHIND_MAX_BATCH ops
+wait) and applies them as one unordered bulk_write per collection.
+Updates made only of $inc (and $set) with the same filter are merged
+first - increments summed, the last $set winning - so a burst of answers
+from one player becomes a single user_stats update.
+
+Writes are fire-and-forget: a failed batch is logged, and ops still
+queued when the process dies are lost. Only use it for writes the
+response does not depend on.
+"""
+
+import atexit
+import logging
+import os
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Tuple
+
+from pymongo import InsertOne, UpdateMany, UpdateOne
+
+from worker_queue import WorkerQueue
+
+logger = logging.getLogger("veritas_ai.write_behind")
+
+WRITE_BEHIND_MS        = float(os.getenv("WRITE_BEHIND_MS", "200"))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_QUEUE_MAX = int(os.getenv("WRITE_BEHIND_QUEUE_MAX", "10000"))
+
+_BULK = {"insert_one": InsertOne, "update_one": UpdateOne, "update_many": UpdateMany}
+
+
+def _merge_key(method: str, args: tuple, kwargs: Dict):
+    """Hashable key for merge-able $inc(+$set) updates, else None."""
+    if method != "update_one" or len(args) != 2 or "$inc" not in args[1] \
+            or not set(args[1]) <= {"$inc", "$set"}:
+        return None
+    return repr((args[0], sorted(kwargs.items())))
+
+
+def _coalesce(ops: List[Tuple]) -> List[Tuple]:
+    merged: "OrderedDict[object, Tuple]" = OrderedDict()
+    for i, (col, method, args, kwargs) in enumerate(ops):
+        key = _merge_key(method, args, kwargs)
+        if key is None:
+            merged[("op", i)] = (col, method, args, kwargs)
+            continue
+        key = (col, key)
+        if key not in merged:
+            update = {op: dict(fields) for op, fields in args[1].items()}
+            merged[key] = (col, method, (args[0], update), kwargs)
+            continue
+        update = merged[key][2][1]
+        for field, n in args[1]["$inc"].items():
+            update["$inc"][field] = update["$inc"].get(field, 0) + n
+        update.setdefault("$set", {}).update(args[1].get("$set", {}))
+        if not update["$set"]:
+            del update["$set"]
+    return list(merged.values())
+
+
+class WriteBehind(WorkerQueue):
+    thread_name = "write-behind"
+
+    def __init__(self, db=None):
+        super().__init__()
+        self.db          = db
+        self._batches = self._ops = self._dropped = self._failed = 0
+
+    def bind(self, db):
+        self.db = db
+
+    def submit(self, ops: List[Tuple]):
+        self._ensure_worker()
+        with self._cond:
+            if len(self._queue) + len(ops) > WRITE_BEHIND_QUEUE_MAX:
+                self._dropped += len(ops)
+                logger.error(f"Write-behind queue full - dropped {len(ops)} ops")
+                return
+            self._queue.extend(ops)
+            if len(self._queue) >= WRITE_BEHIND_MAX_BATCH:
+                self._cond.notify()
+
+    def _take(self) -> List[Tuple]:
+        with self._cond:
+            if len(self._queue) < WRITE_BEHIND_MAX_BATCH:
+                self._cond.wait(WRITE_BEHIND_MS / 1000.0)
+            return [self._queue.popleft() for _ in range(min(WRITE_BEHIND_MAX_BATCH, len(self._queue)))]
+
+    def _loop(self):
+        while True:
+            batch = self._take()
+            if batch:
+                self._apply(batch)
+
+    def _apply(self, batch: List[Tuple]):
+        if self.db is None:
+            return
+        by_collection: Dict[str, list] = defaultdict(list)
+        for col, method, args, kwargs in _coalesce(batch):
+            by_collection[col].append(_BULK[method](*args, **kwargs))
+        for col, requests in by_collection.items():
+            try:
+                self.db[col].bulk_write(requests, ordered=False)
+            except Exception as e:
+                self._failed += len(requests)
+                logger.error(f"Write-behind bulk_write to '{col}' failed: {e}")
+        self._batches += 1
+        self._ops += len(batch)
+
+    def flush(self):
+        """Apply everything queued in this process now (shutdown, tests)."""
+        if self._pid != os.getpid():
+            return
+        with self._cond:
+            batch, self._queue = list(self._queue), deque()
+        if batch:
+            self._apply(batch)
+
+    def stats(self) -> Dict:
+        return {
+            "queued":  len(self._queue),
+            "batches": self._batches,
+            "ops":     self._ops,
+            "dropped": self._dropped,
+            "failed":  self._failed,
+        }
+
+
+write_behind = WriteBehind()
+atexit.register(write_behind.flush)